@@ -0,0 +1,97 @@
+"""Measure BendLookup throughput.
+
+Builds a synthetic bend_parameters table (or uses --db), then times
+random lookups in 'nearest' and 'interpolate' mode, with and without a
+fixed source, and the cost of an index rebuild after a write.
+
+    python benchmarks/bench_lookup.py [--materials 300] [--lookups 100000] [--db materials.db]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scrapper  # noqa: E402
+
+SOURCES = ('OSH Cut', 'SendCutSend')
+THICKNESSES = [0.02 + 0.015 * i for i in range(30)]
+CONDITIONS = ['', '90° / R 0.03"', '90° / R 0.06"']
+
+
+def build_synthetic_db(path, materials):
+    conn = sqlite3.connect(path)
+    scrapper.create_bend_table(conn)
+    columns = ", ".join(scrapper.quote_identifier(c) for c in scrapper.BEND_COLUMNS)
+    rows = []
+    for m in range(materials):
+        for source in SOURCES:
+            for thickness in THICKNESSES:
+                for parameter in ('K-factor', 'Bend Deduction', 'Minimum Flange Support'):
+                    for condition in (CONDITIONS if parameter == 'Bend Deduction' else ['']):
+                        value = round(0.3 + thickness * (m % 7 + 1) / 10, 4)
+                        rows.append((source, 'Bench', f'Material {m}', f'{thickness:g}', thickness, None,
+                                     parameter, condition, None, value, str(value)))
+    with conn:
+        conn.executemany(f"INSERT INTO {scrapper.BEND_TABLE} ({columns}) "
+                         f"VALUES ({', '.join('?' * len(scrapper.BEND_COLUMNS))})", rows)
+    conn.close()
+    return len(rows)
+
+
+def time_lookups(lookup, queries, **kwargs):
+    started = time.perf_counter()
+    for material, thickness, parameter, condition in queries:
+        lookup.lookup(material, thickness, parameter, condition, **kwargs)
+    return len(queries) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--materials', type=int, default=300)
+    parser.add_argument('--lookups', type=int, default=100000)
+    parser.add_argument('--db', help="existing database to benchmark instead of synthetic data")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db
+        if not db_path:
+            db_path = os.path.join(tmp, 'bench_lookup.db')
+            print(f"synthetic bend rows: {build_synthetic_db(db_path, args.materials)}")
+
+        started = time.perf_counter()
+        lookup = scrapper.BendLookup(db_path)
+        print(f"index build: {time.perf_counter() - started:.3f}s, {len(lookup.index)} series")
+        series = list(lookup.index)
+        if not series:
+            print("no bend parameters to look up")
+            return
+        rng = random.Random(0)
+        queries = []
+        for _ in range(args.lookups):
+            material, parameter, condition = rng.choice(series)
+            queries.append((material, rng.uniform(0.0, 0.5), parameter, condition))
+
+        for mode in ('nearest', 'interpolate'):
+            print(f"{mode:>12}: {time_lookups(lookup, queries, mode=mode):>10,.0f} lookups/s (all sources)")
+            print(f"{mode:>12}: {time_lookups(lookup, queries, mode=mode, source=SOURCES[0]):>10,.0f} "
+                  f"lookups/s (one source)")
+
+        if not args.db:
+            writer = sqlite3.connect(db_path)
+            with writer:
+                writer.execute(f"UPDATE {scrapper.BEND_TABLE} SET \"Value\" = \"Value\" + 0.001 "
+                               f"WHERE \"Material Name\" = 'Material 0'")
+            writer.close()
+            started = time.perf_counter()
+            rebuilt = lookup.refresh()
+            print(f"rebuild after write: {rebuilt}, {time.perf_counter() - started:.3f}s")
+        lookup.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+"""Measure pipeline throughput against the offline fixture site.
+
+Starts benchmarks/fixture_server.py in-process, points the scraper at it
+and runs the selected stages:
+
+    sendcutsend-http     scrape_materials_page, pages over HTTP (no browser)
+    sendcutsend-browser  scrape_materials_page, every page through Chrome
+    oshcut-api           parse_oshcut, catalog rows from the captured API JSON
+    oshcut-ui            parse_oshcut, click-through of every "More info..." modal
+    storage              upsert_materials of the rows collected above, then an unchanged re-run
+
+For each stage it reports work units per second (pages, modals or rows),
+the process's peak resident memory after it (Chrome itself not included)
+and the per-stage latencies recorded by ``scrapper.metrics``.
+``--tracemalloc`` adds each stage's peak Python heap, at the cost of a
+several times slower parse stage. Browser stages are
+skipped when Chrome cannot be started. ``--output`` writes everything as
+JSON for CI artifacts.
+
+    python benchmarks/bench_pipeline.py [STAGE ...] [--copies 3] [--latency 50] [--jitter 20] [--flaky 0.05]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import scrapper  # noqa: E402
+import fixture_server  # noqa: E402
+
+STAGES = ('sendcutsend-http', 'sendcutsend-browser', 'oshcut-api', 'oshcut-ui', 'storage')
+BROWSER_STAGES = ('sendcutsend-browser', 'oshcut-api', 'oshcut-ui')
+
+
+def stage_sendcutsend(context, fetch_mode):
+    before = context['server'].snapshot().get('page', 0)
+    rows = scrapper.scrape_materials_page(workers=context['workers'], fetch_mode=fetch_mode, pool=context['pool'])
+    frame = scrapper.build_sendcutsend_frame(rows)
+    # Страницы подкатегорий без главной страницы с меню.
+    pages = context['server'].snapshot().get('page', 0) - before - 1
+    return frame, max(pages, 0), 'pages'
+
+
+def stage_oshcut(context, acquisition):
+    frame = scrapper.parse_oshcut(acquisition=acquisition, pool=context['pool'])
+    if acquisition == 'api':
+        return frame, int(not frame.empty), 'catalog loads'
+    return frame, len(frame), 'modals'
+
+
+def stage_storage(context):
+    frames = [frame for frame in context['frames'].values() if not frame.empty]
+    if not frames:
+        logging.info("No rows collected yet; scraping SendCutSend over HTTP for the storage stage.")
+        frames = [scrapper.build_sendcutsend_frame(scrapper.scrape_materials_page(
+            workers=context['workers'], fetch_mode='http'))]
+    rows = sum(len(frame) for frame in frames)
+    conn = sqlite3.connect(os.path.join(context['tmp'], 'bench_pipeline.db'))
+    scrapper.ensure_materials_schema(conn)
+    timings = {}
+    for attempt in ('first write', 'unchanged'):
+        started = time.perf_counter()
+        for frame in frames:
+            scrapper.upsert_materials(conn, frame, run_id=f"bench-{attempt}")
+        timings[attempt] = time.perf_counter() - started
+    conn.close()
+    return None, rows * len(timings), 'rows', {k: round(v, 4) for k, v in timings.items()}
+
+
+def chrome_available(pool):
+    try:
+        driver = pool.acquire(None, source='sendcutsend')
+    except Exception as e:
+        print(f"Chrome not available, skipping browser stages: {str(e).splitlines()[0] if str(e) else e}")
+        return False
+    pool.release(driver)
+    return True
+
+
+def peak_rss_mb():
+    """High-water mark of this process's resident memory, MB."""
+    if os.name == 'nt':
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD)] + \
+                       [(name, ctypes.c_size_t) for name in (
+                           'PeakWorkingSetSize', 'WorkingSetSize', 'QuotaPeakPagedPoolUsage', 'QuotaPagedPoolUsage',
+                           'QuotaPeakNonPagedPoolUsage', 'QuotaNonPagedPoolUsage', 'PagefileUsage',
+                           'PeakPagefileUsage')]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        if not kernel32.K32GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return None
+        return round(counters.PeakWorkingSetSize / 1024 / 1024, 1)
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss: килобайты в Linux, байты в macOS.
+    return round(peak / 1024 / (1024 if sys.platform == 'darwin' else 1), 1)
+
+
+def run_stage(name, context):
+    scrapper.metrics.reset(f"bench-{name}")
+    if context['tracemalloc']:
+        tracemalloc.start()
+    started = time.perf_counter()
+    if name.startswith('sendcutsend-'):
+        outcome = stage_sendcutsend(context, name.split('-', 1)[1])
+    elif name.startswith('oshcut-'):
+        outcome = stage_oshcut(context, name.split('-', 1)[1])
+    else:
+        outcome = stage_storage(context)
+    seconds = time.perf_counter() - started
+    peak_heap = None
+    if context['tracemalloc']:
+        peak_heap = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2)
+        tracemalloc.stop()
+    frame, units, unit_name = outcome[:3]
+    if frame is not None:
+        context['frames'][name.split('-', 1)[0]] = frame
+    summary = scrapper.metrics.summary()
+    return {
+        'seconds': round(seconds, 4),
+        'units': units,
+        'unit': unit_name,
+        'units_per_second': round(units / seconds, 3) if seconds else None,
+        'rows': len(frame) if frame is not None else None,
+        'peak_rss_mb': peak_rss_mb(),
+        'peak_heap_mb': peak_heap,
+        'detail': outcome[3] if len(outcome) > 3 else None,
+        'latency': {stage: {key: values[key] for key in ('count', 'mean', 'p50_le', 'p95_le', 'max')}
+                    for stage, values in summary['stages'].items()},
+        'counters': summary['counters'],
+    }
+
+
+def print_stage(name, result):
+    print(f"\n{name}: {result['units']} {result['unit']} in {result['seconds']:.2f}s "
+          f"= {result['units_per_second']:.2f} {result['unit']}/s, peak RSS {result['peak_rss_mb']} MB"
+          + (f", peak heap {result['peak_heap_mb']:.1f} MB" if result['peak_heap_mb'] is not None else "")
+          + (f", {result['rows']} rows" if result['rows'] is not None else ""))
+    if result['detail']:
+        print("    " + ", ".join(f"{key} {value:.3f}s" for key, value in result['detail'].items()))
+    for stage, values in result['latency'].items():
+        print(f"    {stage:<45} n={values['count']:<5} mean {values['mean'] * 1000:8.1f} ms  "
+              f"p95 <= {values['p95_le'] * 1000:g} ms  max {values['max'] * 1000:8.1f} ms")
+    if result['counters']:
+        print("    " + ", ".join(f"{key}={value}" for key, value in result['counters'].items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('stages', nargs='*', help=f"stages to run: {', '.join(STAGES)} (default: all)")
+    parser.add_argument('--copies', type=int, default=3, help="list every fixture material this many times")
+    parser.add_argument('--workers', type=int, default=scrapper.SENDCUTSEND_WORKERS)
+    parser.add_argument('--latency', type=float, default=0.0, help="injected latency per request, ms")
+    parser.add_argument('--jitter', type=float, default=0.0, help="standard deviation of the latency, ms")
+    parser.add_argument('--flaky', type=float, default=0.0, help="probability that a request fails")
+    parser.add_argument('--flaky-mode', choices=('status', 'reset'), default='status')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tracemalloc', action='store_true', help="also report peak Python heap per stage (slower)")
+    parser.add_argument('--output', help="write the results as JSON")
+    parser.add_argument('--log', default=os.devnull, help="scraper log file (default: discarded)")
+    args = parser.parse_args()
+
+    names = args.stages or list(STAGES)
+    unknown = [name for name in names if name not in STAGES]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+    output = os.path.abspath(args.output) if args.output else None
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+        handler.close()
+    logging.basicConfig(filename=os.path.abspath(args.log), level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+    server = fixture_server.start_server(copies=args.copies, latency_ms=args.latency, jitter_ms=args.jitter,
+                                         flaky=args.flaky, flaky_mode=args.flaky_mode, seed=args.seed)
+    scrapper.set_base_urls(*fixture_server.site_urls(server.base_url))
+    scrapper.load_scraping_modules()
+    pool = scrapper.DriverPool()
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Скриншоты и отладочные файлы скрапера остаются во временном каталоге.
+        os.chdir(tmp)
+        context = {'server': server, 'pool': pool, 'workers': args.workers, 'tmp': tmp, 'frames': {},
+                   'tracemalloc': args.tracemalloc}
+        has_chrome = None
+        for name in names:
+            if name in BROWSER_STAGES:
+                if has_chrome is None:
+                    has_chrome = chrome_available(pool)
+                if not has_chrome:
+                    results[name] = {'skipped': 'Chrome not available'}
+                    print(f"\n{name}: skipped, Chrome not available")
+                    continue
+            results[name] = run_stage(name, context)
+            print_stage(name, results[name])
+        pool.close()
+        os.chdir(cwd)
+    server.shutdown()
+    print(f"\nfixture server: {server.snapshot()}")
+
+    if output:
+        report = {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'options': {key: getattr(args, key) for key in ('copies', 'workers', 'latency', 'jitter', 'flaky',
+                                                            'flaky_mode', 'seed', 'tracemalloc')},
+            'server': server.snapshot(),
+            'stages': results,
+        }
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {output}")
+    failed = [name for name, result in results.items() if not result.get('skipped') and not result['units']]
+    if failed:
+        print(f"no work done in: {', '.join(failed)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Compare WebDriver round trips of the SendCutSend extraction modes.
+
+Loads each subcategory page once, then runs the 'elements' and 'snapshot'
+extractors on it, counting the WebDriver commands each one issues and
+checking that both return the same rows.
+
+    python benchmarks/bench_roundtrips.py [--limit 5] [URL ...]
+"""
+import argparse
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scrapper  # noqa: E402
+
+
+@contextmanager
+def count_webdriver_commands(driver):
+    """Count commands sent to chromedriver; WebElement calls go through driver.execute too."""
+    counter = {'commands': 0}
+    original_execute = driver.execute
+
+    def counting_execute(driver_command, params=None):
+        counter['commands'] += 1
+        return original_execute(driver_command, params)
+
+    driver.execute = counting_execute
+    try:
+        yield counter
+    finally:
+        driver.execute = original_execute
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('urls', nargs='*', help="Subcategory URLs (default: first --limit links from the materials menu)")
+    parser.add_argument('--limit', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.urls:
+        links = [('Benchmark', url.rstrip('/').rsplit('/', 1)[-1], url) for url in args.urls]
+    else:
+        html = scrapper.fetch_page_html(scrapper.SENDCUTSEND_URL)
+        links = scrapper.parse_subcategory_links_html(html, scrapper.SENDCUTSEND_URL)[:args.limit]
+
+    driver = scrapper.setup_driver(None)
+    totals = {'elements': [0, 0.0], 'snapshot': [0, 0.0]}
+    try:
+        print(f"{'material':40} {'elements':>10} {'snapshot':>10} {'rows':>6}  identical")
+        for category_name, material_name, url in links:
+            if not scrapper.load_subcategory_page(driver, url):
+                continue
+            results = {}
+            for mode, extract in (('elements', scrapper.extract_subcategory_elements),
+                                  ('snapshot', scrapper.extract_subcategory_snapshot)):
+                started = time.perf_counter()
+                with count_webdriver_commands(driver) as counter:
+                    results[mode] = extract(driver, category_name, material_name)
+                totals[mode][0] += counter['commands']
+                totals[mode][1] += time.perf_counter() - started
+                results[mode + '_commands'] = counter['commands']
+            print(f"{material_name[:40]:40} {results['elements_commands']:>10} {results['snapshot_commands']:>10} "
+                  f"{len(results['snapshot']):>6}  {results['elements'] == results['snapshot']}")
+    finally:
+        driver.quit()
+    for mode, (commands, seconds) in totals.items():
+        print(f"{mode:>8}: {commands} WebDriver commands, {seconds:.2f}s extraction time")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Measure how long the scraper takes to start.
+
+Each scenario runs in a fresh interpreter and is repeated; the median wall
+time is compared with the target. 'import' is the bare module import,
+'test' and 'help' are the ``--test`` and ``--help`` command lines, and
+'gui' builds the main window (skipped when no display is available).
+With ``--baseline`` the median startup of a bare interpreter is measured
+first and subtracted, so the target applies to the scraper's own cost
+and does not depend on how fast the machine starts Python.
+
+    python benchmarks/bench_startup.py [--runs 5] [--target 1.0] [--baseline]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, 'scrapper.py')
+
+GUI_SNIPPET = (
+    "import tkinter as tk, scrapper\n"
+    "root = tk.Tk()\n"
+    "scrapper.ScraperGUI(root)\n"
+    "root.update()\n"
+    "root.destroy()\n"
+)
+
+SCENARIOS = {
+    'import': [sys.executable, '-c', 'import scrapper'],
+    'test': [sys.executable, SCRIPT, '--test'],
+    'help': [sys.executable, SCRIPT, '--help'],
+    'gui': [sys.executable, '-c', GUI_SNIPPET],
+}
+
+
+def time_command(command):
+    started = time.perf_counter()
+    subprocess.run(command, cwd=ROOT, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def has_display():
+    return os.name == 'nt' or bool(os.environ.get('DISPLAY'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('scenarios', nargs='*', help=f"scenarios to run: {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--target', type=float, default=1.0, help="target median startup time, seconds")
+    parser.add_argument('--baseline', action='store_true',
+                        help="compare the time over a bare interpreter start with the target")
+    args = parser.parse_args()
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    baseline = 0.0
+    if args.baseline:
+        baseline = statistics.median(time_command([sys.executable, '-c', 'pass']) for _ in range(args.runs))
+        print(f"{'python':>8}: median {baseline:.3f}s (baseline, subtracted below)")
+    failed = False
+    for name in names:
+        if name == 'gui' and not has_display():
+            print(f"{name:>8}: skipped, no display")
+            continue
+        try:
+            times = [time_command(SCENARIOS[name]) for _ in range(args.runs)]
+        except subprocess.CalledProcessError as e:
+            print(f"{name:>8}: failed with exit code {e.returncode}")
+            failed = True
+            continue
+        median = statistics.median(times) - baseline
+        verdict = 'ok' if median <= args.target else 'SLOW'
+        failed = failed or median > args.target
+        print(f"{name:>8}: median {median:.3f}s, min {min(times) - baseline:.3f}s over {args.runs} runs"
+              f"{' over baseline' if args.baseline else ''}  {verdict}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+"""Offline stand-in for oshcut.com and sendcutsend.com.
+
+Serves the recorded pages in benchmarks/fixtures so both pipelines can run
+without network access:
+
+    /oshcut/catalog/sheet           OSH Cut catalog SPA (filters, material list, "More info..." modal)
+    /oshcut/api/catalog             the JSON the SPA renders from (captured in 'api' mode)
+    /sendcutsend/materials/         SendCutSend materials page with menu ``menu-1-711fca``
+    /sendcutsend/materials/<slug>/  subcategory pages with Elementor tabs
+
+Every response is delayed by ``--latency`` ms (gaussian, ``--jitter`` ms)
+and fails with probability ``--flaky``: an HTTP 503 or, with
+``--flaky-mode reset``, a dropped connection. ``--copies N`` lists every
+material N times, to scale a run up without more fixtures. Pages carry
+an ETag and answer conditional requests with 304.
+
+    python benchmarks/fixture_server.py [--port 8765] [--latency 50] [--jitter 20] [--flaky 0.05] [--copies 3]
+
+then point the scraper at it:
+
+    python scrapper.py --headless --oshcut-url http://127.0.0.1:8765/oshcut/catalog/sheet \\
+        --sendcutsend-url http://127.0.0.1:8765/sendcutsend/materials/
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import socket
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+RECORDED_SENDCUTSEND = 'https://sendcutsend.com'
+OSHCUT_SHEET_PATH = '/oshcut/catalog/sheet'
+SENDCUTSEND_MATERIALS_PATH = '/sendcutsend/materials/'
+
+# Leaf entries of the materials menu, one per line in the recorded page.
+MENU_LEAF_RE = re.compile(r'^(<li class="menu-item [^"]*"><a href=")([^"]+)(" class="elementor-sub-item">)([^<]+)(</a></li>)$',
+                          re.MULTILINE)
+
+
+class FixtureSite:
+    """The recorded pages, scaled by ``copies`` and keyed by request path."""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, copies=1):
+        self.fixtures_dir = fixtures_dir
+        self.copies = max(1, copies)
+        self.last_modified = formatdate(os.path.getmtime(fixtures_dir), usegmt=True)
+        self.catalog = self._catalog()
+        self.materials_page = self._materials_page()
+
+    def _read(self, *parts):
+        with open(os.path.join(self.fixtures_dir, *parts), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def _catalog(self):
+        catalog = json.loads(self._read('oshcut', 'catalog.json'))
+        for supertype in catalog['supertypes']:
+            originals = supertype['materials']
+            supertype['materials'] = list(originals)
+            for copy in range(2, self.copies + 1):
+                for material in originals:
+                    supertype['materials'].append(dict(material, id=f"{material['id']}-{copy}",
+                                                       name=f"{material['name']} (copy {copy})"))
+        return json.dumps(catalog, ensure_ascii=False)
+
+    def _materials_page(self):
+        def replicate(match):
+            prefix, href, middle, name, suffix = match.groups()
+            lines = [match.group(0)]
+            for copy in range(2, self.copies + 1):
+                lines.append(f"{prefix}{href}?copy={copy}{middle}{name} (copy {copy}){suffix}")
+            return "\n".join(lines)
+        return MENU_LEAF_RE.sub(replicate, self._read('sendcutsend', 'materials.html'))
+
+    def resolve(self, path):
+        """Return ``(kind, content type, body)`` for a request path, or None."""
+        path = path.split('?', 1)[0]
+        if path == OSHCUT_SHEET_PATH:
+            return 'page', 'text/html; charset=utf-8', self._read('oshcut', 'sheet.html')
+        if path == '/oshcut/api/catalog':
+            return 'api', 'application/json; charset=utf-8', self.catalog
+        if path == SENDCUTSEND_MATERIALS_PATH:
+            return 'page', 'text/html; charset=utf-8', self.materials_page
+        if path.startswith(SENDCUTSEND_MATERIALS_PATH):
+            slug = path[len(SENDCUTSEND_MATERIALS_PATH):].strip('/')
+            if re.fullmatch(r'[a-z0-9-]+', slug) and os.path.exists(
+                    os.path.join(self.fixtures_dir, 'sendcutsend', slug + '.html')):
+                return 'page', 'text/html; charset=utf-8', self._read('sendcutsend', slug + '.html')
+        return None
+
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        server = self.server
+        server.delay()
+        if server.should_fail():
+            server.record('failed')
+            if server.flaky_mode == 'reset':
+                # Обрыв соединения без ответа, как при сбросе на стороне сервера.
+                self.close_connection = True
+                self.connection.shutdown(socket.SHUT_RDWR)
+                return
+            self.send_plain(503, 'Service temporarily unavailable (injected)', {'Retry-After': '1'})
+            return
+        resolved = server.site.resolve(self.path)
+        if resolved is None:
+            server.record('not_found')
+            self.send_plain(404, 'Not found')
+            return
+        kind, content_type, text = resolved
+        # Абсолютные ссылки записанных страниц ведут обратно на этот сервер.
+        text = text.replace(RECORDED_SENDCUTSEND, f"http://{self.headers.get('Host')}/sendcutsend")
+        body = text.encode('utf-8')
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        if self.headers.get('If-None-Match') == etag:
+            server.record('not_modified')
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        server.record(kind)
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', server.site.last_modified)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_plain(self, status, text, headers=None):
+        body = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """Threaded server with injected latency and failures and per-kind request counts."""
+    daemon_threads = True
+
+    def __init__(self, address, site, latency_ms=0.0, jitter_ms=0.0, flaky=0.0, flaky_mode='status', seed=0,
+                 verbose=False):
+        super().__init__(address, FixtureRequestHandler)
+        self.site = site
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.flaky = flaky
+        self.flaky_mode = flaky_mode
+        self.verbose = verbose
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def delay(self):
+        if self.latency_ms or self.jitter_ms:
+            with self.lock:
+                ms = self.random.gauss(self.latency_ms, self.jitter_ms) if self.jitter_ms else self.latency_ms
+            time.sleep(max(0.0, ms) / 1000)
+
+    def should_fail(self):
+        if not self.flaky:
+            return False
+        with self.lock:
+            return self.random.random() < self.flaky
+
+    def record(self, kind):
+        with self.lock:
+            self.stats[kind] = self.stats.get(kind, 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.stats)
+
+
+def start_server(host='127.0.0.1', port=0, copies=1, **options):
+    """Start a fixture server on a daemon thread; returns it (``base_url``, ``shutdown()``)."""
+    server = FixtureServer((host, port), FixtureSite(copies=copies), **options)
+    threading.Thread(target=server.serve_forever, name='fixture-server', daemon=True).start()
+    return server
+
+
+def site_urls(base_url):
+    """``(oshcut, sendcutsend)`` base URLs for ``scrapper.set_base_urls``."""
+    return base_url + OSHCUT_SHEET_PATH, base_url + SENDCUTSEND_MATERIALS_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="mean added latency per request, ms")
+    parser.add_argument('--jitter', type=float, default=0.0, help="standard deviation of the latency, ms")
+    parser.add_argument('--flaky', type=float, default=0.0, help="probability that a request fails")
+    parser.add_argument('--flaky-mode', choices=('status', 'reset'), default='status')
+    parser.add_argument('--copies', type=int, default=1, help="list every material this many times")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    args = parser.parse_args()
+
+    server = FixtureServer((args.host, args.port), FixtureSite(copies=args.copies), latency_ms=args.latency,
+                           jitter_ms=args.jitter, flaky=args.flaky, flaky_mode=args.flaky_mode, seed=args.seed,
+                           verbose=args.verbose)
+    oshcut_url, sendcutsend_url = site_urls(server.base_url)
+    print(f"OSH Cut:     {oshcut_url}")
+    print(f"SendCutSend: {sendcutsend_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"requests: {server.snapshot()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,1124 +1,4225 @@
-import sys
-import sqlite3
-import subprocess
-import pkg_resources
-import threading
-import tkinter as tk
-from tkinter import scrolledtext, messagebox
-import webbrowser
-import os
-import time
-import logging
-import csv
-from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import (
-    NoSuchElementException, TimeoutException, StaleElementReferenceException,
-    ElementClickInterceptedException, WebDriverException, ElementNotInteractableException
-)
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-import pandas as pd
-
-def check_single_instance():
-    import ctypes
-    from ctypes import wintypes
-    import tkinter.messagebox as mb
-
-    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
-    CreateMutex = kernel32.CreateMutexW
-    CreateMutex.argtypes = (ctypes.c_void_p, wintypes.BOOL, wintypes.LPCWSTR)
-    CreateMutex.restype = wintypes.HANDLE
-
-    GetLastError = ctypes.get_last_error
-    ERROR_ALREADY_EXISTS = 183
-
-    mutex_name = "Global\\MyUniqueScraperMutex"
-
-    h_mutex = CreateMutex(None, False, mutex_name)
-    last_error = GetLastError()
-    if not h_mutex:
-        mb.showerror("Error", "Failed to create mutex for single instance.")
-        sys.exit(1)
-    if last_error == ERROR_ALREADY_EXISTS:
-        mb.showwarning("Warning", "Program is already running.")
-        sys.exit(0)
-
-def sort_column(tv, col, reverse):
-    l = [(tv.set(k, col), k) for k in tv.get_children('')]
-    try:
-        l.sort(key=lambda t: float(t[0]) if t[0] != "" else float('-inf'), reverse=reverse)
-    except ValueError:
-        l.sort(reverse=reverse)
-    for index, (val, k) in enumerate(l):
-        tv.move(k, '', index)
-    tv.heading(col, command=lambda: sort_column(tv, col, not reverse))
-
-
-# -------------------------------
-# Step 1: Automatic Dependency Installation
-# -------------------------------
-required = {
-    'selenium',
-    'webdriver-manager',
-    'beautifulsoup4',
-    'pandas'
-}
-installed = {pkg.key for pkg in pkg_resources.working_set}
-missing = required - installed
-if missing:
-    try:
-        subprocess.check_call([sys.executable, '-m', 'pip', 'install', *missing],
-                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    except subprocess.CalledProcessError as e:
-        print(f"Error installing packages: {e}")
-        sys.exit(1)
-
-# -------------------------------
-# Step 2: GUI Setup with Tkinter
-# -------------------------------
-class ScraperGUI:
-    def __init__(self, master):
-        self.master = master
-        master.title("Web Scraper")
-        master.geometry("800x600")
-        master.resizable(False, False)
-        
-        # Create Start Button
-        self.start_button = tk.Button(master, text="Start Scraping", command=self.start_scraping, width=20, height=2, bg="green", fg="white")
-        self.start_button.pack(pady=10)
-        
-        # Create View Results Button
-        self.view_button = tk.Button(master, text="View Results", command=self.view_results, width=20, height=2, bg="blue", fg="white")
-        self.view_button.pack(pady=10)
-        
-        # Create Export to Excel Button
-        self.export_button = tk.Button(master, text="Export to Excel", command=self.export_to_excel, width=20, height=2, bg="orange", fg="white")
-        self.export_button.pack(pady=10)
-
-        
-        # Create Scrolled Text for Logs
-        self.log_area = scrolledtext.ScrolledText(master, wrap=tk.WORD, width=95, height=25, state='disabled')
-        self.log_area.pack(padx=10, pady=10)
-        
-        # Initialize Logging
-        self.setup_logging()
-        
-    def setup_logging(self):
-        self.logger = logging.getLogger()
-        self.logger.setLevel(logging.INFO)
-        
-        # Create custom handler for Tkinter
-        self.gui_handler = GUIHandler(self.log_area)
-        self.gui_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-        self.logger.addHandler(self.gui_handler)
-        
-        # Also log to file
-        file_handler = logging.FileHandler("scraper.log")
-        file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-        self.logger.addHandler(file_handler)
-        
-    def start_scraping(self):
-        self.start_button.config(state='disabled')
-        self.logger.info("Starting the scraping process...")
-        threading.Thread(target=self.run_scraper, daemon=True).start()
-        
-    def run_scraper(self):
-        try:
-            main()
-            self.logger.info("Scraping process completed successfully.")
-            messagebox.showinfo("Success", "Scraping process completed successfully.")
-        except Exception as e:
-            self.logger.error(f"Scraping process terminated with an error: {e}")
-            messagebox.showerror("Error", f"Scraping process terminated with an error:\n{e}")
-        finally:
-            self.start_button.config(state='normal')
-    
-    def view_results(self):
-        # Получение данных из базы данных
-        try:
-            conn = sqlite3.connect('materials.db')
-            df = pd.read_sql_query("SELECT * FROM materials_combined", conn)
-            conn.close()
-        except Exception as e:
-            messagebox.showerror("Error", f"Error retrieving data: {e}")
-            return
-
-        top = tk.Toplevel(self.master)
-        top.title("Search Data")
-        from tkinter import ttk
-        import re
-
-        # Фрейм для полей поиска и фильтрации
-        search_frame = tk.Frame(top)
-        search_frame.pack(fill='x', padx=5, pady=5)
-
-        search_label = tk.Label(search_frame, text="Search:")
-        search_label.pack(side='left')
-
-        search_entry = tk.Entry(search_frame)
-        search_entry.pack(side='left', fill='x', expand=True, padx=5)
-        search_entry.bind("<KeyRelease>", lambda event: on_search())  # Быстрый поиск в реальном времени
-
-        col_label = tk.Label(search_frame, text=" in ")
-        col_label.pack(side='left')
-
-        # Выпадающий список для выбора столбца
-        col_combo = ttk.Combobox(search_frame, values=list(df.columns))
-        col_combo.pack(side='left')
-
-        val_label = tk.Label(search_frame, text=" equals ")
-        val_label.pack(side='left')
-
-        # Выпадающий список для выбора значения
-        val_combo = ttk.Combobox(search_frame, values=[])
-        val_combo.pack(side='left')
-
-        search_button = tk.Button(search_frame, text="Search")
-        search_button.pack(side='left')
-
-        tree = ttk.Treeview(top)
-        tree.pack(fill='both', expand=True)
-
-        tree["columns"] = list(df.columns)
-        tree["show"] = "headings"
-        for column in tree["columns"]:
-            tree.heading(column, text=column, command=lambda _col=column: sort_column(tree, _col, False))
-
-        def update_treeview(search_text="", column=None):
-            for item in tree.get_children():
-                tree.delete(item)
-            try:
-                pattern = re.compile(search_text, re.IGNORECASE)
-            except re.error:
-                pattern = None
-            if search_text and column and pattern:
-                filtered_df = df[df[column].astype(str).apply(lambda x: bool(pattern.search(x)))]
-            elif search_text and pattern:
-                filtered_df = df[df.apply(lambda row: any(pattern.search(str(val)) for val in row.values), axis=1)]
-            else:
-                filtered_df = df
-            for _, row in filtered_df.iterrows():
-                tree.insert("", "end", values=list(row))
-
-        def update_treeview_data(dataframe):
-            for item in tree.get_children():
-                tree.delete(item)
-            for _, row in dataframe.iterrows():
-                tree.insert("", "end", values=list(row))
-
-        # Первоначальное заполнение без фильтрации
-        update_treeview()
-
-        def on_search():
-            text = search_entry.get()
-            col = col_combo.get() if col_combo.get() in df.columns else None
-            val = val_combo.get() if val_combo.get() else None
-            # Если выбран столбец и значение, фильтровать по точному совпадению
-            if col and val:
-                filtered_df = df[df[col].astype(str) == str(val)]
-                update_treeview_data(filtered_df)
-            else:
-                update_treeview(text, col)
-
-        search_button.config(command=on_search)
-
-        def update_val_combo(event):
-            selected_col = col_combo.get()
-            if selected_col in df.columns:
-                unique_vals = df[selected_col].dropna().unique().tolist()
-                val_combo['values'] = unique_vals
-
-        col_combo.bind("<<ComboboxSelected>>", update_val_combo)
-
-
-
-
-
-            
-    def export_to_excel(self):
-        try:
-            conn = sqlite3.connect('materials.db')
-            df = pd.read_sql_query("SELECT * FROM materials_combined", conn)
-            conn.close()
-            df.to_excel('materials_combined.xlsx', index=False, engine='openpyxl')
-            messagebox.showinfo("Export", "Data exported to materials_combined.xlsx successfully.")
-            self.logger.info("Data exported to Excel.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to export data to Excel: {e}")
-            self.logger.error(f"Failed to export data to Excel: {e}")
-
-
-
-class GUIHandler(logging.Handler):
-    def __init__(self, text_widget):
-        super().__init__()
-        self.text_widget = text_widget
-        
-    def emit(self, record):
-        msg = self.format(record)
-        def append():
-            self.text_widget.config(state='normal')
-            self.text_widget.insert(tk.END, msg + '\n')
-            self.text_widget.see(tk.END)
-            self.text_widget.config(state='disabled')
-        self.text_widget.after(0, append)
-
-# -------------------------------
-# Step 3: Logging Configuration
-# -------------------------------
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("scraper.log"),
-    ]
-)
-for handler in logging.root.handlers[:]:
-    if isinstance(handler, logging.StreamHandler):
-        logging.root.removeHandler(handler)
-
-# -------------------------------
-# Helper Functions
-# -------------------------------
-def init_screenshot_folder():
-    today = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    folder_name = f"screenshots_{today}"
-    os.makedirs(folder_name, exist_ok=True)
-    return folder_name
-
-def setup_driver(screenshot_folder):
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_prefs = {"profile.default_content_setting_values": {"images": 2}}
-    chrome_options.add_experimental_option("prefs", chrome_prefs)
-    chrome_options.add_argument("--disable-extensions")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    try:
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        logging.info("Chrome WebDriver initialized successfully.")
-        return driver
-    except Exception as e:
-        logging.error(f"Failed to initialize Chrome WebDriver: {e}")
-        raise
-
-def save_screenshot(driver, screenshot_folder, filename):
-    try:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_filename = filename.replace("/", "_").replace("\\", "_").replace(":", "_") \
-                               .replace("*", "_").replace("?", "_").replace('"', '_') \
-                               .replace("<", "_").replace(">", "_").replace("|", "_")
-        filepath = os.path.join(screenshot_folder, f"{timestamp}_{safe_filename}")
-        driver.save_screenshot(filepath)
-        logging.info(f"Screenshot saved: {filepath}")
-    except Exception as e:
-        logging.error(f"Failed to save screenshot '{filename}': {e}")
-
-# -------------------------------
-# Функции для OSH Cut
-# -------------------------------
-def navigate_to_sheet_page(driver, screenshot_folder):
-    try:
-        SHEET_URL = "https://app.oshcut.com/catalog/sheet"
-        driver.get(SHEET_URL)
-        logging.info(f"Loaded page: {SHEET_URL}")
-        wait = WebDriverWait(driver, 60)
-        wait.until(EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'filterBoxHeader') and contains(text(), 'Material')]")))
-        logging.info("Categories loaded.")
-        time.sleep(2)
-    except TimeoutException:
-        logging.exception("Timeout while loading the 'Sheet' page.")
-        if driver:
-            save_screenshot(driver, screenshot_folder, 'navigate_to_sheet_timeout.png')
-        raise
-    except Exception as e:
-        logging.exception(f"Error loading 'Sheet' page: {e}")
-        if driver:
-            save_screenshot(driver, screenshot_folder, 'navigate_to_sheet_error.png')
-        raise
-
-def extract_categories(driver):
-    categories = []
-    try:
-        wait = WebDriverWait(driver, 60)
-        categories_xpath = "//div[contains(@class, 'supertype') and contains(@class, 'clickable')]"
-        category_elements = wait.until(EC.presence_of_all_elements_located((By.XPATH, categories_xpath)))
-        logging.info(f"Found {len(category_elements)} categories with 'supertype clickable' class.")
-        for elem in category_elements:
-            try:
-                cat_name_elem = elem.find_element(By.XPATH, ".//b[@class='header']")
-                cat_name = cat_name_elem.text.strip()
-                if cat_name:
-                    categories.append(cat_name)
-            except NoSuchElementException:
-                logging.warning("Failed to extract category name from element.")
-                continue
-        if not categories:
-            logging.warning("No categories found in the 'Material' filter.")
-    except TimeoutException:
-        logging.exception("Timeout while loading categories from the 'Material' filter.")
-    except Exception as e:
-        logging.exception(f"Error extracting categories: {e}")
-    return categories
-
-def extract_material_elements(driver, screenshot_folder):
-    material_elements = []
-    try:
-        wait = WebDriverWait(driver, 60)
-        SCROLL_PAUSE_TIME = 1.0
-        last_height = driver.execute_script("return document.body.scrollHeight")
-        while True:
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            logging.info("Scrolling down to load more materials...")
-            time.sleep(SCROLL_PAUSE_TIME)
-            new_height = driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                break
-            last_height = new_height
-        materials_xpath = "//div[contains(@class, 'materialType')]"
-        wait.until(EC.presence_of_all_elements_located((By.XPATH, materials_xpath)))
-        material_elements = driver.find_elements(By.XPATH, materials_xpath)
-        logging.info(f"Found {len(material_elements)} materials in the current category.")
-        if not material_elements:
-            save_screenshot(driver, screenshot_folder, 'no_materials_found.png')
-            logging.info("Screenshot saved: no_materials_found.png")
-        else:
-            time.sleep(2)
-    except TimeoutException:
-        logging.exception("Timeout while loading materials.")
-        save_screenshot(driver, screenshot_folder, 'timeout_materials.png')
-        logging.info("Screenshot saved: timeout_materials.png")
-    except WebDriverException as e:
-        logging.exception(f"Error extracting materials: {e}")
-        if "session deleted because of page crash" in str(e):
-            logging.error("Browser crashed. Attempting to restart the driver.")
-            raise
-        if driver:
-            save_screenshot(driver, screenshot_folder, 'extract_materials_error.png')
-            logging.info("Screenshot saved: extract_materials_error.png")
-    except Exception as e:
-        logging.exception(f"Error extracting materials: {e}")
-        if driver:
-            save_screenshot(driver, screenshot_folder, 'extract_materials_error.png')
-            logging.info("Screenshot saved: extract_materials_error.png")
-    return material_elements
-
-def safe_click(driver, element, max_retries=3):
-    retries = 0
-    while retries < max_retries:
-        try:
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", element)
-            time.sleep(0.5)
-            driver.execute_script("arguments[0].click();", element)
-            return
-        except ElementClickInterceptedException:
-            logging.warning("ElementClickInterceptedException: retrying click.")
-            try:
-                ActionChains(driver).move_to_element(element).click().perform()
-                return
-            except ElementClickInterceptedException:
-                logging.warning("Repeated ElementClickInterceptedException. Waiting before retrying.")
-                time.sleep(1)
-        except StaleElementReferenceException:
-            logging.exception("StaleElementReferenceException when clicking element. Retrying.")
-            retries += 1
-            time.sleep(1)
-        except ElementNotInteractableException:
-            logging.exception("ElementNotInteractableException when clicking element. Retrying.")
-            retries += 1
-            time.sleep(1)
-    logging.error("Failed to click the element after multiple attempts.")
-    raise ElementClickInterceptedException("Failed to click the element after multiple attempts.")
-
-def safe_click_with_retries(driver, element, screenshot_folder, csvfile, max_retries=5, delay=2):
-    retries = 0
-    while retries < max_retries:
-        try:
-            safe_click(driver, element)
-            return
-        except (ElementClickInterceptedException, ElementNotInteractableException, StaleElementReferenceException):
-            logging.warning(f"Attempt {retries+1} failed. Retrying in {delay} seconds...")
-            time.sleep(delay)
-            retries += 1
-    logging.error(f"Failed to click the element after {max_retries} attempts.")
-    raise ElementClickInterceptedException("Failed to click the element after multiple attempts.")
-
-def reset_filters_if_applied(driver, screenshot_folder, csvfile):
-    try:
-        wait = WebDriverWait(driver, 10)
-        active_filters = driver.find_elements(By.XPATH, "//span[@class='pill']")
-        if active_filters:
-            reset_filters(driver, screenshot_folder, csvfile)
-        else:
-            logging.info("No active filters. Reset not required.")
-    except Exception as e:
-        logging.exception(f"Error checking filters: {e}")
-
-def reset_filters(driver, screenshot_folder, csvfile):
-    try:
-        wait = WebDriverWait(driver, 30)
-        reset_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//span[contains(@class, 'filterReset')]")))
-        safe_click_with_retries(driver, reset_button, screenshot_folder, csvfile)
-        logging.info("Filters reset.")
-        wait.until(EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'filterBoxHeader') and contains(text(), 'Material')]")))
-        time.sleep(2)
-    except TimeoutException:
-        logging.exception("Timeout while resetting filters.")
-        save_screenshot(driver, screenshot_folder, 'timeout_reset_filters.png')
-        logging.info("Screenshot saved: timeout_reset_filters.png")
-    except WebDriverException as e:
-        logging.exception(f"Error resetting filters: {e}")
-        if "invalid session id" in str(e):
-            logging.error("Session invalid. Browser closed.")
-            raise
-        if driver:
-            save_screenshot(driver, screenshot_folder, 'reset_filters_error.png')
-            logging.info("Screenshot saved: reset_filters_error.png")
-    except Exception as e:
-        logging.exception(f"Error resetting filters: {e}")
-        if driver:
-            save_screenshot(driver, screenshot_folder, 'reset_filters_error.png')
-            logging.info("Screenshot saved: reset_filters_error.png")
-
-def close_modal(driver, screenshot_folder):
-    try:
-        wait = WebDriverWait(driver, 10)
-        close_buttons = driver.find_elements(By.XPATH, "//button[contains(text(), 'Close') or contains(text(), 'Закрыть') or contains(@class, 'close')]")
-        back_buttons = driver.find_elements(By.XPATH, "//button[contains(@class, 'btnTertiary') and contains(text(), 'Back to Catalog')]")
-        if close_buttons:
-            for close_button in close_buttons:
-                try:
-                    safe_click_with_retries(driver, close_button, screenshot_folder, None)
-                    logging.info("Modal window closed via 'Close' button.")
-                    time.sleep(2)
-                except Exception as e:
-                    logging.exception(f"Error closing modal via 'Close' button: {e}")
-        if back_buttons:
-            for back_button in back_buttons:
-                try:
-                    safe_click_with_retries(driver, back_button, screenshot_folder, None)
-                    logging.info("Clicked 'Back to Catalog' to return to the material list.")
-                    time.sleep(2)
-                except Exception as e:
-                    logging.exception(f"Error clicking 'Back to Catalog' button: {e}")
-        if not (close_buttons or back_buttons):
-            logging.warning("Modal window not found to close.")
-    except Exception as e:
-        logging.exception(f"Error closing modal windows: {e}")
-        save_screenshot(driver, screenshot_folder, f"close_modal_error_{int(time.time())}.png")
-
-def ensure_modal_closed(driver, screenshot_folder):
-    try:
-        modal_close_button = driver.find_element(By.XPATH, "//button[contains(text(), 'Close') or contains(@class, 'close') or contains(text(), 'Back to Catalog')]")
-        safe_click_with_retries(driver, modal_close_button, screenshot_folder, None)
-        logging.info("Modal window closed.")
-    except NoSuchElementException:
-        logging.info("Modal window already closed.")
-
-def return_to_material_list(driver, screenshot_folder):
-    try:
-        material_list_xpath = "//div[contains(@class, 'materialType')]"
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_all_elements_located((By.XPATH, material_list_xpath))
-        )
-        logging.info("Successfully returned to the material list.")
-    except TimeoutException:
-        logging.error("Failed to return to the material list.")
-        save_screenshot(driver, screenshot_folder, 'return_to_material_list_error.png')
-        raise
-
-def go_to_next_material(driver, current_category_name, processed_materials, screenshot_folder, csvfile):
-    try:
-        ensure_modal_closed(driver, screenshot_folder)
-        return_to_material_list(driver, screenshot_folder)
-        reset_filters_if_applied(driver, screenshot_folder, csvfile)
-        click_category(driver, current_category_name, screenshot_folder, csvfile)
-        material_elements = extract_material_elements(driver, screenshot_folder)
-        for material_element in material_elements:
-            mat_name = material_element.find_element(By.XPATH, ".//header").text.strip()
-            if mat_name not in processed_materials:
-                return mat_name
-        logging.info("All materials in the category have been processed.")
-        return None
-    except Exception as e:
-        logging.exception(f"Error navigating to the next material: {e}")
-        raise
-
-def click_category(driver, cat_name, screenshot_folder, csvfile):
-    wait = WebDriverWait(driver, 60)
-    category_xpath = f"//div[contains(@class, 'supertype') and contains(@class, 'clickable')]//b[@class='header' and normalize-space(text())='{cat_name}']/ancestor::div[contains(@class, 'supertype') and contains(@class, 'clickable')]"
-    try:
-        cat_elem = wait.until(EC.element_to_be_clickable((By.XPATH, category_xpath)))
-        logging.info(f"Category '{cat_name}' found and clickable.")
-        safe_click_with_retries(driver, cat_elem, screenshot_folder, csvfile)
-        logging.info(f"Category '{cat_name}' selected.")
-        time.sleep(2)
-    except TimeoutException:
-        logging.exception(f"Timeout while searching for category '{cat_name}'.")
-        save_screenshot(driver, screenshot_folder, f"click_category_timeout_{cat_name}_{int(time.time())}.png")
-        raise
-    except Exception as e:
-        logging.exception(f"Error clicking on category '{cat_name}': {e}")
-        save_screenshot(driver, screenshot_folder, f"click_category_error_{cat_name}_{int(time.time())}.png")
-        raise
-
-def click_material_name(driver, mat_name, screenshot_folder, csvfile):
-    try:
-        mat_element_xpath = f"//div[contains(@class, 'materialType')]//header[contains(text(), '{mat_name}')]/ancestor::div[contains(@class, 'materialType')]"
-        mat_element = WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.XPATH, mat_element_xpath))
-        )
-        header_element = mat_element.find_element(By.XPATH, ".//header")
-        safe_click_with_retries(driver, header_element, screenshot_folder, csvfile)
-        logging.info(f"Material name '{mat_name}' expanded.")
-        time.sleep(5)
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
-        wait = WebDriverWait(driver, 30)
-        wait.until(EC.visibility_of_element_located((By.XPATH, f"{mat_element_xpath}//button[contains(text(), 'More info')]")))
-        logging.info(f"'More info...' buttons for material '{mat_name}' are now visible.")
-    except TimeoutException:
-        logging.error("Timeout while expanding the thickness list.")
-        save_screenshot(driver, screenshot_folder, f"click_material_name_timeout_{mat_name}_{int(time.time())}.png")
-        raise
-    except NoSuchElementException:
-        logging.error("Material name not found for clicking.")
-        save_screenshot(driver, screenshot_folder, f"click_material_name_missing_{mat_name}_{int(time.time())}.png")
-        raise
-    except Exception as e:
-        logging.exception(f"Error clicking on material name '{mat_name}': {e}")
-        save_screenshot(driver, screenshot_folder, f"click_material_name_error_{mat_name}_{int(time.time())}.png")
-        raise
-
-def click_more_info(driver, mat_name, btn_idx, more_info_button, screenshot_folder, csvfile):
-    try:
-        safe_click_with_retries(driver, more_info_button, screenshot_folder, csvfile)
-        logging.info(f"Clicked 'More info...' button {btn_idx} for material '{mat_name}'.")
-        wait = WebDriverWait(driver, 60)
-        wait.until(EC.visibility_of_element_located((By.XPATH, "//div[contains(@class, 'materialDescription')]")))
-        logging.info("Modal window 'More info...' appeared.")
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(3)
-    except TimeoutException:
-        logging.error(f"Timeout while opening modal window 'More info...' for material '{mat_name}'.")
-        save_screenshot(driver, screenshot_folder, f"more_info_modal_timeout_{mat_name}_{btn_idx}_{int(time.time())}.png")
-        raise
-    except Exception as e:
-        logging.exception(f"Error clicking 'More info...' button for material '{mat_name}': {e}")
-        save_screenshot(driver, screenshot_folder, f"more_info_click_error_{mat_name}_{btn_idx}_{int(time.time())}.png")
-        raise
-
-def extract_material_details(driver, category):
-    details = {
-        'Thickness Name': '',
-        'K-factor': '',
-        'Minimum Flange Support': '',
-        'Bend Deduction': '',
-        'Maximum Bend Length': ''
-    }
-    try:
-        wait = WebDriverWait(driver, 60)
-        thickness_xpath = "//div[@class='materialActionBar']//div[@class='subHeader']"
-        thickness_element = wait.until(EC.presence_of_element_located((By.XPATH, thickness_xpath)))
-        thickness_text = thickness_element.text.strip()
-        if '"' in thickness_text:
-            thickness_name = thickness_text.split('"')[0] + '"'
-        else:
-            thickness_name = thickness_text
-        details['Thickness Name'] = thickness_name
-        logging.info(f"Extracted thickness name: {details['Thickness Name']} for category '{category}'")
-        k_factor_xpath = """
-        //table[contains(@class, 'metalProperties')]//tr[
-            td[normalize-space(text())='K-factor'] 
-            or td[normalize-space(text())='K-фактор']
-        ]/td[2]
-        """
-        try:
-            k_factor_element = driver.find_element(By.XPATH, k_factor_xpath)
-            details['K-factor'] = k_factor_element.text.strip()
-            logging.info(f"Extracted K-factor: {details['K-factor']} for category '{category}'")
-        except NoSuchElementException:
-            logging.warning(f"K-factor not found for category '{category}'.")
-            details['K-factor'] = 'Not Found'
-        tables = {
-            'Minimum Flange Support': "//table[contains(@class, 'MaterialBendTable') and (.//td[contains(text(), 'Flange') or contains(text(), 'Фланца')])]",
-            'Bend Deduction': "//table[contains(@class, 'MaterialBendTable') and (.//td[contains(text(), 'Bend Deduction') or contains(text(), 'Уменьшение изгиба')])]",
-            'Maximum Bend Length': "//table[contains(@class, 'MaterialBendTable') and (.//td[contains(text(), 'Maximum Bend Length') or contains(text(), 'Максимальная длина изгиба')])]"
-        }
-        for key, xpath in tables.items():
-            try:
-                table = driver.find_element(By.XPATH, xpath)
-                details[key] = extract_table_data(table)
-                logging.info(f"Extracted data for {key} in category '{category}'.")
-            except NoSuchElementException:
-                logging.warning(f"Table {key} not found for category '{category}'.")
-                details[key] = 'Not Found'
-        all_table_titles = driver.find_elements(By.XPATH, "//table[contains(@class, 'MaterialBendTable')]//td[@class='tableTitle']")
-        for table_title in all_table_titles:
-            logging.info(f"Found table title: {table_title.text.strip()} for category '{category}'")
-    except TimeoutException:
-        logging.exception(f"Timeout while extracting material details for category '{category}'.")
-    except Exception as e:
-        logging.exception(f"Error extracting material details for category '{category}': {e}")
-    return details
-
-def extract_table_data(table_element):
-    data = []
-    try:
-        rows = table_element.find_elements(By.XPATH, ".//tr")
-        for row in rows:
-            cols = row.find_elements(By.XPATH, ".//td")
-            cols_text = [col.text.strip() for col in cols]
-            if len(cols_text) >= 2:
-                data.append(" | ".join(cols_text))
-            else:
-                data.append(" | ".join(cols_text))
-    except Exception as e:
-        logging.error(f"Error extracting data from table: {e}")
-    return "; ".join(data)
-
-def parse_and_collect_all_categories(driver, screenshot_folder):
-    processed_materials = set()
-    categories = extract_categories(driver)
-    all_data = []
-    if not categories:
-        logging.warning("No categories found.")
-        return all_data
-
-    logging.info(f"Extracted categories: {categories}")
-    for cat_idx, cat_name in enumerate(categories, start=1):
-        logging.info(f"Processing category {cat_idx}/{len(categories)}: {cat_name}")
-        try:
-            click_category(driver, cat_name, screenshot_folder, None)
-            while True:
-                mat_name = go_to_next_material(driver, cat_name, processed_materials, screenshot_folder, None)
-                if not mat_name:
-                    break
-                logging.info(f"Processing material: {mat_name}")
-                try:
-                    click_material_name(driver, mat_name, screenshot_folder, None)
-                    more_info_buttons = driver.find_elements(By.XPATH, f"//header[contains(text(), '{mat_name}')]/ancestor::div[contains(@class, 'materialType')]//button[contains(text(), 'More info')]")
-                    for btn_idx, more_info_button in enumerate(more_info_buttons):
-                        try:
-                            click_more_info(driver, mat_name, btn_idx, more_info_button, screenshot_folder, None)
-                            details = extract_material_details(driver, cat_name)
-                            all_data.append({
-                                'Category': cat_name,
-                                'Material Name': mat_name,
-                                'Thickness Name': details.get('Thickness Name', ''),
-                                'K-factor': details.get('K-factor', ''),
-                                'Minimum Flange Support': details.get('Minimum Flange Support', ''),
-                                'Bend Deduction': details.get('Bend Deduction', ''),
-                                'Maximum Bend Length': details.get('Maximum Bend Length', '')
-                            })
-                            logging.info(f"Data collected for material '{mat_name}'.")
-                            close_modal(driver, screenshot_folder)
-                        except Exception as e:
-                            logging.exception(f"Error processing 'More info...' button {btn_idx + 1} for material '{mat_name}': {e}")
-                            close_modal(driver, screenshot_folder)
-                            continue
-                    processed_materials.add(mat_name)
-                    logging.info(f"Completed processing material '{mat_name}'.")
-                except Exception as e:
-                    logging.exception(f"Error processing material '{mat_name}': {e}")
-                    save_screenshot(driver, screenshot_folder, f"error_material_{mat_name}.png")
-                    continue
-            logging.info(f"Completed processing category '{cat_name}'.")
-            reset_filters_if_applied(driver, screenshot_folder, None)
-        except Exception as e:
-            logging.exception(f"Error processing category '{cat_name}': {e}")
-            reset_filters_if_applied(driver, screenshot_folder, None)
-            continue
-    return all_data
-
-
-def parse_oshcut():
-    screenshot_folder = init_screenshot_folder()
-    logging.info(f"Screenshot folder created: {screenshot_folder}")
-    driver = None
-    df_oshcut = pd.DataFrame()
-    try:
-        driver = setup_driver(screenshot_folder)
-        navigate_to_sheet_page(driver, screenshot_folder)
-        data = parse_and_collect_all_categories(driver, screenshot_folder)
-        df_oshcut = pd.DataFrame(data)
-        df_oshcut['Source'] = 'OSH Cut'
-    except Exception as e:
-        logging.error(f"Error during OSH Cut parsing: {e}")
-        df_oshcut = pd.DataFrame()
-    finally:
-        if driver:
-            try:
-                save_screenshot(driver, screenshot_folder, 'final_screenshot.png')
-            except Exception as e:
-                logging.error(f"Failed to save final screenshot: {e}")
-            driver.quit()
-            logging.info("WebDriver closed.")
-    return df_oshcut
-
-
-# -------------------------------
-# Новый функционал: Парсинг с сайта SendCutSend
-# -------------------------------
-def scroll_to_bottom(driver, pause_time=2):
-    last_height = driver.execute_script("return document.body.scrollHeight")
-    while True:
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(pause_time)
-        new_height = driver.execute_script("return document.body.scrollHeight")
-        if new_height == last_height:
-            break
-        last_height = new_height
-    logging.info("Reached bottom of the page.")
-
-def analyze_debug_page():
-    try:
-        with open('debug_page.html', 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        soup = BeautifulSoup(html_content, 'html.parser')
-        error_messages = [
-            "Access Denied", "403 Forbidden", "404 Not Found", "Please complete the CAPTCHA",
-            "Our systems have detected unusual traffic", "Error", "This page isn't working",
-            "We're sorry, but something went wrong", "You have been blocked", "Доступ запрещен",
-            "Страница не найдена", "Ошибка", "Вы были заблокированы", "Cloudflare"
-        ]
-        page_text = soup.get_text(separator=' ').strip()
-        found_error = False
-        for error_msg in error_messages:
-            if error_msg.lower() in page_text.lower():
-                logging.error(f"Error message found on page: '{error_msg}'")
-                found_error = True
-                break
-        if not found_error:
-            logging.info("No explicit error messages found on the page.")
-    except Exception as e:
-        logging.error(f"Error analyzing debug_page.html: {e}")
-
-def get_subcategory_links(driver):
-    try:
-        menu = driver.find_element(By.ID, "menu-1-711fca")
-        categories = menu.find_elements(By.CSS_SELECTOR, 'li.menu-item-has-children')
-        logging.info(f"Found {len(categories)} material categories.")
-        subcategory_links = []
-        for category in categories:
-            try:
-                category_link = category.find_element(By.CSS_SELECTOR, 'a')
-                category_name = category_link.text.strip().title()
-                logging.info(f"Processing category: {category_name}")
-                action = ActionChains(driver)
-                action.move_to_element(category_link).perform()
-                time.sleep(1)
-                submenu = category.find_element(By.CSS_SELECTOR, 'ul.sub-menu')
-                sublinks = submenu.find_elements(By.CSS_SELECTOR, 'li a')
-                logging.info(f"Found {len(sublinks)} materials in category '{category_name}'")
-                for sublink in sublinks:
-                    href = sublink.get_attribute('href')
-                    material_name = sublink.get_attribute('textContent').strip().title()
-                    logging.info(f"Found material: {material_name} - {href}")
-                    if href:
-                        subcategory_links.append((category_name, material_name, href))
-            except Exception as e:
-                logging.error(f"Error processing category: {e}")
-                continue
-        logging.info(f"Total materials found across all categories: {len(subcategory_links)}")
-        return subcategory_links
-    except Exception as e:
-        logging.error(f"Error retrieving categories and subcategories: {e}")
-        driver.save_screenshot('metals_menu_error.png')
-        logging.info("Screenshot saved as metals_menu_error.png.")
-        analyze_debug_page()
-        return []
-
-def scrape_subcategory(driver, category_name, material_name, url):
-    try:
-        logging.info(f"Loading subcategory: {url}")
-        driver.get(url)
-        WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        logging.info("Scrolling to bottom of the page to load all content.")
-        scroll_to_bottom(driver)
-        time.sleep(2)
-        driver.execute_script("window.scrollTo(0, 0);")
-        time.sleep(1)
-    except Exception as e:
-        logging.error(f"Error loading subcategory {url}: {e}")
-        driver.save_screenshot('subcategory_generic_error.png')
-        logging.info("Screenshot saved as subcategory_generic_error.png.")
-        return []
-    data_list = []
-    logging.info(f"Parsing material: {material_name}")
-    try:
-        try:
-            tabs_content = driver.find_element(By.CSS_SELECTOR, "div.e-n-tabs-content")
-            logging.info("Found div with class 'e-n-tabs-content'.")
-        except Exception as e:
-            logging.error(f"Could not find div 'e-n-tabs-content' for material '{material_name}': {e}")
-            driver.save_screenshot('tabs_content_error.png')
-            logging.info("Screenshot saved as tabs_content_error.png.")
-            return []
-        try:
-            tabs_heading = driver.find_element(By.CSS_SELECTOR, "div.e-n-tabs-heading")
-            tab_buttons = tabs_heading.find_elements(By.CSS_SELECTOR, 'button.e-n-tab-title')
-            thickness_mapping = {}
-            for button in tab_buttons:
-                thickness_text = button.find_element(By.CSS_SELECTOR, 'span.e-n-tab-title-text').text.strip()
-                if '"' in thickness_text:
-                    thickness = thickness_text.replace('"', '').strip()
-                    aria_controls = button.get_attribute('aria-controls')
-                    if aria_controls:
-                        thickness_mapping[aria_controls] = thickness
-            logging.info(f"Extracted thicknesses (inches only): {thickness_mapping}")
-        except Exception as e:
-            logging.error(f"Error extracting thicknesses for '{material_name}': {e}")
-            driver.save_screenshot('thickness_extraction_error.png')
-            logging.info("Screenshot saved as thickness_extraction_error.png.")
-            thickness_mapping = {}
-        if not thickness_mapping:
-            logging.warning(f"No thickness found via tabs for '{material_name}'. Attempting table extraction.")
-            try:
-                tables = tabs_content.find_elements(By.TAG_NAME, 'table')
-                logging.info(f"Found {len(tables)} spec tables for '{material_name}'.")
-                for table in tables:
-                    table_html = table.get_attribute('outerHTML')
-                    soup = BeautifulSoup(table_html, 'html.parser')
-                    parsed_table = soup.find('table')
-                    if not parsed_table:
-                        continue
-                    rows = parsed_table.find_all('tr')
-                    data = {
-                        "Category": category_name,
-                        "Material Name": material_name,
-                        "Thickness": "",
-                        "Effective bend radius @90°": "",
-                        "K factor": "",
-                        "Gauge": ""
-                    }
-                    thickness_is_inches = False
-                    for row in rows:
-                        cols = row.find_all(['th', 'td'])
-                        if len(cols) != 2:
-                            continue
-                        key = cols[0].get_text(strip=True).lower()
-                        value = cols[1].get_text(strip=True)
-                        if 'advertised thickness' in key:
-                            if '"' in value:
-                                data["Thickness"] = value.replace('"', '').strip()
-                                thickness_is_inches = True
-                        elif 'effective bend radius' in key:
-                            data["Effective bend radius @90°"] = value.replace('"', '').strip()
-                        elif 'k factor' in key:
-                            data["K factor"] = value.replace('"', '').strip()
-                        elif 'gauge' in key:
-                            data["Gauge"] = value.replace('"', '').strip()
-                    if data["Thickness"] and thickness_is_inches:
-                        logging.info(f"Extracted data for {material_name} (thickness {data['Thickness']}\"): {data}")
-                        data_list.append(data)
-                    else:
-                        if data["Thickness"]:
-                            logging.warning(f"Thickness not in inches for '{material_name}'. Skipping value {data['Thickness']}.")
-                        else:
-                            logging.warning(f"'Advertised Thickness' not found in table for '{material_name}'.")
-            except Exception as e:
-                logging.error(f"Error extracting thickness from tables for '{material_name}': {e}")
-                return data_list
-        else:
-            try:
-                content_divs = tabs_content.find_elements(By.CSS_SELECTOR, 'div[id^="e-n-tab-content-"]')
-                logging.info(f"Found {len(content_divs)} content divs for '{material_name}'.")
-                for content_div in content_divs:
-                    content_id = content_div.get_attribute('id')
-                    thickness = thickness_mapping.get(content_id, "Unknown")
-                    if thickness == "Unknown":
-                        logging.warning(f"Thickness undefined for content_id {content_id}. Skipping.")
-                        continue
-                    tables = content_div.find_elements(By.TAG_NAME, 'table')
-                    logging.info(f"Found {len(tables)} spec tables for thickness {thickness}\".")
-                    if not tables:
-                        logging.warning(f"No spec tables found for '{material_name}' thickness '{thickness}'.")
-                        continue
-                    for table in tables:
-                        table_html = table.get_attribute('outerHTML')
-                        soup = BeautifulSoup(table_html, 'html.parser')
-                        parsed_table = soup.find('table')
-                        if not parsed_table:
-                            continue
-                        rows = parsed_table.find_all('tr')
-                        data = {
-                            "Category": category_name,
-                            "Material Name": material_name,
-                            "Thickness": thickness,
-                            "Effective bend radius @90°": "",
-                            "K factor": "",
-                            "Gauge": ""
-                        }
-                        for row in rows:
-                            cols = row.find_all(['th', 'td'])
-                            if len(cols) != 2:
-                                continue
-                            key = cols[0].get_text(strip=True).lower()
-                            value = cols[1].get_text(strip=True)
-                            if 'effective bend radius' in key:
-                                data["Effective bend radius @90°"] = value.replace('"', '').strip()
-                            elif 'k factor' in key:
-                                data["K factor"] = value.replace('"', '').strip()
-                            elif 'gauge' in key:
-                                data["Gauge"] = value.replace('"', '').strip()
-                        logging.info(f"Extracted data for {material_name} (thickness {thickness}\"): {data}")
-                        data_list.append(data)
-            except Exception as e:
-                logging.error(f"Error processing tables with thicknesses for '{material_name}': {e}")
-    except Exception as e:
-        logging.error(f"Error processing material '{material_name}': {e}")
-        driver.save_screenshot('material_processing_error.png')
-        logging.info("Screenshot saved as material_processing_error.png.")
-    if not data_list:
-        data = {
-            "Category": category_name,
-            "Material Name": material_name,
-            "Thickness": "N/A",
-            "Effective bend radius @90°": "",
-            "K factor": "",
-            "Gauge": ""
-        }
-        logging.info(f"Extracted data for {material_name} (thickness N/A): {data}")
-        data_list.append(data)
-    return data_list
-
-def scrape_materials_page():
-    url = "https://sendcutsend.com/materials/"
-    logging.info(f"Navigating to main page: {url}")
-    screenshot_folder = init_screenshot_folder()
-    driver = setup_driver(screenshot_folder)
-    driver.get(url)
-    try:
-        WebDriverWait(driver, 60).until(
-            EC.presence_of_element_located((By.ID, "menu-1-711fca"))
-        )
-        logging.info("Main page loaded successfully.")
-    except Exception as e:
-        logging.error(f"Error loading main page: {e}")
-        with open('debug_page.html', 'w', encoding='utf-8') as f:
-            f.write(driver.page_source)
-        logging.info("Page HTML saved to debug_page.html for debugging.")
-        driver.save_screenshot('main_page_error.png')
-        logging.info("Screenshot saved as main_page_error.png.")
-        analyze_debug_page()
-        driver.quit()
-        return []
-    subcategory_links = get_subcategory_links(driver)
-    if not subcategory_links:
-        logging.error("No subcategories to process.")
-        driver.quit()
-        return []
-    all_data = []
-    for idx, (category_name, material_name, sub_url) in enumerate(subcategory_links):
-        logging.info(f"Processing subcategory [{idx+1}/{len(subcategory_links)}]: {sub_url}")
-        data = scrape_subcategory(driver, category_name, material_name, sub_url)
-        all_data.extend(data)
-        time.sleep(1)
-    driver.quit()
-    return all_data
-
-# -------------------------------
-# Основная функция main
-# -------------------------------
-def main():
-    # Парсинг данных с OSH Cut
-    df_oshcut = pd.DataFrame()
-    try:
-        df_oshcut = parse_oshcut()
-        if df_oshcut.empty:
-            logging.warning("No data parsed from OSH Cut.")
-    except Exception as e:
-        logging.error(f"Error parsing OSH Cut data: {e}")
-
-    # Парсинг данных с SendCutSend
-    df_sendcutsend = pd.DataFrame()
-    try:
-        sendcutsend_data = scrape_materials_page()
-        if sendcutsend_data:
-            df_sendcutsend = pd.DataFrame(sendcutsend_data)
-            string_columns = ["Category", "Material Name", "Gauge"]
-            for col in string_columns:
-                if col in df_sendcutsend.columns:
-                    df_sendcutsend[col] = df_sendcutsend[col].str.replace('"', '').str.strip()
-            specific_columns = ["Effective bend radius @90°", "K factor"]
-            for col in specific_columns:
-                if col in df_sendcutsend.columns:
-                    df_sendcutsend[col] = df_sendcutsend[col].astype(str).str.replace('"', '').str.strip()
-            numeric_columns = ["Thickness", "Effective bend radius @90°", "K factor"]
-            for col in numeric_columns:
-                if col in df_sendcutsend.columns:
-                    df_sendcutsend[col] = pd.to_numeric(df_sendcutsend[col], errors='coerce')
-            for col in string_columns:
-                if col in df_sendcutsend.columns:
-                    df_sendcutsend[col] = df_sendcutsend[col].fillna('')
-            df_sendcutsend['Source'] = 'SendCutSend'
-        else:
-            logging.error("No data from SendCutSend to process.")
-    except Exception as e:
-        logging.error(f"Error parsing SendCutSend data: {e}")
-
-    # Объединение данных и сохранение в SQLite и экспорт в Excel
-    if not df_oshcut.empty or not df_sendcutsend.empty:
-        combined_frames = []
-        if not df_oshcut.empty:
-            combined_frames.append(df_oshcut)
-        if not df_sendcutsend.empty:
-            combined_frames.append(df_sendcutsend)
-        df_combined = pd.concat(combined_frames, ignore_index=True)
-
-        # Сравнение с предыдущими данными
-        conn = sqlite3.connect('materials.db')
-        try:
-            old_df = pd.read_sql_query("SELECT * FROM materials_combined", conn)
-        except Exception:
-            old_df = pd.DataFrame()
-        if not old_df.empty:
-            # Найти новые строки, которых нет в старых данных
-            new_rows = df_combined.merge(old_df.drop_duplicates(), how='left', indicator=True).loc[lambda x: x['_merge'] == 'left_only']
-            if not new_rows.empty:
-                logging.info(f"New changes found: {len(new_rows)} new rows")
-                messagebox.showinfo("New Changes", f"{len(new_rows)} new rows found in the latest parsing.")
-            else:
-                logging.info("No new changes found.")
-        else:
-            logging.info("No previous data to compare for changes.")
-        conn.close()
-
-        # Сохранение объединенных данных в SQLite
-        conn = sqlite3.connect('materials.db')
-        df_combined.to_sql('materials_combined', conn, if_exists='replace', index=False)
-        conn.close()
-        logging.info("Combined data saved to SQLite database.")
-
-        # Экспорт объединенных данных в Excel
-        df_combined.to_excel('materials_combined.xlsx', index=False, engine='openpyxl')
-        logging.info("Combined data exported to Excel.")
-    else:
-        logging.error("No data to combine.")
-
-
-
-
-if __name__ == "__main__":
-    check_single_instance()
-
-    # Проверка test-mode:
-    if "--test" in sys.argv:
-        print("Running test mode. Exiting.")
-        sys.exit(0)
-
-    root = tk.Tk()
-    gui = ScraperGUI(root)
-    root.mainloop()
-
+import sys
+import argparse
+import sqlite3
+import subprocess
+import threading
+import queue
+import webbrowser
+import os
+import re
+import time
+import logging
+import csv
+import json
+import atexit
+import base64
+import functools
+import bisect
+import hashlib
+import gzip
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.parse import urljoin, urlparse
+from datetime import datetime
+
+# Selenium, webdriver-manager, BeautifulSoup, pandas and requests are imported
+# on first use by load_scraping_modules()/load_pandas(), so the GUI and the
+# command line come up without paying for them.
+webdriver = Options = Service = ChromeDriverManager = None
+NoSuchElementException = TimeoutException = StaleElementReferenceException = None
+ElementClickInterceptedException = WebDriverException = ElementNotInteractableException = None
+SessionNotCreatedException = None
+By = WebDriverWait = EC = ActionChains = None
+BeautifulSoup = None
+pd = None
+requests = None
+# Tkinter is imported by load_gui_modules() only when the window is shown:
+# headless, scheduled and replay runs work on servers without Tk.
+tk = scrolledtext = messagebox = ttk = filedialog = None
+
+INSTANCE_LOCK_FILE = os.path.join(tempfile.gettempdir(), 'scrapper.lock')
+_instance_lock = None
+
+def acquire_instance_lock():
+    """Return True if no other instance holds the lock (mutex on Windows, flock elsewhere)."""
+    global _instance_lock
+    if os.name == 'nt':
+        import ctypes
+        from ctypes import wintypes
+
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        CreateMutex = kernel32.CreateMutexW
+        CreateMutex.argtypes = (ctypes.c_void_p, wintypes.BOOL, wintypes.LPCWSTR)
+        CreateMutex.restype = wintypes.HANDLE
+
+        GetLastError = ctypes.get_last_error
+        ERROR_ALREADY_EXISTS = 183
+
+        mutex_name = "Global\\MyUniqueScraperMutex"
+
+        h_mutex = CreateMutex(None, False, mutex_name)
+        last_error = GetLastError()
+        if not h_mutex:
+            raise OSError("Failed to create mutex for single instance.")
+        _instance_lock = h_mutex
+        return last_error != ERROR_ALREADY_EXISTS
+    import fcntl
+    lock_file = open(INSTANCE_LOCK_FILE, 'a')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return False
+    _instance_lock = lock_file
+    return True
+
+def check_single_instance(headless=False):
+    try:
+        is_single = acquire_instance_lock()
+    except OSError as e:
+        if headless:
+            logging.error(f"Failed to acquire the single-instance lock: {e}")
+        else:
+            messagebox.showerror("Error", "Failed to create mutex for single instance.")
+        sys.exit(1)
+    if not is_single:
+        if headless:
+            logging.warning("Program is already running.")
+        else:
+            messagebox.showwarning("Warning", "Program is already running.")
+        sys.exit(0)
+
+# -------------------------------
+# Step 1: Automatic Dependency Installation (on first use, result cached)
+# -------------------------------
+# import name -> pip requirement
+required = {
+    'selenium': 'selenium',
+    'webdriver_manager': 'webdriver-manager',
+    'bs4': 'beautifulsoup4',
+    'pandas': 'pandas',
+    'requests': 'requests',
+    'openpyxl': 'openpyxl',
+}
+DEPENDENCY_CACHE_FILE = '.scrapper_deps.json'
+_modules_lock = threading.Lock()
+
+def ensure_dependencies():
+    """Install missing requirements; a successful check is cached per interpreter."""
+    if getattr(sys, 'frozen', False):
+        return
+    fingerprint = {'python': sys.executable, 'version': sys.version, 'required': sorted(required.values())}
+    try:
+        with open(DEPENDENCY_CACHE_FILE, 'r', encoding='utf-8') as f:
+            if json.load(f) == fingerprint:
+                return
+    except (OSError, ValueError):
+        pass
+    import importlib.util
+    missing = [package for module, package in required.items() if importlib.util.find_spec(module) is None]
+    if missing:
+        try:
+            subprocess.check_call([sys.executable, '-m', 'pip', 'install', *missing],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Error installing packages: {e}")
+    try:
+        with open(DEPENDENCY_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(fingerprint, f)
+    except OSError:
+        pass
+
+def load_pandas():
+    global pd
+    if pd is not None:
+        return
+    with _modules_lock:
+        if pd is None:
+            ensure_dependencies()
+            import pandas as pd
+
+def load_gui_modules():
+    """Import tkinter on first use (GUI only)."""
+    global tk, scrolledtext, messagebox, ttk, filedialog
+    if tk is not None:
+        return
+    from tkinter import scrolledtext, messagebox, ttk, filedialog
+    # Assigned last: the fast-path check above relies on it.
+    import tkinter as tk
+
+def load_scraping_modules():
+    """Import the browser, HTTP and parsing dependencies on first use."""
+    global webdriver, Options, Service, ChromeDriverManager, By, WebDriverWait, EC, ActionChains
+    global NoSuchElementException, TimeoutException, StaleElementReferenceException
+    global ElementClickInterceptedException, WebDriverException, ElementNotInteractableException
+    global SessionNotCreatedException, BeautifulSoup, requests
+    load_pandas()
+    if webdriver is not None:
+        return
+    with _modules_lock:
+        if webdriver is not None:
+            return
+        import requests
+        from bs4 import BeautifulSoup
+        from selenium.webdriver.chrome.options import Options
+        from selenium.common.exceptions import (
+            NoSuchElementException, TimeoutException, StaleElementReferenceException,
+            ElementClickInterceptedException, WebDriverException, ElementNotInteractableException,
+            SessionNotCreatedException
+        )
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.common.action_chains import ActionChains
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+        # Assigned last: the fast-path check above relies on it.
+        from selenium import webdriver
+
+# -------------------------------
+# Results view: rows stay in SQLite, the grid renders a window of them
+# -------------------------------
+class ResultsSource:
+    """A filtered, ordered view over the materials table, read a window at a time.
+
+    Rows are not loaded up front. The unfiltered, unsorted view pages
+    through the table by ``row_id`` (keyset after the first block, OFFSET
+    for jumps); searching, filtering and sorting keep only the ``row_id``s
+    of the view, in order, and fetch the visible rows by id. Fetched rows
+    are cached in blocks of ``RESULTS_BLOCK_ROWS``, the most recent
+    ``RESULTS_CACHED_BLOCKS`` of the current view. Text search goes through
+    the FTS5 index and keeps its ranking unless a column is sorted.
+    """
+    def __init__(self, conn, fts=False):
+        self.conn = conn
+        self.fts = fts
+        self.columns = list(MATERIALS_COLUMNS)
+        self._select = (f"SELECT {MATERIALS_ROW_ID}, {', '.join(quote_identifier(c) for c in self.columns)} "
+                        f"FROM {quote_identifier(MATERIALS_TABLE)}")
+        self.total = conn.execute(f"SELECT COUNT(*) FROM {quote_identifier(MATERIALS_TABLE)}").fetchone()[0]
+        self.matches = None
+        self.truncated = False
+        self.view = None
+        self._sorted_by = None
+        # (column, reverse) -> row_ids of the whole table in that order
+        self._permutations = {}
+        self._filled_counts = {}
+        # block index -> (rows, last row_id) of the current view
+        self._blocks = OrderedDict()
+
+    @classmethod
+    def from_db(cls, db_path=None):
+        conn = sqlite3.connect(db_path or MATERIALS_DB)
+        try:
+            ensure_materials_schema(conn)
+            fts = create_materials_fts(conn)
+        except Exception:
+            conn.close()
+            raise
+        return cls(conn, fts)
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        return self.total if self.view is None else len(self.view)
+
+    def page(self, start, stop):
+        stop = min(stop, len(self))
+        if start >= stop:
+            return []
+        first, last = start // RESULTS_BLOCK_ROWS, (stop - 1) // RESULTS_BLOCK_ROWS
+        rows = []
+        for block in range(first, last + 1):
+            rows.extend(self._block(block))
+        offset = first * RESULTS_BLOCK_ROWS
+        return rows[start - offset:stop - offset]
+
+    def _block(self, block):
+        if block in self._blocks:
+            self._blocks.move_to_end(block)
+            return self._blocks[block][0]
+        start = block * RESULTS_BLOCK_ROWS
+        if self.view is None:
+            previous = self._blocks.get(block - 1)
+            if previous is not None and previous[1] is not None:
+                # Keyset: следующий блок продолжается после последнего row_id предыдущего.
+                cursor = self.conn.execute(f"{self._select} WHERE {MATERIALS_ROW_ID} > ? "
+                                           f"ORDER BY {MATERIALS_ROW_ID} LIMIT ?", (previous[1], RESULTS_BLOCK_ROWS))
+            else:
+                cursor = self.conn.execute(f"{self._select} ORDER BY {MATERIALS_ROW_ID} LIMIT ? OFFSET ?",
+                                           (RESULTS_BLOCK_ROWS, start))
+            fetched = cursor.fetchall()
+            rows = [self._display(row) for row in fetched]
+            last_id = fetched[-1][0] if fetched else None
+        else:
+            ids = self.view[start:start + RESULTS_BLOCK_ROWS]
+            by_id = {row[0]: self._display(row) for row in self.conn.execute(
+                f"{self._select} WHERE {MATERIALS_ROW_ID} IN ({', '.join('?' * len(ids))})", ids)}
+            # Строка, удалённая после построения вида, показывается пустой, чтобы не сдвигать остальные.
+            blank = ('',) * len(self.columns)
+            rows = [by_id.get(row_id, blank) for row_id in ids]
+            last_id = None
+        self._blocks[block] = (rows, last_id)
+        while len(self._blocks) > RESULTS_CACHED_BLOCKS:
+            self._blocks.popitem(last=False)
+        return rows
+
+    @staticmethod
+    def _display(row):
+        return tuple('' if value is None else value for value in row[1:])
+
+    def _column_values(self, column):
+        """``(row_id, value)`` of every row, in ``row_id`` order, None shown as ''."""
+        cursor = self.conn.execute(f"SELECT {MATERIALS_ROW_ID}, {quote_identifier(column)} "
+                                   f"FROM {quote_identifier(MATERIALS_TABLE)} ORDER BY {MATERIALS_ROW_ID}")
+        return ((row_id, '' if value is None else value) for row_id, value in cursor)
+
+    def unique_values(self, column):
+        cursor = self.conn.execute(f"SELECT DISTINCT {quote_identifier(column)} FROM {quote_identifier(MATERIALS_TABLE)}")
+        return sorted({str(value) for (value,) in cursor if value is not None and value != ''})
+
+    def _rebuild_view(self):
+        self._blocks.clear()
+        if self._sorted_by is None:
+            self.view = self.matches
+        elif self.matches is None:
+            self.view = self._permutations[self._sorted_by]
+        else:
+            column, reverse = self._sorted_by
+            wanted = set(self.matches)
+            self.view = ordered_row_ids(((row_id, value) for row_id, value in self._column_values(column)
+                                         if row_id in wanted), reverse)[0]
+
+    def search(self, text, column=None, regex=False, limit=None):
+        """Prefix search through the FTS5 index, ranked; ``regex`` or a non-text column uses ``filter``."""
+        limit = limit or SEARCH_RESULT_LIMIT
+        if regex or not self.fts or (column and column not in MATERIALS_FTS_COLUMNS.values()):
+            self.filter(text, column)
+            return
+        if not text.strip():
+            self.filter()
+            return
+        try:
+            rowids = search_materials(self.conn, text, column, limit)
+        except sqlite3.OperationalError as e:
+            logging.warning(f"Full-text search failed for {text!r}: {e}")
+            rowids = []
+        self.matches = rowids
+        self.truncated = len(rowids) >= limit
+        self._rebuild_view()
+
+    def filter(self, text='', column=None, value=None):
+        """Exact ``column == value`` match, or a case-insensitive regex over one column or every cell."""
+        self.truncated = False
+        if column and value:
+            self.matches = [row_id for row_id, cell in self._column_values(column) if str(cell) == str(value)]
+        elif text:
+            try:
+                pattern = re.compile(text, re.IGNORECASE)
+            except re.error:
+                pattern = None
+            if pattern is None:
+                self.matches = None
+            elif column:
+                self.matches = [row_id for row_id, cell in self._column_values(column) if pattern.search(str(cell))]
+            else:
+                # Регулярное выражение не использует индекс: один проход по таблице, строки не сохраняются.
+                cursor = self.conn.execute(f"{self._select} ORDER BY {MATERIALS_ROW_ID}")
+                self.matches = [row[0] for row in cursor
+                                if pattern.search('\x1f'.join(str(cell) for cell in self._display(row)))]
+        else:
+            self.matches = None
+        self._rebuild_view()
+
+    def sort(self, column, reverse=False):
+        """Order the view by ``column``; whole-table orders are cached per column and direction."""
+        cache_key = (column, reverse)
+        if cache_key not in self._permutations:
+            opposite = self._permutations.get((column, not reverse))
+            if opposite is not None:
+                filled = self._filled_counts[column]
+                order = opposite[:filled][::-1] + opposite[filled:]
+            else:
+                order, filled = ordered_row_ids(self._column_values(column), reverse)
+                self._filled_counts[column] = filled
+            self._permutations[cache_key] = order
+        self._sorted_by = cache_key
+        self._rebuild_view()
+
+
+def ordered_row_ids(pairs, reverse=False):
+    """Sort ``(row_id, value)`` pairs by ``natural_sort_key``; returns ``(row_ids, number of non-empty)``.
+
+    Empty values always go last, in either direction.
+    """
+    # Значения в столбцах сильно повторяются, поэтому ключ считаем один раз на значение.
+    keys_by_value = {}
+    filled = []
+    empty = []
+    for row_id, value in pairs:
+        key = keys_by_value.get(value, keys_by_value)
+        if key is keys_by_value:
+            key = keys_by_value[value] = natural_sort_key(value)
+        if key is None:
+            empty.append(row_id)
+        else:
+            filled.append((key, row_id))
+    filled.sort(key=lambda item: item[0], reverse=reverse)
+    return [row_id for _, row_id in filled] + empty, len(filled)
+
+
+_NATURAL_SPLIT_RE = re.compile(r'(\d+)')
+
+def natural_sort_key(value):
+    """Typed sort key: numbers and inch lengths ("1/8\"", ".040") by value before text, text in natural order.
+
+    Returns None for empty cells.
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return (0, float(value), ())
+    text = str(value).strip()
+    if text[:1] in '0123456789.':
+        inches = parse_inches(text)
+        if inches is not None:
+            return (0, inches, ())
+    parts = _NATURAL_SPLIT_RE.split(text.lower())
+    parts[1::2] = map(int, parts[1::2])
+    return (1, 0.0, tuple(parts))
+
+
+class ResultsGrid:
+    """Treeview showing only the visible page of a ``ResultsSource``.
+
+    The tree holds one item per visible line. Scrolling and filtering
+    rewrite the values of those items, so the cost does not depend on how
+    many rows the source has.
+    """
+    HEADER_HEIGHT = 1
+
+    def __init__(self, master, source, on_heading=None):
+        self.source = source
+        self.offset = 0
+        self.items = []
+        self.attached = 0
+        self.frame = tk.Frame(master)
+        self.tree = ttk.Treeview(self.frame, columns=source.columns, show='headings', selectmode='browse')
+        self.scrollbar = ttk.Scrollbar(self.frame, orient='vertical', command=self.on_scrollbar)
+        self.scrollbar.pack(side='right', fill='y')
+        self.tree.pack(side='left', fill='both', expand=True)
+        for column in source.columns:
+            self.tree.heading(column, text=column,
+                              command=(lambda _col=column: on_heading(_col)) if on_heading else '')
+        style = ttk.Style(self.tree)
+        self.row_height = int(style.lookup('Treeview', 'rowheight') or 20)
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<MouseWheel>', lambda event: self.scroll(-3 if event.delta > 0 else 3))
+        self.tree.bind('<Button-4>', lambda event: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda event: self.scroll(3))
+        self.tree.bind('<Prior>', lambda event: self.scroll(-len(self.items)))
+        self.tree.bind('<Next>', lambda event: self.scroll(len(self.items)))
+        self.tree.bind('<Home>', lambda event: self.scroll_to(0))
+        self.tree.bind('<End>', lambda event: self.scroll_to(len(self.source)))
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def on_resize(self, event):
+        visible = max(1, event.height // self.row_height - self.HEADER_HEIGHT)
+        while len(self.items) < visible:
+            item = self.tree.insert('', 'end', values=())
+            self.tree.detach(item)
+            self.items.append(item)
+        while len(self.items) > visible:
+            self.tree.delete(self.items.pop())
+        self.attached = min(self.attached, visible)
+        self.render()
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * len(self.source)))
+        elif action == 'scroll':
+            step = len(self.items) if unit == 'pages' else 1
+            self.scroll(int(amount) * step)
+
+    def scroll(self, lines):
+        self.scroll_to(self.offset + lines)
+        return 'break'
+
+    def scroll_to(self, offset):
+        self.offset = offset
+        self.tree.selection_remove(self.tree.selection())
+        self.render()
+        return 'break'
+
+    def refresh(self):
+        """Show the source from the top after it was filtered or sorted."""
+        self.scroll_to(0)
+
+    def render(self):
+        total = len(self.source)
+        page_size = len(self.items)
+        self.offset = max(0, min(self.offset, total - page_size))
+        rows = self.source.page(self.offset, self.offset + page_size)
+        for index, row in enumerate(rows):
+            self.tree.item(self.items[index], values=row)
+        # Лишние строки прячем, а не удаляем: при следующей странице они понадобятся снова.
+        for index in range(self.attached, len(rows)):
+            self.tree.move(self.items[index], '', index)
+        if len(rows) < self.attached:
+            self.tree.detach(*self.items[len(rows):self.attached])
+        self.attached = len(rows)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + page_size) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+
+# -------------------------------
+# Step 2: GUI Setup with Tkinter
+# -------------------------------
+class ScraperGUI:
+    def __init__(self, master):
+        load_gui_modules()
+        self.master = master
+        master.title("Web Scraper")
+        master.geometry("800x600")
+        master.resizable(False, False)
+        
+        # Create Start Button
+        self.start_button = tk.Button(master, text="Start Scraping", command=self.start_scraping, width=20, height=2, bg="green", fg="white")
+        self.start_button.pack(pady=10)
+
+        # Continue the last interrupted run instead of starting over
+        self.resume_var = tk.BooleanVar(value="--resume" in sys.argv)
+        self.resume_check = tk.Checkbutton(master, text="Resume interrupted run", variable=self.resume_var)
+        self.resume_check.pack()
+        
+        # Create View Results Button
+        self.view_button = tk.Button(master, text="View Results", command=self.view_results, width=20, height=2, bg="blue", fg="white")
+        self.view_button.pack(pady=10)
+        
+        # Create Export to Excel Button
+        self.export_button = tk.Button(master, text="Export to Excel", command=self.export_to_excel, width=20, height=2, bg="orange", fg="white")
+        self.export_button.pack(pady=10)
+
+        
+        # Create Scrolled Text for Logs
+        self.log_area = scrolledtext.ScrolledText(master, wrap=tk.WORD, width=95, height=25, state='disabled')
+        self.log_area.pack(padx=10, pady=10)
+        
+        self.driver_pool = None
+
+        # Initialize Logging
+        self.setup_logging()
+        
+    def setup_logging(self):
+        self.logger = logging.getLogger()
+        self.logger.setLevel(logging.INFO)
+        
+        # Create custom handler for Tkinter
+        self.gui_handler = GUIHandler(self.log_area)
+        self.gui_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        self.logger.addHandler(self.gui_handler)
+        
+        # Also log to file
+        file_handler = logging.FileHandler("scraper.log")
+        file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        self.logger.addHandler(file_handler)
+        
+    def start_scraping(self):
+        self.start_button.config(state='disabled')
+        self.logger.info("Starting the scraping process...")
+        threading.Thread(target=self.run_scraper, daemon=True).start()
+        
+    def run_scraper(self):
+        try:
+            # Браузеры остаются тёплыми между запусками из окна; закрываются при выходе (atexit).
+            if self.driver_pool is None:
+                self.driver_pool = DriverPool()
+            result = main(resume=self.resume_var.get(), pool=self.driver_pool)
+            self.logger.info("Scraping process completed successfully.")
+            if result['had_previous'] and result['changes'] and any(result['changes'].values()):
+                messagebox.showinfo("New Changes", f"Changes in the latest parsing: {format_changes(result['changes'])}.")
+            messagebox.showinfo("Success", "Scraping process completed successfully.")
+        except Exception as e:
+            self.logger.error(f"Scraping process terminated with an error: {e}")
+            messagebox.showerror("Error", f"Scraping process terminated with an error:\n{e}")
+        finally:
+            self.start_button.config(state='normal')
+    
+    def view_results(self):
+        # Получение данных из базы данных
+        try:
+            source = ResultsSource.from_db()
+        except Exception as e:
+            messagebox.showerror("Error", f"Error retrieving data: {e}")
+            return
+
+        top = tk.Toplevel(self.master)
+        top.title("Search Data")
+        top.bind("<Destroy>", lambda event: source.close() if event.widget is top else None)
+
+        # Фрейм для полей поиска и фильтрации
+        search_frame = tk.Frame(top)
+        search_frame.pack(fill='x', padx=5, pady=5)
+
+        search_label = tk.Label(search_frame, text="Search:")
+        search_label.pack(side='left')
+
+        search_entry = tk.Entry(search_frame)
+        search_entry.pack(side='left', fill='x', expand=True, padx=5)
+        search_entry.bind("<KeyRelease>", lambda event: schedule_search())  # Поиск по мере ввода, с задержкой
+
+        col_label = tk.Label(search_frame, text=" in ")
+        col_label.pack(side='left')
+
+        # Выпадающий список для выбора столбца
+        col_combo = ttk.Combobox(search_frame, values=source.columns)
+        col_combo.pack(side='left')
+
+        val_label = tk.Label(search_frame, text=" equals ")
+        val_label.pack(side='left')
+
+        # Выпадающий список для выбора значения
+        val_combo = ttk.Combobox(search_frame, values=[])
+        val_combo.pack(side='left')
+
+        search_button = tk.Button(search_frame, text="Search")
+        search_button.pack(side='left')
+
+        # Регулярные выражения — явная опция: они не используют индекс и просматривают все строки
+        regex_var = tk.BooleanVar(value=False)
+        regex_check = tk.Checkbutton(search_frame, text="Regex", variable=regex_var, command=lambda: on_search())
+        regex_check.pack(side='left')
+
+        count_label = tk.Label(top, anchor='w')
+        count_label.pack(fill='x', padx=5)
+
+        sort_state = {}
+
+        def on_heading(column):
+            reverse = sort_state.get(column, True) is False
+            for sorted_column in sort_state:
+                grid.tree.heading(sorted_column, text=sorted_column)
+            sort_state.clear()
+            sort_state[column] = reverse
+            source.sort(column, reverse)
+            grid.tree.heading(column, text=f"{column} {'▼' if reverse else '▲'}")
+            grid.refresh()
+
+        grid = ResultsGrid(top, source, on_heading=on_heading)
+        grid.pack(fill='both', expand=True)
+
+        def update_count():
+            text = f"{len(source)} of {source.total} rows"
+            if source.truncated:
+                text += f" (best {len(source)} matches shown)"
+            count_label.config(text=text)
+
+        pending = {'job': None}
+
+        def schedule_search():
+            if pending['job'] is not None:
+                top.after_cancel(pending['job'])
+            pending['job'] = top.after(SEARCH_DEBOUNCE_MS, on_search)
+
+        def on_search():
+            pending['job'] = None
+            text = search_entry.get()
+            col = col_combo.get() if col_combo.get() in source.columns else None
+            val = val_combo.get() if val_combo.get() else None
+            # Если выбран столбец и значение, фильтровать по точному совпадению
+            if col and val:
+                source.filter(text, col, val)
+            else:
+                source.search(text, col, regex=regex_var.get())
+            grid.refresh()
+            update_count()
+
+        search_button.config(command=on_search)
+        update_count()
+
+        def update_val_combo(event):
+            selected_col = col_combo.get()
+            if selected_col in source.columns:
+                val_combo['values'] = source.unique_values(selected_col)
+
+        col_combo.bind("<<ComboboxSelected>>", update_val_combo)
+
+    def export_to_excel(self):
+        path = filedialog.asksaveasfilename(
+            parent=self.master, initialfile=EXCEL_PATH, defaultextension='.xlsx',
+            filetypes=[("Excel workbook", "*.xlsx"), ("CSV", "*.csv"), ("Parquet", "*.parquet")])
+        if not path:
+            return
+        self.export_button.config(state='disabled')
+        threading.Thread(target=self.run_export, args=(path,), daemon=True).start()
+
+    def run_export(self, path):
+        # Экспорт идёт в фоне, окно не блокируется
+        try:
+            if export_materials(path):
+                messagebox.showinfo("Export", f"Data exported to {path} successfully.")
+            else:
+                messagebox.showinfo("Export", f"{path} is already up to date.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export data: {e}")
+            self.logger.error(f"Failed to export data to {path}: {e}")
+        finally:
+            self.export_button.config(state='normal')
+
+
+
+class GUIHandler(logging.Handler):
+    def __init__(self, text_widget):
+        super().__init__()
+        self.text_widget = text_widget
+        
+    def emit(self, record):
+        msg = self.format(record)
+        def append():
+            self.text_widget.config(state='normal')
+            self.text_widget.insert(tk.END, msg + '\n')
+            self.text_widget.see(tk.END)
+            self.text_widget.config(state='disabled')
+        self.text_widget.after(0, append)
+
+# -------------------------------
+# Step 3: Logging Configuration
+# -------------------------------
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("scraper.log"),
+    ]
+)
+for handler in logging.root.handlers[:]:
+    if isinstance(handler, logging.StreamHandler):
+        logging.root.removeHandler(handler)
+
+# -------------------------------
+# Метрики: гистограммы задержек по этапам, счётчики повторов и ошибок
+# -------------------------------
+METRICS_DIR = 'metrics'
+# Upper bounds of the latency histogram buckets, seconds.
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float('inf'))
+
+class RunMetrics:
+    """Latency histograms and event counters of one run, keyed by (stage, label).
+
+    Stages are navigation, wait, click, extract, parse, http_fetch,
+    db_write and source; the label is the source or the wait key. Written
+    at the end of a run as a JSON summary and a Prometheus text file.
+    With ``profile_target`` set, the first work unit whose name contains
+    it runs under cProfile. Safe to use from worker threads.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self, run_id=None, profile_target=None, directory=None):
+        with self.lock:
+            self.run_id = run_id
+            self.directory = directory or METRICS_DIR
+            self.started_at = datetime.now().isoformat(timespec='seconds')
+            self.histograms = {}  # (stage, label) -> [bucket counts, count, sum, max]
+            self.counters = {}  # (event, label) -> count
+            self.profile_target = profile_target.lower() if profile_target else None
+            self.profiled = False
+
+    def observe(self, stage, seconds, label=''):
+        with self.lock:
+            histogram = self.histograms.get((stage, label))
+            if histogram is None:
+                histogram = self.histograms[(stage, label)] = [[0] * len(METRICS_BUCKETS), 0, 0.0, 0.0]
+            histogram[0][bisect.bisect_left(METRICS_BUCKETS, seconds)] += 1
+            histogram[1] += 1
+            histogram[2] += seconds
+            histogram[3] = max(histogram[3], seconds)
+
+    def count(self, event, label='', n=1):
+        with self.lock:
+            self.counters[(event, label)] = self.counters.get((event, label), 0) + n
+
+    @contextmanager
+    def time(self, stage, label=''):
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.count('stage_failures', f"{stage}:{label}" if label else stage)
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - started, label)
+
+    @contextmanager
+    def profile_work_unit(self, name):
+        """Run the block under cProfile if ``name`` is the work unit selected for profiling."""
+        with self.lock:
+            selected = (self.profile_target is not None and not self.profiled
+                        and self.profile_target in str(name).lower())
+            if selected:
+                self.profiled = True
+        if not selected:
+            yield
+            return
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            os.makedirs(self.directory, exist_ok=True)
+            base = os.path.join(self.directory, f"{self.run_id or 'run'}_profile")
+            profiler.dump_stats(base + '.prof')
+            with open(base + '.txt', 'w', encoding='utf-8') as f:
+                pstats.Stats(profiler, stream=f).sort_stats('cumulative').print_stats(40)
+            logging.info(f"Profiled work unit '{name}': {base}.prof")
+
+    @staticmethod
+    def _quantile(buckets, count, q):
+        # Верхняя граница корзины, в которую попадает квантиль (как histogram_quantile без интерполяции).
+        threshold = q * count
+        seen = 0
+        for bound, bucket in zip(METRICS_BUCKETS, buckets):
+            seen += bucket
+            if seen >= threshold:
+                return bound
+        return METRICS_BUCKETS[-1]
+
+    def summary(self):
+        with self.lock:
+            stages = {}
+            for (stage, label), (buckets, count, total, maximum) in sorted(self.histograms.items()):
+                stages[f"{stage}/{label}" if label else stage] = {
+                    'count': count,
+                    'sum': round(total, 6),
+                    'mean': round(total / count, 6) if count else 0.0,
+                    'p50_le': self._quantile(buckets, count, 0.5),
+                    'p95_le': self._quantile(buckets, count, 0.95),
+                    'max': round(maximum, 6),
+                    'buckets': {('+Inf' if bound == float('inf') else f"{bound:g}"): n
+                                for bound, n in zip(METRICS_BUCKETS, buckets)},
+                }
+            counters = {f"{event}/{label}" if label else event: n for (event, label), n in sorted(self.counters.items())}
+        return {'run_id': self.run_id, 'started_at': self.started_at,
+                'finished_at': datetime.now().isoformat(timespec='seconds'), 'stages': stages, 'counters': counters}
+
+    def prometheus_text(self):
+        def labels(**values):
+            return ",".join(f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                            for key, value in values.items())
+        lines = ["# HELP scraper_stage_seconds Duration of scraper stages.",
+                 "# TYPE scraper_stage_seconds histogram"]
+        with self.lock:
+            for (stage, label), (buckets, count, total, _) in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, n in zip(METRICS_BUCKETS, buckets):
+                    cumulative += n
+                    le = '+Inf' if bound == float('inf') else f"{bound:g}"
+                    lines.append(f"scraper_stage_seconds_bucket{{{labels(stage=stage, label=label, le=le)}}} {cumulative}")
+                lines.append(f"scraper_stage_seconds_sum{{{labels(stage=stage, label=label)}}} {total:.6f}")
+                lines.append(f"scraper_stage_seconds_count{{{labels(stage=stage, label=label)}}} {count}")
+            lines += ["# HELP scraper_events_total Retries, fallbacks and failures.",
+                      "# TYPE scraper_events_total counter"]
+            for (event, label), n in sorted(self.counters.items()):
+                lines.append(f"scraper_events_total{{{labels(event=event, label=label)}}} {n}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory=None):
+        """Write ``<run_id>.json`` and ``<run_id>.prom`` to ``directory`` (default: the one given to ``reset``)."""
+        directory = directory or self.directory
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, str(self.run_id or datetime.now().strftime('%Y%m%d_%H%M%S')))
+        with open(base + '.json', 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+        with open(base + '.prom', 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        logging.info(f"Run metrics written to {base}.json and {base}.prom")
+        return base + '.json'
+
+metrics = RunMetrics()
+
+def timed(stage, label=''):
+    """Decorator: record the call duration of the function under ``stage``."""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with metrics.time(stage, label):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# -------------------------------
+# Helper Functions
+# -------------------------------
+def init_screenshot_folder():
+    today = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    folder_name = f"screenshots_{today}"
+    os.makedirs(folder_name, exist_ok=True)
+    return folder_name
+
+# ChromeDriverManager keeps its download cache on disk; parallel workers must
+# not resolve/download the driver at the same time.
+_driver_install_lock = threading.Lock()
+
+# Путь к chromedriver запоминается, чтобы не обращаться к сети при каждом запуске
+# и работать офлайн.
+CHROMEDRIVER_CACHE_FILE = '.chromedriver.json'
+CHROMEDRIVER_CACHE_DAYS = 7
+_resolved_driver_path = None
+
+def resolve_chromedriver(force=False):
+    """Path to chromedriver, resolved through webdriver-manager at most every CHROMEDRIVER_CACHE_DAYS.
+
+    The resolved path and version are cached on disk. When resolution
+    fails (e.g. offline) a cached driver that still exists is used.
+    """
+    global _resolved_driver_path
+    with _driver_install_lock:
+        if _resolved_driver_path and not force:
+            return _resolved_driver_path
+        cached = None
+        try:
+            with open(CHROMEDRIVER_CACHE_FILE, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            pass
+        usable = cached and os.path.exists(cached.get('path', ''))
+        if usable and not force and time.time() - cached.get('resolved_at', 0) < CHROMEDRIVER_CACHE_DAYS * 86400:
+            _resolved_driver_path = cached['path']
+            return _resolved_driver_path
+        try:
+            driver_path = ChromeDriverManager().install()
+        except Exception as e:
+            if not usable:
+                raise
+            logging.warning(f"chromedriver resolution failed ({e}). Using cached {cached['path']}.")
+            _resolved_driver_path = cached['path']
+            return _resolved_driver_path
+        try:
+            version = subprocess.run([driver_path, '--version'], capture_output=True, text=True, timeout=10).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            version = ''
+        try:
+            with open(CHROMEDRIVER_CACHE_FILE, 'w', encoding='utf-8') as f:
+                json.dump({'path': driver_path, 'version': version, 'resolved_at': time.time()}, f)
+        except OSError:
+            pass
+        logging.info(f"Resolved chromedriver: {driver_path} {version}")
+        _resolved_driver_path = driver_path
+        return driver_path
+
+# Профиль браузера: 'performance' блокирует ненужные ресурсы через CDP и не ждёт
+# полной загрузки страницы, 'full' загружает всё, как обычный браузер.
+BROWSER_PROFILE = 'performance'
+# Resource groups blocked by URL pattern (Network.setBlockedURLs; '*' is a wildcard).
+BLOCKED_RESOURCE_PATTERNS = {
+    'image': ['*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.avif*', '*.svg*', '*.ico*'],
+    'font': ['*.woff*', '*.ttf*', '*.otf*', '*.eot*', '*fonts.googleapis.com*', '*fonts.gstatic.com*',
+             '*use.typekit.net*'],
+    'media': ['*.mp4*', '*.webm*', '*.m3u8*', '*.mp3*', '*youtube.com*', '*ytimg.com*', '*vimeo.com*'],
+    'tracker': ['*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*facebook.net*',
+                '*connect.facebook.com*', '*hotjar.com*', '*clarity.ms*', '*segment.io*', '*segment.com*',
+                '*intercom.io*', '*intercomcdn.com*', '*hs-scripts.com*', '*hs-analytics.net*',
+                '*hubspot.com*', '*linkedin.com/px*', '*snap.licdn.com*', '*bing.com/bat*',
+                '*tiktok.com*', '*reddit.com/pixel*', '*sentry-cdn.com*', '*fullstory.com*'],
+}
+# Per-source profile: blocked groups and an allowlist. CDP URL blocking has no
+# exceptions, so allowlisted patterns are dropped from the block list.
+# Стили не блокируем: видимость элементов (и .text в Selenium) зависит от CSS.
+BROWSER_PROFILES = {
+    'default': {'block': ('image', 'font', 'media', 'tracker'), 'allow': ()},
+    # Кнопки и иконки модального окна OSH Cut — SVG.
+    'oshcut': {'block': ('image', 'font', 'media', 'tracker'), 'allow': ('*.svg*',)},
+    'sendcutsend': {'block': ('image', 'font', 'media', 'tracker'), 'allow': ()},
+}
+# Chrome features that cost memory or background traffic and that scraping does not need.
+CHROME_TRIM_ARGUMENTS = [
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-domain-reliability",
+    "--disable-client-side-phishing-detection",
+    "--disable-breakpad",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--no-first-run",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,BackForwardCache,"
+    "InterestFeedContentSuggestions,CalculateNativeWinOcclusion,AutofillServerCommunication",
+]
+
+def blocked_url_patterns(source=None):
+    """URL patterns to block for ``source``, after applying its allowlist."""
+    profile = BROWSER_PROFILES.get(source, BROWSER_PROFILES['default'])
+    allowed = set(profile['allow'])
+    patterns = []
+    for group in profile['block']:
+        patterns.extend(p for p in BLOCKED_RESOURCE_PATTERNS[group] if p not in allowed and p not in patterns)
+    return patterns
+
+def apply_browser_profile(driver, source=None):
+    """Block the source's unneeded resources in an existing driver; a no-op for the 'full' profile."""
+    if BROWSER_PROFILE != 'performance':
+        return
+    patterns = blocked_url_patterns(source)
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        logging.info(f"Blocking {len(patterns)} URL patterns for profile '{source or 'default'}'.")
+    except Exception as e:
+        logging.warning(f"Could not apply resource blocking: {e}")
+
+def setup_driver(screenshot_folder, network_logging=False, source=None):
+    load_scraping_modules()
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--window-size=1920,1080")
+    if BROWSER_PROFILE != 'performance':
+        chrome_prefs = {"profile.default_content_setting_values": {"images": 2}}
+        chrome_options.add_experimental_option("prefs", chrome_prefs)
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    if BROWSER_PROFILE == 'performance':
+        # Картинки блокирует Network.setBlockedURLs с учётом списка разрешённых (SVG у OSH Cut).
+        # 'eager': driver.get возвращается после DOMContentLoaded; дальше ждём нужные элементы явно.
+        chrome_options.page_load_strategy = 'eager'
+        for argument in CHROME_TRIM_ARGUMENTS:
+            chrome_options.add_argument(argument)
+    if network_logging:
+        # Network.* events in driver.get_log('performance'), used to capture API responses.
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    try:
+        try:
+            driver = webdriver.Chrome(service=Service(resolve_chromedriver()), options=chrome_options)
+        except SessionNotCreatedException as e:
+            # Кэшированный драйвер не подходит к обновившемуся Chrome.
+            logging.warning(f"Cached chromedriver rejected ({e.msg}). Resolving it again.")
+            driver = webdriver.Chrome(service=Service(resolve_chromedriver(force=True)), options=chrome_options)
+        logging.info("Chrome WebDriver initialized successfully.")
+    except Exception as e:
+        logging.error(f"Failed to initialize Chrome WebDriver: {e}")
+        raise
+    apply_browser_profile(driver, source)
+    return driver
+
+class DriverPool:
+    """Warm Chrome sessions shared across sources, workers and scheduled runs.
+
+    ``acquire`` hands out an idle driver showing a fresh tab (its old tabs
+    closed, the source's blocking profile applied) or starts a new one;
+    ``release`` puts it back instead of quitting it. Drivers are kept
+    apart by ``network_logging`` because that is fixed at start-up, and
+    recycled after ``max_leases`` uses. Safe to use from worker threads.
+    """
+    def __init__(self, max_idle=None, max_leases=50):
+        # По умолчанию — по одному тёплому браузеру на воркера SendCutSend.
+        self.max_idle = max_idle or SENDCUTSEND_WORKERS
+        self.max_leases = max_leases
+        self.lock = threading.Lock()
+        self.idle = []  # [(driver, network_logging)]
+        self.leases = {}  # id(driver) -> (uses, network_logging)
+        self.started = 0
+        self.reused = 0
+        atexit.register(self.close)
+
+    def acquire(self, screenshot_folder=None, network_logging=False, source=None):
+        while True:
+            with self.lock:
+                index = next((i for i, (_, logging_on) in enumerate(self.idle) if logging_on == network_logging), None)
+                driver = self.idle.pop(index)[0] if index is not None else None
+            if driver is None:
+                driver = setup_driver(screenshot_folder, network_logging=network_logging, source=source)
+                with self.lock:
+                    self.started += 1
+                    self.leases[id(driver)] = (1, network_logging)
+                return driver
+            try:
+                self._fresh_tab(driver, network_logging)
+            except Exception as e:
+                logging.warning(f"Discarding a pooled WebDriver: {e}")
+                self._quit(driver)
+                continue
+            apply_browser_profile(driver, source)
+            with self.lock:
+                self.reused += 1
+                uses, _ = self.leases.get(id(driver), (0, network_logging))
+                self.leases[id(driver)] = (uses + 1, network_logging)
+            return driver
+
+    @staticmethod
+    def _fresh_tab(driver, network_logging):
+        old_handles = driver.window_handles
+        driver.switch_to.new_window('tab')
+        fresh = driver.current_window_handle
+        for handle in old_handles:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(fresh)
+        if network_logging:
+            # Сбрасываем события прошлых страниц, чтобы захват API видел только новую загрузку.
+            driver.get_log('performance')
+
+    def release(self, driver, healthy=True):
+        with self.lock:
+            uses, network_logging = self.leases.get(id(driver), (0, False))
+            keep = healthy and uses < self.max_leases and len(self.idle) < self.max_idle
+            if keep:
+                self.idle.append((driver, network_logging))
+        if not keep:
+            self._quit(driver)
+
+    def _quit(self, driver):
+        with self.lock:
+            self.leases.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.error(f"Failed to close WebDriver: {e}")
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for driver, _ in idle:
+            self._quit(driver)
+        if self.started or self.reused:
+            logging.info(f"Driver pool closed: {self.started} browsers started, {self.reused} reused.")
+            self.started = self.reused = 0
+
+def acquire_driver(screenshot_folder, network_logging=False, source=None, pool=None):
+    if pool is not None:
+        return pool.acquire(screenshot_folder, network_logging=network_logging, source=source)
+    return setup_driver(screenshot_folder, network_logging=network_logging, source=source)
+
+def release_driver(driver, pool=None, healthy=True):
+    if pool is not None:
+        pool.release(driver, healthy)
+    else:
+        driver.quit()
+
+def save_screenshot(driver, screenshot_folder, filename):
+    try:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        safe_filename = filename.replace("/", "_").replace("\\", "_").replace(":", "_") \
+                               .replace("*", "_").replace("?", "_").replace('"', '_') \
+                               .replace("<", "_").replace(">", "_").replace("|", "_")
+        filepath = os.path.join(screenshot_folder, f"{timestamp}_{safe_filename}")
+        driver.save_screenshot(filepath)
+        logging.info(f"Screenshot saved: {filepath}")
+    except Exception as e:
+        logging.error(f"Failed to save screenshot '{filename}': {e}")
+
+# -------------------------------
+# Ожидания: события DOM/сети вместо фиксированных пауз
+# -------------------------------
+class AdaptiveTimeouts:
+    """Per-operation timeouts learned from observed latencies.
+
+    A timeout is ``factor`` times the 95th percentile of the recent samples
+    for the key, clamped to ``[minimum, maximum]``; until a key has samples
+    the default is used. Waits that run into their timeout are not
+    recorded: their true duration is unknown, and feeding the timeout back
+    in would only ratchet the budget up.
+    """
+    def __init__(self, default=10.0, minimum=1.0, maximum=25.0, factor=2.0, window=50):
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.factor = factor
+        self.window = window
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            samples = sorted(self.samples.get(key, ()))
+        if not samples:
+            return self.default
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        return max(self.minimum, min(self.maximum, p95 * self.factor))
+
+    def observe(self, key, seconds, timed_out=False):
+        if timed_out:
+            return
+        with self.lock:
+            samples = self.samples.setdefault(key, [])
+            samples.append(seconds)
+            del samples[:-self.window]
+
+adaptive_timeouts = AdaptiveTimeouts()
+
+# Запросы, которые никогда не «затихают» (long polling, веб-сокеты, аналитика),
+# не учитываются при ожидании сети.
+SETTLE_IGNORED_URLS = r'analytics|googletagmanager|doubleclick|hotjar|segment\.(io|com)|sentry|intercom|' \
+                      r'facebook\.(com|net)|clarity\.ms|/collect\b|beacon|long-?poll|/poll\b|socket|/sse\b'
+
+# Resolves once the page is quiet: no DOM mutations, no pending fetch/XHR and no
+# new resource entries for `quiet` ms (and, with `scroll`, an unchanged scroll
+# height while repeatedly scrolling to the bottom), or when `timeout` ms pass.
+# Requests matching `ignored` are not counted. Attribute changes are not
+# watched: spinners and hover states toggle classes without changing content.
+PAGE_SETTLED_JS = """
+var quiet = arguments[0], timeout = arguments[1], checkNetwork = arguments[2], scroll = arguments[3];
+var ignored = new RegExp(arguments[4], 'i');
+var done = arguments[arguments.length - 1];
+if (!window.__scraperNet) {
+    var net = window.__scraperNet = {pending: 0};
+    var open = XMLHttpRequest.prototype.open, send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.open = function(method, url) {
+        this.__scraperUrl = String(url);
+        return open.apply(this, arguments);
+    };
+    XMLHttpRequest.prototype.send = function() {
+        if (ignored.test(this.__scraperUrl || '')) { return send.apply(this, arguments); }
+        net.pending++;
+        this.addEventListener('loadend', function() { net.pending--; });
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function(input) {
+            var url = typeof input === 'string' ? input : (input && input.url) || String(input);
+            if (ignored.test(url)) { return originalFetch.apply(this, arguments); }
+            net.pending++;
+            return originalFetch.apply(this, arguments).finally(function() { net.pending--; });
+        };
+    }
+}
+var start = Date.now(), lastChange = start;
+var observer = new MutationObserver(function() { lastChange = Date.now(); });
+observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+var lastResources = performance.getEntriesByType('resource').length;
+var lastHeight = document.body ? document.body.scrollHeight : 0;
+(function check() {
+    var now = Date.now();
+    if (checkNetwork) {
+        var entries = performance.getEntriesByType('resource');
+        for (var i = lastResources; i < entries.length; i++) {
+            if (!ignored.test(entries[i].name)) { lastChange = now; break; }
+        }
+        lastResources = entries.length;
+        if (window.__scraperNet.pending > 0) { lastChange = now; }
+    }
+    if (scroll && document.body) {
+        window.scrollTo(0, document.body.scrollHeight);
+        if (document.body.scrollHeight !== lastHeight) { lastHeight = document.body.scrollHeight; lastChange = now; }
+    }
+    if (now - lastChange >= quiet || now - start >= timeout) {
+        observer.disconnect();
+        done({settled: now - lastChange >= quiet, elapsed: now - start});
+    } else {
+        setTimeout(check, 50);
+    }
+})();
+"""
+
+def wait_for_page_settled(driver, key, quiet_ms=400, network=True, scroll=False, timeout=None):
+    """Block until the DOM (and optionally the network and scroll height) stops changing.
+
+    ``key`` names the operation for adaptive timeouts. Running into the
+    timeout is logged, not raised: the explicit element waits that follow
+    remain responsible for failing.
+    """
+    if timeout is None:
+        timeout = adaptive_timeouts.get(key)
+    started = time.monotonic()
+    try:
+        # Async scripts are bounded by the session script timeout (30 s by default).
+        result = driver.execute_async_script(PAGE_SETTLED_JS, quiet_ms, int(timeout * 1000), network, scroll,
+                                             SETTLE_IGNORED_URLS) or {}
+    except WebDriverException as e:
+        if "invalid session id" in str(e) or "page crash" in str(e):
+            raise
+        logging.warning(f"Settle wait '{key}' failed: {e}")
+        return False
+    elapsed = time.monotonic() - started
+    settled = bool(result.get('settled'))
+    adaptive_timeouts.observe(key, elapsed, timed_out=not settled)
+    metrics.observe('wait', elapsed, key)
+    if not settled:
+        metrics.count('wait_timeouts', key)
+        logging.warning(f"Page did not settle within {timeout:.1f}s ({key}).")
+    return settled
+
+# -------------------------------
+# Контрольные точки: сохранение прогресса и продолжение прерванного запуска
+# -------------------------------
+CHECKPOINT_DB = 'scrape_checkpoints.db'
+# Единица работы, покрывающая все толщины (страница SendCutSend, материал OSH Cut).
+ALL_THICKNESSES = '*'
+
+class CheckpointStore:
+    """Durable per-work-unit progress of a scrape run.
+
+    A work unit is identified by (run, source, category, material,
+    thickness) and stored with its status ('done' or 'failed') and its
+    rows as JSON as soon as it finishes. Only the latest run can be
+    resumed, and only while it is 'running' or 'partial'; resuming skips
+    its 'done' units, reusing their rows, and retries 'failed' ones. The
+    units of a completed run are deleted. Safe to use from worker threads.
+    """
+    def __init__(self, path=CHECKPOINT_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.run_id = None
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    started_at TEXT NOT NULL,
+                    finished_at TEXT,
+                    status TEXT NOT NULL
+                )""")
+            key_columns = {row[1]: row[5] for row in self.conn.execute("PRAGMA table_info(work_units)")}
+            if key_columns and not key_columns.get('run_id'):
+                # Старая схема без run_id в ключе: строки разных запусков смешивались.
+                self.conn.execute("DROP TABLE work_units")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS work_units (
+                    source TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    material TEXT NOT NULL,
+                    thickness TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    rows TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 1,
+                    run_id TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (run_id, source, category, material, thickness)
+                )""")
+
+    def start_run(self, resume=False):
+        """Start a new run, or continue the latest run if ``resume`` and it did not complete."""
+        with self.lock, self.conn:
+            row = self.conn.execute("SELECT run_id, status FROM runs ORDER BY started_at DESC LIMIT 1").fetchone()
+            if resume and row and row[1] in ('running', 'partial'):
+                self.run_id = row[0]
+                self.conn.execute("UPDATE runs SET status = 'running', finished_at = NULL WHERE run_id = ?", (self.run_id,))
+                done, failed = self.conn.execute(
+                    "SELECT SUM(status = 'done'), SUM(status = 'failed') FROM work_units WHERE run_id = ?",
+                    (self.run_id,)
+                ).fetchone()
+                logging.info(f"Resuming run {self.run_id}: {done or 0} work units done, {failed or 0} to retry.")
+                return self.run_id
+            if resume:
+                logging.info("No interrupted run to resume. Starting a new run.")
+            self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+            self.conn.execute("UPDATE runs SET status = 'abandoned' WHERE status != 'completed'")
+            # Прежние запуски больше нельзя продолжить — их единицы работы не нужны.
+            self.conn.execute("DELETE FROM work_units")
+            self.conn.execute("INSERT INTO runs (run_id, started_at, status) VALUES (?, ?, 'running')",
+                              (self.run_id, datetime.now().isoformat()))
+        logging.info(f"Started run {self.run_id}.")
+        return self.run_id
+
+    def completed_rows(self, source, category, material, thickness=ALL_THICKNESSES):
+        """Rows of a finished work unit, or None if it still has to be scraped."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT rows FROM work_units WHERE run_id = ? AND source = ? AND category = ? AND material = ? "
+                "AND thickness = ? AND status = 'done'", (self.run_id, source, category, material, thickness)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def failed_units(self, source):
+        """(category, material) of the work units of ``source`` that failed in this run."""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT DISTINCT category, material FROM work_units WHERE run_id = ? AND source = ? "
+                "AND status = 'failed'", (self.run_id, source)
+            ).fetchall()
+
+    def _record(self, source, category, material, thickness, status, rows, error):
+        with self.lock, self.conn:
+            self.conn.execute("""
+                INSERT INTO work_units (source, category, material, thickness, status, rows, error, run_id, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (run_id, source, category, material, thickness) DO UPDATE SET
+                    status = excluded.status, rows = excluded.rows, error = excluded.error,
+                    attempts = work_units.attempts + 1, updated_at = excluded.updated_at
+            """, (source, category, material, thickness, status, json.dumps(rows, ensure_ascii=False), error,
+                  self.run_id, datetime.now().isoformat()))
+
+    def mark_done(self, source, category, material, rows, thickness=ALL_THICKNESSES):
+        self._record(source, category, material, thickness, 'done', rows, None)
+
+    def mark_failed(self, source, category, material, error, rows=(), thickness=ALL_THICKNESSES):
+        metrics.count('work_unit_failures', source)
+        self._record(source, category, material, thickness, 'failed', list(rows), str(error))
+
+    def finish_run(self):
+        """Close the run; it stays resumable if any work unit failed."""
+        with self.lock, self.conn:
+            failed = self.conn.execute("SELECT COUNT(*) FROM work_units WHERE run_id = ? AND status = 'failed'",
+                                       (self.run_id,)).fetchone()[0]
+            status = 'partial' if failed else 'completed'
+            self.conn.execute("UPDATE runs SET status = ?, finished_at = ? WHERE run_id = ?",
+                              (status, datetime.now().isoformat(), self.run_id))
+            if status == 'completed':
+                self.conn.execute("DELETE FROM work_units WHERE run_id = ?", (self.run_id,))
+        logging.info(f"Run {self.run_id} finished ({status}, {failed} failed work units).")
+        return status
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+# -------------------------------
+# Кэш страниц: повторное использование строк для неизменившихся страниц
+# -------------------------------
+PAGE_CACHE_DB = 'page_cache.db'
+PAGE_CACHE_MAX_ENTRIES = 5000
+PAGE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+def content_fingerprint(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class PageCache:
+    """Persistent cache of extracted rows per URL or work unit.
+
+    Each entry keeps the HTTP validators (ETag/Last-Modified) and a
+    fingerprint of the region the rows were extracted from. When the
+    server answers 304 or the fingerprint is unchanged, the stored rows
+    are reused and parsing is skipped. ``get(key, max_age)`` ignores
+    entries parsed more than ``max_age`` seconds ago. The cache is bounded
+    by entry count and total size; least recently used entries are
+    evicted first.
+    """
+    def __init__(self, path=PAGE_CACHE_DB, max_entries=PAGE_CACHE_MAX_ENTRIES, max_bytes=PAGE_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS page_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fingerprint TEXT,
+                    rows TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    stored_at TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                )""")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_page_cache_last_used ON page_cache (last_used)")
+
+    def get(self, key, max_age=None):
+        """Return the entry as a dict (rows decoded), or None if missing or older than ``max_age`` seconds."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, fingerprint, rows, stored_at FROM page_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        if max_age is not None and (datetime.now() - datetime.fromisoformat(row[4])).total_seconds() > max_age:
+            return None
+        return {'etag': row[0], 'last_modified': row[1], 'fingerprint': row[2], 'rows': json.loads(row[3])}
+
+    def hit(self, key, etag=None, last_modified=None):
+        """Mark an entry as reused, refreshing its validators if given; returns its rows."""
+        with self.lock, self.conn:
+            self.hits += 1
+            self.conn.execute(
+                "UPDATE page_cache SET last_used = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE cache_key = ?",
+                (time.time(), etag, last_modified, key))
+            row = self.conn.execute("SELECT rows FROM page_cache WHERE cache_key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key, rows, fingerprint=None, etag=None, last_modified=None):
+        payload = json.dumps(rows, ensure_ascii=False)
+        with self.lock, self.conn:
+            self.misses += 1
+            self.conn.execute("""
+                INSERT OR REPLACE INTO page_cache
+                    (cache_key, etag, last_modified, fingerprint, rows, size, stored_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (key, etag, last_modified, fingerprint, payload, len(payload), datetime.now().isoformat(), time.time()))
+            self._evict()
+
+    def _evict(self):
+        count, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM page_cache").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # Drop least recently used entries until both limits hold.
+        removed = 0
+        for key, size in self.conn.execute("SELECT cache_key, size FROM page_cache ORDER BY last_used").fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM page_cache WHERE cache_key = ?", (key,))
+            count -= 1
+            total -= size
+            removed += 1
+        logging.info(f"Page cache: evicted {removed} entries.")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+        logging.info(f"Page cache: {self.hits} hits, {self.misses} misses.")
+
+# -------------------------------
+# Функции для OSH Cut
+# -------------------------------
+OSHCUT_SHEET_URL = "https://app.oshcut.com/catalog/sheet"
+
+@timed('navigation', 'oshcut')
+def navigate_to_sheet_page(driver, screenshot_folder):
+    try:
+        driver.get(OSHCUT_SHEET_URL)
+        logging.info(f"Loaded page: {OSHCUT_SHEET_URL}")
+        wait = WebDriverWait(driver, 60)
+        wait.until(EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'filterBoxHeader') and contains(text(), 'Material')]")))
+        logging.info("Categories loaded.")
+        wait_for_page_settled(driver, 'oshcut_sheet')
+    except TimeoutException:
+        logging.exception("Timeout while loading the 'Sheet' page.")
+        if driver:
+            save_screenshot(driver, screenshot_folder, 'navigate_to_sheet_timeout.png')
+        raise
+    except Exception as e:
+        logging.exception(f"Error loading 'Sheet' page: {e}")
+        if driver:
+            save_screenshot(driver, screenshot_folder, 'navigate_to_sheet_error.png')
+        raise
+
+def extract_categories(driver):
+    categories = []
+    try:
+        wait = WebDriverWait(driver, 60)
+        categories_xpath = "//div[contains(@class, 'supertype') and contains(@class, 'clickable')]"
+        category_elements = wait.until(EC.presence_of_all_elements_located((By.XPATH, categories_xpath)))
+        logging.info(f"Found {len(category_elements)} categories with 'supertype clickable' class.")
+        for elem in category_elements:
+            try:
+                cat_name_elem = elem.find_element(By.XPATH, ".//b[@class='header']")
+                cat_name = cat_name_elem.text.strip()
+                if cat_name:
+                    categories.append(cat_name)
+            except NoSuchElementException:
+                logging.warning("Failed to extract category name from element.")
+                continue
+        if not categories:
+            logging.warning("No categories found in the 'Material' filter.")
+    except TimeoutException:
+        logging.exception("Timeout while loading categories from the 'Material' filter.")
+    except Exception as e:
+        logging.exception(f"Error extracting categories: {e}")
+    return categories
+
+def extract_material_elements(driver, screenshot_folder):
+    material_elements = []
+    try:
+        wait = WebDriverWait(driver, 60)
+        logging.info("Scrolling down to load more materials...")
+        wait_for_page_settled(driver, 'oshcut_material_scroll', quiet_ms=700, scroll=True)
+        materials_xpath = "//div[contains(@class, 'materialType')]"
+        wait.until(EC.presence_of_all_elements_located((By.XPATH, materials_xpath)))
+        material_elements = driver.find_elements(By.XPATH, materials_xpath)
+        logging.info(f"Found {len(material_elements)} materials in the current category.")
+        if not material_elements:
+            save_screenshot(driver, screenshot_folder, 'no_materials_found.png')
+            logging.info("Screenshot saved: no_materials_found.png")
+        else:
+            wait_for_page_settled(driver, 'oshcut_material_list', quiet_ms=200, network=False)
+    except TimeoutException:
+        logging.exception("Timeout while loading materials.")
+        save_screenshot(driver, screenshot_folder, 'timeout_materials.png')
+        logging.info("Screenshot saved: timeout_materials.png")
+    except WebDriverException as e:
+        logging.exception(f"Error extracting materials: {e}")
+        if "session deleted because of page crash" in str(e):
+            logging.error("Browser crashed. Attempting to restart the driver.")
+            raise
+        if driver:
+            save_screenshot(driver, screenshot_folder, 'extract_materials_error.png')
+            logging.info("Screenshot saved: extract_materials_error.png")
+    except Exception as e:
+        logging.exception(f"Error extracting materials: {e}")
+        if driver:
+            save_screenshot(driver, screenshot_folder, 'extract_materials_error.png')
+            logging.info("Screenshot saved: extract_materials_error.png")
+    return material_elements
+
+@timed('click', 'oshcut')
+def safe_click(driver, element, max_retries=3):
+    retries = 0
+    while retries < max_retries:
+        try:
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", element)
+            time.sleep(0.5)
+            driver.execute_script("arguments[0].click();", element)
+            return
+        except ElementClickInterceptedException:
+            logging.warning("ElementClickInterceptedException: retrying click.")
+            metrics.count('click_retries', 'oshcut')
+            try:
+                ActionChains(driver).move_to_element(element).click().perform()
+                return
+            except ElementClickInterceptedException:
+                logging.warning("Repeated ElementClickInterceptedException. Waiting before retrying.")
+                time.sleep(1)
+        except StaleElementReferenceException:
+            logging.exception("StaleElementReferenceException when clicking element. Retrying.")
+            metrics.count('click_retries', 'oshcut')
+            retries += 1
+            time.sleep(1)
+        except ElementNotInteractableException:
+            logging.exception("ElementNotInteractableException when clicking element. Retrying.")
+            metrics.count('click_retries', 'oshcut')
+            retries += 1
+            time.sleep(1)
+    logging.error("Failed to click the element after multiple attempts.")
+    raise ElementClickInterceptedException("Failed to click the element after multiple attempts.")
+
+def safe_click_with_retries(driver, element, screenshot_folder, csvfile, max_retries=5, delay=2):
+    retries = 0
+    while retries < max_retries:
+        try:
+            safe_click(driver, element)
+            return
+        except (ElementClickInterceptedException, ElementNotInteractableException, StaleElementReferenceException):
+            logging.warning(f"Attempt {retries+1} failed. Retrying in {delay} seconds...")
+            time.sleep(delay)
+            retries += 1
+    logging.error(f"Failed to click the element after {max_retries} attempts.")
+    raise ElementClickInterceptedException("Failed to click the element after multiple attempts.")
+
+def reset_filters_if_applied(driver, screenshot_folder, csvfile):
+    try:
+        wait = WebDriverWait(driver, 10)
+        active_filters = driver.find_elements(By.XPATH, "//span[@class='pill']")
+        if active_filters:
+            reset_filters(driver, screenshot_folder, csvfile)
+        else:
+            logging.info("No active filters. Reset not required.")
+    except Exception as e:
+        logging.exception(f"Error checking filters: {e}")
+
+def reset_filters(driver, screenshot_folder, csvfile):
+    try:
+        wait = WebDriverWait(driver, 30)
+        reset_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//span[contains(@class, 'filterReset')]")))
+        safe_click_with_retries(driver, reset_button, screenshot_folder, csvfile)
+        logging.info("Filters reset.")
+        wait.until(EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'filterBoxHeader') and contains(text(), 'Material')]")))
+        wait_for_page_settled(driver, 'oshcut_reset_filters')
+    except TimeoutException:
+        logging.exception("Timeout while resetting filters.")
+        save_screenshot(driver, screenshot_folder, 'timeout_reset_filters.png')
+        logging.info("Screenshot saved: timeout_reset_filters.png")
+    except WebDriverException as e:
+        logging.exception(f"Error resetting filters: {e}")
+        if "invalid session id" in str(e):
+            logging.error("Session invalid. Browser closed.")
+            raise
+        if driver:
+            save_screenshot(driver, screenshot_folder, 'reset_filters_error.png')
+            logging.info("Screenshot saved: reset_filters_error.png")
+    except Exception as e:
+        logging.exception(f"Error resetting filters: {e}")
+        if driver:
+            save_screenshot(driver, screenshot_folder, 'reset_filters_error.png')
+            logging.info("Screenshot saved: reset_filters_error.png")
+
+def close_modal(driver, screenshot_folder):
+    try:
+        wait = WebDriverWait(driver, 10)
+        close_buttons = driver.find_elements(By.XPATH, "//button[contains(text(), 'Close') or contains(text(), 'Закрыть') or contains(@class, 'close')]")
+        back_buttons = driver.find_elements(By.XPATH, "//button[contains(@class, 'btnTertiary') and contains(text(), 'Back to Catalog')]")
+        if close_buttons:
+            for close_button in close_buttons:
+                try:
+                    safe_click_with_retries(driver, close_button, screenshot_folder, None)
+                    logging.info("Modal window closed via 'Close' button.")
+                    wait_for_page_settled(driver, 'oshcut_close_modal', network=False)
+                except Exception as e:
+                    logging.exception(f"Error closing modal via 'Close' button: {e}")
+        if back_buttons:
+            for back_button in back_buttons:
+                try:
+                    safe_click_with_retries(driver, back_button, screenshot_folder, None)
+                    logging.info("Clicked 'Back to Catalog' to return to the material list.")
+                    wait_for_page_settled(driver, 'oshcut_back_to_catalog')
+                except Exception as e:
+                    logging.exception(f"Error clicking 'Back to Catalog' button: {e}")
+        if not (close_buttons or back_buttons):
+            logging.warning("Modal window not found to close.")
+    except Exception as e:
+        logging.exception(f"Error closing modal windows: {e}")
+        save_screenshot(driver, screenshot_folder, f"close_modal_error_{int(time.time())}.png")
+
+def ensure_modal_closed(driver, screenshot_folder):
+    try:
+        modal_close_button = driver.find_element(By.XPATH, "//button[contains(text(), 'Close') or contains(@class, 'close') or contains(text(), 'Back to Catalog')]")
+        safe_click_with_retries(driver, modal_close_button, screenshot_folder, None)
+        logging.info("Modal window closed.")
+    except NoSuchElementException:
+        logging.info("Modal window already closed.")
+
+def return_to_material_list(driver, screenshot_folder):
+    try:
+        material_list_xpath = "//div[contains(@class, 'materialType')]"
+        WebDriverWait(driver, 30).until(
+            EC.presence_of_all_elements_located((By.XPATH, material_list_xpath))
+        )
+        logging.info("Successfully returned to the material list.")
+    except TimeoutException:
+        logging.error("Failed to return to the material list.")
+        save_screenshot(driver, screenshot_folder, 'return_to_material_list_error.png')
+        raise
+
+MATERIAL_LIST_XPATH = "//div[contains(@class, 'materialType')]"
+
+# Text of an expanded material block (its thickness list), used to fingerprint it.
+# Отпечаток не видит содержимого модальных окон (K-factor, таблицы изгибов),
+# поэтому строки из кэша действуют не дольше OSHCUT_MODAL_CACHE_TTL секунд.
+# OSHCUT_PARSER_VERSION входит в ключ кэша: увеличить при изменении разбора окна.
+OSHCUT_PARSER_VERSION = 1
+OSHCUT_MODAL_CACHE_TTL = 24 * 60 * 60
+MATERIAL_TEXT_JS = """
+var node = document.evaluate(arguments[0], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+return node ? node.innerText : null;
+"""
+
+# Material headers of the current list plus whether a "More info..." modal is open.
+MATERIAL_LIST_STATE_JS = """
+var snapshot = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var names = [];
+for (var i = 0; i < snapshot.snapshotLength; i++) {
+    var header = snapshot.snapshotItem(i).querySelector('header');
+    names.push(header ? header.innerText.trim() : '');
+}
+return {names: names, modalOpen: !!document.querySelector('div.materialDescription')};
+"""
+
+def material_xpath(mat_index):
+    return f"({MATERIAL_LIST_XPATH})[{mat_index + 1}]"
+
+def more_info_buttons_xpath(mat_index):
+    return f"{material_xpath(mat_index)}//button[contains(text(), 'More info')]"
+
+def read_material_list_state(driver):
+    return driver.execute_script(MATERIAL_LIST_STATE_JS, MATERIAL_LIST_XPATH) or {'names': [], 'modalOpen': False}
+
+def sync_material_list(driver, cat_name, material_names, screenshot_folder):
+    """Make sure the category's material list is on screen, as snapshotted.
+
+    Costs one script call when nothing changed. Only if a modal is still
+    open or the list differs from ``material_names`` does it close the
+    modal and, if needed, re-select the category and re-scroll the list.
+    Returns ``(current_names, resynced)``.
+    """
+    state = read_material_list_state(driver)
+    if not state['modalOpen'] and state['names'] == material_names:
+        return state['names'], False
+    if state['modalOpen']:
+        ensure_modal_closed(driver, screenshot_folder)
+        state = read_material_list_state(driver)
+        if not state['modalOpen'] and state['names'] == material_names:
+            return state['names'], True
+    logging.info(f"Material list of category '{cat_name}' changed. Re-synchronising.")
+    return_to_material_list(driver, screenshot_folder)
+    reset_filters_if_applied(driver, screenshot_folder, None)
+    click_category(driver, cat_name, screenshot_folder, None)
+    extract_material_elements(driver, screenshot_folder)
+    names = read_material_list_state(driver)['names']
+    if names != material_names:
+        logging.warning(f"Material list of category '{cat_name}' differs from the snapshot after re-synchronising.")
+    return names, True
+
+def click_category(driver, cat_name, screenshot_folder, csvfile):
+    wait = WebDriverWait(driver, 60)
+    category_xpath = f"//div[contains(@class, 'supertype') and contains(@class, 'clickable')]//b[@class='header' and normalize-space(text())='{cat_name}']/ancestor::div[contains(@class, 'supertype') and contains(@class, 'clickable')]"
+    try:
+        cat_elem = wait.until(EC.element_to_be_clickable((By.XPATH, category_xpath)))
+        logging.info(f"Category '{cat_name}' found and clickable.")
+        safe_click_with_retries(driver, cat_elem, screenshot_folder, csvfile)
+        logging.info(f"Category '{cat_name}' selected.")
+        wait_for_page_settled(driver, 'oshcut_click_category')
+    except TimeoutException:
+        logging.exception(f"Timeout while searching for category '{cat_name}'.")
+        save_screenshot(driver, screenshot_folder, f"click_category_timeout_{cat_name}_{int(time.time())}.png")
+        raise
+    except Exception as e:
+        logging.exception(f"Error clicking on category '{cat_name}': {e}")
+        save_screenshot(driver, screenshot_folder, f"click_category_error_{cat_name}_{int(time.time())}.png")
+        raise
+
+def click_material_name(driver, mat_name, screenshot_folder, csvfile, mat_index=None):
+    try:
+        if mat_index is not None:
+            mat_element_xpath = material_xpath(mat_index)
+        else:
+            mat_element_xpath = f"//div[contains(@class, 'materialType')]//header[contains(text(), '{mat_name}')]/ancestor::div[contains(@class, 'materialType')]"
+        mat_element = WebDriverWait(driver, 30).until(
+            EC.presence_of_element_located((By.XPATH, mat_element_xpath))
+        )
+        header_element = mat_element.find_element(By.XPATH, ".//header")
+        safe_click_with_retries(driver, header_element, screenshot_folder, csvfile)
+        logging.info(f"Material name '{mat_name}' expanded.")
+        wait_for_page_settled(driver, 'oshcut_expand_material', scroll=True)
+        wait = WebDriverWait(driver, 30)
+        wait.until(EC.visibility_of_element_located((By.XPATH, f"{mat_element_xpath}//button[contains(text(), 'More info')]")))
+        logging.info(f"'More info...' buttons for material '{mat_name}' are now visible.")
+    except TimeoutException:
+        logging.error("Timeout while expanding the thickness list.")
+        save_screenshot(driver, screenshot_folder, f"click_material_name_timeout_{mat_name}_{int(time.time())}.png")
+        raise
+    except NoSuchElementException:
+        logging.error("Material name not found for clicking.")
+        save_screenshot(driver, screenshot_folder, f"click_material_name_missing_{mat_name}_{int(time.time())}.png")
+        raise
+    except Exception as e:
+        logging.exception(f"Error clicking on material name '{mat_name}': {e}")
+        save_screenshot(driver, screenshot_folder, f"click_material_name_error_{mat_name}_{int(time.time())}.png")
+        raise
+
+def click_more_info(driver, mat_name, btn_idx, more_info_button, screenshot_folder, csvfile):
+    try:
+        safe_click_with_retries(driver, more_info_button, screenshot_folder, csvfile)
+        logging.info(f"Clicked 'More info...' button {btn_idx} for material '{mat_name}'.")
+        wait = WebDriverWait(driver, 60)
+        wait.until(EC.visibility_of_element_located((By.XPATH, "//div[contains(@class, 'materialDescription')]")))
+        logging.info("Modal window 'More info...' appeared.")
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        wait_for_page_settled(driver, 'oshcut_more_info')
+    except TimeoutException:
+        logging.error(f"Timeout while opening modal window 'More info...' for material '{mat_name}'.")
+        save_screenshot(driver, screenshot_folder, f"more_info_modal_timeout_{mat_name}_{btn_idx}_{int(time.time())}.png")
+        raise
+    except Exception as e:
+        logging.exception(f"Error clicking 'More info...' button for material '{mat_name}': {e}")
+        save_screenshot(driver, screenshot_folder, f"more_info_click_error_{mat_name}_{btn_idx}_{int(time.time())}.png")
+        raise
+
+OSHCUT_THICKNESS_XPATH = "//div[@class='materialActionBar']//div[@class='subHeader']"
+OSHCUT_K_FACTOR_XPATH = """
+        //table[contains(@class, 'metalProperties')]//tr[
+            td[normalize-space(text())='K-factor'] 
+            or td[normalize-space(text())='K-фактор']
+        ]/td[2]
+        """
+OSHCUT_BEND_TABLE_XPATHS = {
+    'Minimum Flange Support': "//table[contains(@class, 'MaterialBendTable') and (.//td[contains(text(), 'Flange') or contains(text(), 'Фланца')])]",
+    'Bend Deduction': "//table[contains(@class, 'MaterialBendTable') and (.//td[contains(text(), 'Bend Deduction') or contains(text(), 'Уменьшение изгиба')])]",
+    'Maximum Bend Length': "//table[contains(@class, 'MaterialBendTable') and (.//td[contains(text(), 'Maximum Bend Length') or contains(text(), 'Максимальная длина изгиба')])]"
+}
+OSHCUT_TABLE_TITLES_XPATH = "//table[contains(@class, 'MaterialBendTable')]//td[@class='tableTitle']"
+
+# Использовать ли единый JS-экстрактор для модального окна "More info..." (с откатом
+# на поэлементное чтение через WebDriver, если он ничего не нашёл).
+OSHCUT_JS_EXTRACTION = True
+
+# Evaluates the same XPaths as the per-element path and returns everything
+# the modal provides as one JSON-compatible object.
+OSHCUT_MODAL_EXTRACT_JS = """
+var thicknessXpath = arguments[0], kFactorXpath = arguments[1], tableXpaths = arguments[2], titlesXpath = arguments[3];
+function first(xpath) {
+    return document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+function all(xpath) {
+    var snapshot = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    var nodes = [];
+    for (var i = 0; i < snapshot.snapshotLength; i++) { nodes.push(snapshot.snapshotItem(i)); }
+    return nodes;
+}
+function text(node) {
+    return (node.innerText !== undefined ? node.innerText : node.textContent || '').trim();
+}
+var thickness = first(thicknessXpath);
+var kFactor = first(kFactorXpath);
+var tables = {};
+for (var key in tableXpaths) {
+    var table = first(tableXpaths[key]);
+    if (!table) { tables[key] = null; continue; }
+    var rows = [];
+    var trs = table.querySelectorAll('tr');
+    for (var r = 0; r < trs.length; r++) {
+        var cells = [];
+        var tds = trs[r].querySelectorAll('td');
+        for (var c = 0; c < tds.length; c++) { cells.push(text(tds[c])); }
+        rows.push(cells);
+    }
+    tables[key] = rows;
+}
+return {
+    thickness: thickness ? text(thickness) : null,
+    kFactor: kFactor ? text(kFactor) : null,
+    tables: tables,
+    titles: all(titlesXpath).map(text)
+};
+"""
+
+def _thickness_name(thickness_text):
+    if '"' in thickness_text:
+        return thickness_text.split('"')[0] + '"'
+    return thickness_text
+
+def format_table_rows(rows):
+    return "; ".join(" | ".join(cols) for cols in rows)
+
+@timed('extract', 'oshcut')
+def extract_material_details(driver, category, use_js=OSHCUT_JS_EXTRACTION):
+    if use_js:
+        details = extract_material_details_js(driver, category)
+        if details is not None:
+            return details
+        logging.warning(f"JS extraction found no modal data for category '{category}'. Falling back to element extraction.")
+    return extract_material_details_elements(driver, category)
+
+def extract_material_details_js(driver, category):
+    """Read thickness, K-factor and all bend tables with a single execute_script call.
+
+    Returns None when the modal is not (yet) rendered, so the caller can use
+    the waiting per-element path instead.
+    """
+    try:
+        payload = driver.execute_script(OSHCUT_MODAL_EXTRACT_JS, OSHCUT_THICKNESS_XPATH, OSHCUT_K_FACTOR_XPATH,
+                                        OSHCUT_BEND_TABLE_XPATHS, OSHCUT_TABLE_TITLES_XPATH)
+    except WebDriverException as e:
+        logging.warning(f"JS extraction failed for category '{category}': {e}")
+        return None
+    return modal_payload_details(payload, category)
+
+def modal_payload_details(payload, category):
+    """Details dict from an ``OSHCUT_MODAL_EXTRACT_JS``-shaped payload, or None without a thickness."""
+    if not payload or payload.get('thickness') is None:
+        return None
+    details = {'Thickness Name': _thickness_name(payload['thickness'])}
+    logging.info(f"Extracted thickness name: {details['Thickness Name']} for category '{category}'")
+    if payload.get('kFactor') is not None:
+        details['K-factor'] = payload['kFactor']
+        logging.info(f"Extracted K-factor: {details['K-factor']} for category '{category}'")
+    else:
+        logging.warning(f"K-factor not found for category '{category}'.")
+        details['K-factor'] = 'Not Found'
+    tables = payload.get('tables') or {}
+    for key in OSHCUT_BEND_TABLE_XPATHS:
+        rows = tables.get(key)
+        if rows is None:
+            logging.warning(f"Table {key} not found for category '{category}'.")
+            details[key] = 'Not Found'
+        else:
+            details[key] = format_table_rows(rows)
+            logging.info(f"Extracted data for {key} in category '{category}'.")
+    for title in payload.get('titles') or []:
+        logging.info(f"Found table title: {title} for category '{category}'")
+    return details
+
+# Outer HTML of the open "More info..." modal, stored by the snapshot archive.
+OSHCUT_MODAL_HTML_JS = """
+var modal = document.querySelector('div.materialDescription');
+return modal ? modal.outerHTML : null;
+"""
+# Те же признаки, что и в OSHCUT_K_FACTOR_XPATH / OSHCUT_BEND_TABLE_XPATHS, для разбора сохранённого HTML.
+OSHCUT_K_FACTOR_LABELS = ('K-factor', 'K-фактор')
+OSHCUT_BEND_TABLE_MARKERS = {
+    'Minimum Flange Support': ('Flange', 'Фланца'),
+    'Bend Deduction': ('Bend Deduction', 'Уменьшение изгиба'),
+    'Maximum Bend Length': ('Maximum Bend Length', 'Максимальная длина изгиба'),
+}
+
+@timed('parse', 'oshcut')
+def parse_oshcut_modal_html(html, category):
+    """HTML counterpart of ``extract_material_details_js`` for a recorded "More info..." modal."""
+    load_scraping_modules()
+    soup = BeautifulSoup(html, 'html.parser')
+
+    def text(node):
+        return node.get_text(strip=True)
+
+    thickness = soup.select_one("div.materialActionBar div.subHeader")
+    k_factor = None
+    for row in soup.select("table.metalProperties tr"):
+        cells = row.find_all('td')
+        if len(cells) > 1 and any(" ".join(cell.get_text().split()) in OSHCUT_K_FACTOR_LABELS for cell in cells):
+            k_factor = text(cells[1])
+            break
+    bend_tables = soup.select("table.MaterialBendTable")
+    tables = {}
+    for key, markers in OSHCUT_BEND_TABLE_MARKERS.items():
+        table = next((t for t in bend_tables
+                      if any(marker in td.get_text() for td in t.find_all('td') for marker in markers)), None)
+        tables[key] = None if table is None else [[text(td) for td in tr.find_all('td')] for tr in table.find_all('tr')]
+    payload = {
+        'thickness': text(thickness) if thickness is not None else None,
+        'kFactor': k_factor,
+        'tables': tables,
+        'titles': [text(td) for t in bend_tables for td in t.find_all('td', class_='tableTitle')],
+    }
+    return modal_payload_details(payload, category)
+
+def extract_material_details_elements(driver, category):
+    details = {
+        'Thickness Name': '',
+        'K-factor': '',
+        'Minimum Flange Support': '',
+        'Bend Deduction': '',
+        'Maximum Bend Length': ''
+    }
+    try:
+        wait = WebDriverWait(driver, 60)
+        thickness_element = wait.until(EC.presence_of_element_located((By.XPATH, OSHCUT_THICKNESS_XPATH)))
+        details['Thickness Name'] = _thickness_name(thickness_element.text.strip())
+        logging.info(f"Extracted thickness name: {details['Thickness Name']} for category '{category}'")
+        try:
+            k_factor_element = driver.find_element(By.XPATH, OSHCUT_K_FACTOR_XPATH)
+            details['K-factor'] = k_factor_element.text.strip()
+            logging.info(f"Extracted K-factor: {details['K-factor']} for category '{category}'")
+        except NoSuchElementException:
+            logging.warning(f"K-factor not found for category '{category}'.")
+            details['K-factor'] = 'Not Found'
+        for key, xpath in OSHCUT_BEND_TABLE_XPATHS.items():
+            try:
+                table = driver.find_element(By.XPATH, xpath)
+                details[key] = extract_table_data(table)
+                logging.info(f"Extracted data for {key} in category '{category}'.")
+            except NoSuchElementException:
+                logging.warning(f"Table {key} not found for category '{category}'.")
+                details[key] = 'Not Found'
+        all_table_titles = driver.find_elements(By.XPATH, OSHCUT_TABLE_TITLES_XPATH)
+        for table_title in all_table_titles:
+            logging.info(f"Found table title: {table_title.text.strip()} for category '{category}'")
+    except TimeoutException:
+        logging.exception(f"Timeout while extracting material details for category '{category}'.")
+    except Exception as e:
+        logging.exception(f"Error extracting material details for category '{category}': {e}")
+    return details
+
+def extract_table_data(table_element):
+    data = []
+    try:
+        rows = table_element.find_elements(By.XPATH, ".//tr")
+        for row in rows:
+            cols = row.find_elements(By.XPATH, ".//td")
+            data.append([col.text.strip() for col in cols])
+    except Exception as e:
+        logging.error(f"Error extracting data from table: {e}")
+    return format_table_rows(data)
+
+def collect_material(driver, cat_name, mat_name, material_names, screenshot_folder, cache=None):
+    """Open every "More info..." modal of one material.
+
+    Returns ``(rows, failures)`` where ``failures`` counts modals that
+    could not be read. With a ``cache``, the rows of a material whose
+    expanded thickness list is unchanged are reused without opening any
+    modal, for up to ``OSHCUT_MODAL_CACHE_TTL`` after they were parsed.
+    """
+    rows = []
+    failures = 0
+    names, _ = sync_material_list(driver, cat_name, material_names, screenshot_folder)
+    if mat_name not in names:
+        raise NoSuchElementException(f"Material '{mat_name}' is no longer listed in category '{cat_name}'.")
+    mat_index = names.index(mat_name)
+    click_material_name(driver, mat_name, screenshot_folder, None, mat_index=mat_index)
+    cache_key = f"oshcut|v{OSHCUT_PARSER_VERSION}|{cat_name}|{mat_name}"
+    fingerprint = None
+    if cache:
+        material_text = driver.execute_script(MATERIAL_TEXT_JS, material_xpath(mat_index))
+        fingerprint = content_fingerprint(material_text) if material_text else None
+        entry = cache.get(cache_key, max_age=OSHCUT_MODAL_CACHE_TTL)
+        # При записи архива модальные окна открываются всегда, чтобы сохранить их снимки.
+        if entry and fingerprint and entry['fingerprint'] == fingerprint and not archive.active:
+            logging.info(f"Material '{mat_name}' unchanged since last run, reusing cached rows.")
+            return cache.hit(cache_key), 0
+    button_count = len(driver.find_elements(By.XPATH, more_info_buttons_xpath(mat_index)))
+    for btn_idx in range(button_count):
+        try:
+            if btn_idx > 0:
+                names, resynced = sync_material_list(driver, cat_name, material_names, screenshot_folder)
+                mat_index = names.index(mat_name)
+                if resynced:
+                    click_material_name(driver, mat_name, screenshot_folder, None, mat_index=mat_index)
+            more_info_buttons = driver.find_elements(By.XPATH, more_info_buttons_xpath(mat_index))
+            if btn_idx >= len(more_info_buttons):
+                click_material_name(driver, mat_name, screenshot_folder, None, mat_index=mat_index)
+                more_info_buttons = driver.find_elements(By.XPATH, more_info_buttons_xpath(mat_index))
+            click_more_info(driver, mat_name, btn_idx, more_info_buttons[btn_idx], screenshot_folder, None)
+            if archive.active:
+                archive.add('oshcut_modal', cat_name, mat_name, btn_idx, driver.execute_script(OSHCUT_MODAL_HTML_JS))
+            details = extract_material_details(driver, cat_name)
+            rows.append({
+                'Category': cat_name,
+                'Material Name': mat_name,
+                'Thickness Name': details.get('Thickness Name', ''),
+                'K-factor': details.get('K-factor', ''),
+                'Minimum Flange Support': details.get('Minimum Flange Support', ''),
+                'Bend Deduction': details.get('Bend Deduction', ''),
+                'Maximum Bend Length': details.get('Maximum Bend Length', '')
+            })
+            logging.info(f"Data collected for material '{mat_name}'.")
+            close_modal(driver, screenshot_folder)
+        except Exception as e:
+            logging.exception(f"Error processing 'More info...' button {btn_idx + 1} for material '{mat_name}': {e}")
+            close_modal(driver, screenshot_folder)
+            failures += 1
+            continue
+    if cache and fingerprint and rows and not failures:
+        cache.put(cache_key, rows, fingerprint)
+    return rows, failures
+
+def parse_and_collect_all_categories(driver, screenshot_folder, checkpoints=None, cache=None):
+    processed_materials = set()
+    categories = extract_categories(driver)
+    all_data = []
+    if not categories:
+        logging.warning("No categories found.")
+        return all_data
+
+    logging.info(f"Extracted categories: {categories}")
+    for cat_idx, cat_name in enumerate(categories, start=1):
+        logging.info(f"Processing category {cat_idx}/{len(categories)}: {cat_name}")
+        try:
+            ensure_modal_closed(driver, screenshot_folder)
+            reset_filters_if_applied(driver, screenshot_folder, None)
+            click_category(driver, cat_name, screenshot_folder, None)
+            # Список материалов снимается один раз; дальше страница пересинхронизируется,
+            # только если DOM действительно изменился.
+            extract_material_elements(driver, screenshot_folder)
+            material_names = read_material_list_state(driver)['names']
+            logging.info(f"Category '{cat_name}' lists {len(material_names)} materials.")
+            for mat_name in material_names:
+                if not mat_name or mat_name in processed_materials:
+                    continue
+                saved_rows = checkpoints.completed_rows('OSH Cut', cat_name, mat_name) if checkpoints else None
+                if saved_rows is not None:
+                    logging.info(f"Material '{mat_name}' already done in this run. Reusing {len(saved_rows)} rows.")
+                    all_data.extend(saved_rows)
+                    processed_materials.add(mat_name)
+                    continue
+                logging.info(f"Processing material: {mat_name}")
+                try:
+                    with metrics.profile_work_unit(mat_name):
+                        rows, failures = collect_material(driver, cat_name, mat_name, material_names, screenshot_folder, cache)
+                    all_data.extend(rows)
+                    processed_materials.add(mat_name)
+                    if checkpoints:
+                        if failures:
+                            checkpoints.mark_failed('OSH Cut', cat_name, mat_name, f"{failures} modals failed", rows)
+                        else:
+                            checkpoints.mark_done('OSH Cut', cat_name, mat_name, rows)
+                    logging.info(f"Completed processing material '{mat_name}'.")
+                except Exception as e:
+                    logging.exception(f"Error processing material '{mat_name}': {e}")
+                    save_screenshot(driver, screenshot_folder, f"error_material_{mat_name}.png")
+                    if checkpoints:
+                        checkpoints.mark_failed('OSH Cut', cat_name, mat_name, e)
+                    continue
+            logging.info(f"Completed processing category '{cat_name}'.")
+            reset_filters_if_applied(driver, screenshot_folder, None)
+        except Exception as e:
+            logging.exception(f"Error processing category '{cat_name}': {e}")
+            reset_filters_if_applied(driver, screenshot_folder, None)
+            continue
+    return all_data
+
+
+# -------------------------------
+# OSH Cut: данные каталога из JSON-ответов API (CDP network log)
+# -------------------------------
+# 'api' — собрать строки из JSON, который SPA загружает при открытии каталога,
+# и только при неудаче кликать по интерфейсу; 'ui' — прежний обход интерфейса.
+# По умолчанию 'ui': сопоставление полей OSHCUT_API_FIELDS ещё не сверено
+# с записью настоящих ответов API (benchmarks/fixtures/oshcut/catalog.json
+# составлен под него и этого не доказывает).
+OSHCUT_ACQUISITION_MODE = 'ui'
+OSHCUT_API_URL_PATTERNS = ('oshcut.com',)
+OSHCUT_API_CAPTURE_FILE = 'oshcut_api_capture.json'
+
+# Candidate key names for each field of the catalog/material-property JSON.
+# Adjust these against a recorded capture when the API changes.
+OSHCUT_API_FIELDS = {
+    'name': ('name', 'displayName', 'materialName', 'title'),
+    'category': ('supertype', 'category', 'categoryName', 'family'),
+    'thicknesses': ('thicknesses', 'gauges', 'sheets', 'stock', 'variants'),
+    'thickness': ('thicknessName', 'displayThickness', 'thickness', 'gauge'),
+    'properties': ('properties', 'materialProperties', 'bendProperties'),
+    'K-factor': ('kFactor', 'k_factor', 'kfactor', 'KFactor'),
+    'Minimum Flange Support': ('minimumFlangeSupport', 'minimumFlange', 'minFlange', 'flangeSupport'),
+    'Bend Deduction': ('bendDeduction', 'bendDeductions'),
+    'Maximum Bend Length': ('maximumBendLength', 'maxBendLength'),
+}
+OSHCUT_API_TABLE_FIELDS = ('Minimum Flange Support', 'Bend Deduction', 'Maximum Bend Length')
+
+def capture_json_responses(driver, url_patterns=None):
+    """Collect finished JSON responses from the Chrome performance log.
+
+    Requires a driver created with ``setup_driver(..., network_logging=True)``.
+    Reading the log drains it, so call this once the page has settled.
+    """
+    url_patterns = url_patterns or OSHCUT_API_URL_PATTERNS
+    candidates = {}
+    finished = set()
+    for entry in driver.get_log('performance'):
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, ValueError):
+            continue
+        params = message.get('params', {})
+        if message.get('method') == 'Network.responseReceived':
+            response = params.get('response', {})
+            url = response.get('url', '')
+            if 'json' in response.get('mimeType', '') and any(pattern in url for pattern in url_patterns):
+                candidates[params.get('requestId')] = (url, response.get('status'))
+        elif message.get('method') == 'Network.loadingFinished':
+            finished.add(params.get('requestId'))
+    responses = []
+    for request_id, (url, status) in candidates.items():
+        if request_id not in finished:
+            continue
+        try:
+            result = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            body = result.get('body', '')
+            if result.get('base64Encoded'):
+                body = base64.b64decode(body).decode('utf-8')
+            responses.append({'url': url, 'status': status, 'body': json.loads(body)})
+        except Exception as e:
+            logging.warning(f"Could not read response body for {url}: {e}")
+    logging.info(f"Captured {len(responses)} JSON responses.")
+    return responses
+
+def save_api_capture(responses, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'captured_at': datetime.now().isoformat(), 'responses': responses}, f, ensure_ascii=False)
+    logging.info(f"API responses saved to {path}")
+
+def load_api_capture(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['responses']
+
+def _api_field(record, field):
+    for key in OSHCUT_API_FIELDS[field]:
+        value = record.get(key)
+        if value not in (None, ''):
+            return value
+    return None
+
+def _api_name(value):
+    if isinstance(value, dict):
+        value = _api_field(value, 'name')
+    return value.strip() if isinstance(value, str) else None
+
+def _api_thickness_name(value):
+    if isinstance(value, (int, float)):
+        return f'{value}"'
+    return _thickness_name(str(value).strip())
+
+def _api_table_text(value):
+    if value is None:
+        return 'Not Found'
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        value = value.get('rows', list(value.items()))
+    rows = []
+    for row in value:
+        cells = list(row.values()) if isinstance(row, dict) else row if isinstance(row, (list, tuple)) else [row]
+        rows.append([str(cell).strip() for cell in cells])
+    return format_table_rows(rows)
+
+def _api_property(field, *records):
+    for record in records:
+        value = _api_field(record, field)
+        if value is not None:
+            return value
+        properties = _api_field(record, 'properties')
+        if isinstance(properties, dict):
+            value = _api_field(properties, field)
+            if value is not None:
+                return value
+    return None
+
+def _is_api_thickness(record):
+    return isinstance(record, dict) and _api_field(record, 'thickness') is not None
+
+@timed('parse', 'oshcut')
+def build_oshcut_rows_from_api(responses):
+    """Build ``parse_and_collect_all_categories``-style rows from captured JSON.
+
+    A material is any object with a name and a list of thickness records;
+    its category comes from its own category field or from the nearest
+    named ancestor object. K-factor and bend tables are looked up on the
+    thickness record first, then on the material.
+    """
+    rows = []
+    seen = set()
+
+    def walk(node, category):
+        if isinstance(node, list):
+            for item in node:
+                walk(item, category)
+            return
+        if not isinstance(node, dict):
+            return
+        name = _api_name(_api_field(node, 'name'))
+        thicknesses = _api_field(node, 'thicknesses')
+        if name and isinstance(thicknesses, list) and any(_is_api_thickness(t) for t in thicknesses):
+            material_category = _api_name(_api_field(node, 'category')) or category or ''
+            for thickness in thicknesses:
+                if not _is_api_thickness(thickness):
+                    continue
+                k_factor = _api_property('K-factor', thickness, node)
+                row = {
+                    'Category': material_category,
+                    'Material Name': name,
+                    'Thickness Name': _api_thickness_name(_api_field(thickness, 'thickness')),
+                    'K-factor': str(k_factor) if k_factor is not None else 'Not Found',
+                }
+                for field in OSHCUT_API_TABLE_FIELDS:
+                    row[field] = _api_table_text(_api_property(field, thickness, node))
+                key = (row['Category'], row['Material Name'], row['Thickness Name'])
+                if key not in seen:
+                    seen.add(key)
+                    rows.append(row)
+            return
+        child_category = name if name and any(isinstance(v, list) for v in node.values()) else category
+        for value in node.values():
+            walk(value, child_category)
+
+    for response in responses:
+        walk(response.get('body'), None)
+    logging.info(f"Built {len(rows)} OSH Cut rows from {len(responses)} API responses.")
+    return rows
+
+def incomplete_api_rows(rows):
+    """Rows built from the API that lack the K-factor or a bend table."""
+    return [row for row in rows
+            if any(row.get(field) in (None, '', 'Not Found') for field in ('K-factor',) + OSHCUT_API_TABLE_FIELDS)]
+
+def collect_oshcut_from_api(driver, screenshot_folder):
+    """Build OSH Cut rows from the JSON the catalog page fetched while loading."""
+    try:
+        responses = capture_json_responses(driver)
+    except Exception as e:
+        logging.error(f"Failed to capture OSH Cut API responses: {e}")
+        return []
+    if responses:
+        save_api_capture(responses, os.path.join(screenshot_folder, OSHCUT_API_CAPTURE_FILE))
+        archive.add('oshcut_api', *OSHCUT_API_WORK_UNIT, 'catalog', json.dumps(responses, ensure_ascii=False),
+                    url=OSHCUT_SHEET_URL)
+    return build_oshcut_rows_from_api(responses)
+
+# Единица работы для режима 'api': весь каталог одной загрузкой страницы.
+OSHCUT_API_WORK_UNIT = ('(catalog api)', '*')
+
+def parse_oshcut(acquisition=OSHCUT_ACQUISITION_MODE, api_fixture=None, checkpoints=None, cache=None, pool=None):
+    load_scraping_modules()
+    if api_fixture:
+        # Офлайн-режим: строки из ранее записанных ответов API, без браузера.
+        df_oshcut = pd.DataFrame(build_oshcut_rows_from_api(load_api_capture(api_fixture)))
+        if not df_oshcut.empty:
+            df_oshcut['Source'] = 'OSH Cut'
+        return df_oshcut
+    if checkpoints and acquisition == 'api':
+        saved_rows = checkpoints.completed_rows('OSH Cut', *OSHCUT_API_WORK_UNIT)
+        if saved_rows:
+            logging.info(f"OSH Cut catalog already captured in this run. Reusing {len(saved_rows)} rows.")
+            df_oshcut = pd.DataFrame(saved_rows)
+            df_oshcut['Source'] = 'OSH Cut'
+            return df_oshcut
+    screenshot_folder = init_screenshot_folder()
+    logging.info(f"Screenshot folder created: {screenshot_folder}")
+    driver = None
+    df_oshcut = pd.DataFrame()
+    healthy = True
+    try:
+        driver = acquire_driver(screenshot_folder, network_logging=(acquisition == 'api'), source='oshcut', pool=pool)
+        navigate_to_sheet_page(driver, screenshot_folder)
+        data = []
+        if acquisition == 'api':
+            data = collect_oshcut_from_api(driver, screenshot_folder)
+            incomplete = incomplete_api_rows(data)
+            if incomplete:
+                # Поля API, скорее всего, сопоставлены неверно — надёжнее обойти интерфейс.
+                logging.warning(f"{len(incomplete)} of {len(data)} OSH Cut API rows lack the K-factor or bend "
+                                f"tables. Falling back to the UI click-through.")
+                data = []
+            elif data and checkpoints:
+                checkpoints.mark_done('OSH Cut', *OSHCUT_API_WORK_UNIT, data)
+            elif not data:
+                logging.warning("No catalog data found in API responses. Falling back to the UI click-through.")
+        if not data:
+            data = parse_and_collect_all_categories(driver, screenshot_folder, checkpoints, cache)
+        df_oshcut = pd.DataFrame(data)
+        df_oshcut['Source'] = 'OSH Cut'
+    except Exception as e:
+        logging.error(f"Error during OSH Cut parsing: {e}")
+        df_oshcut = pd.DataFrame()
+        healthy = False
+    finally:
+        if driver:
+            try:
+                save_screenshot(driver, screenshot_folder, 'final_screenshot.png')
+            except Exception as e:
+                logging.error(f"Failed to save final screenshot: {e}")
+            release_driver(driver, pool, healthy)
+            logging.info("WebDriver released.")
+    return df_oshcut
+
+
+# -------------------------------
+# Новый функционал: Парсинг с сайта SendCutSend
+# -------------------------------
+def scroll_to_bottom(driver, key='scroll_to_bottom'):
+    wait_for_page_settled(driver, key, quiet_ms=700, scroll=True)
+    logging.info("Reached bottom of the page.")
+
+def analyze_debug_page():
+    try:
+        with open('debug_page.html', 'r', encoding='utf-8') as f:
+            html_content = f.read()
+        soup = BeautifulSoup(html_content, 'html.parser')
+        error_messages = [
+            "Access Denied", "403 Forbidden", "404 Not Found", "Please complete the CAPTCHA",
+            "Our systems have detected unusual traffic", "Error", "This page isn't working",
+            "We're sorry, but something went wrong", "You have been blocked", "Доступ запрещен",
+            "Страница не найдена", "Ошибка", "Вы были заблокированы", "Cloudflare"
+        ]
+        page_text = soup.get_text(separator=' ').strip()
+        found_error = False
+        for error_msg in error_messages:
+            if error_msg.lower() in page_text.lower():
+                logging.error(f"Error message found on page: '{error_msg}'")
+                found_error = True
+                break
+        if not found_error:
+            logging.info("No explicit error messages found on the page.")
+    except Exception as e:
+        logging.error(f"Error analyzing debug_page.html: {e}")
+
+def get_subcategory_links(driver):
+    try:
+        menu = driver.find_element(By.ID, "menu-1-711fca")
+        categories = menu.find_elements(By.CSS_SELECTOR, 'li.menu-item-has-children')
+        logging.info(f"Found {len(categories)} material categories.")
+        subcategory_links = []
+        for category in categories:
+            try:
+                category_link = category.find_element(By.CSS_SELECTOR, 'a')
+                category_name = category_link.text.strip().title()
+                logging.info(f"Processing category: {category_name}")
+                action = ActionChains(driver)
+                action.move_to_element(category_link).perform()
+                wait_for_page_settled(driver, 'sendcutsend_menu_hover', quiet_ms=150, network=False)
+                submenu = category.find_element(By.CSS_SELECTOR, 'ul.sub-menu')
+                sublinks = submenu.find_elements(By.CSS_SELECTOR, 'li a')
+                logging.info(f"Found {len(sublinks)} materials in category '{category_name}'")
+                for sublink in sublinks:
+                    href = sublink.get_attribute('href')
+                    material_name = sublink.get_attribute('textContent').strip().title()
+                    logging.info(f"Found material: {material_name} - {href}")
+                    if href:
+                        subcategory_links.append((category_name, material_name, href))
+            except Exception as e:
+                logging.error(f"Error processing category: {e}")
+                continue
+        logging.info(f"Total materials found across all categories: {len(subcategory_links)}")
+        return subcategory_links
+    except Exception as e:
+        logging.error(f"Error retrieving categories and subcategories: {e}")
+        driver.save_screenshot('metals_menu_error.png')
+        logging.info("Screenshot saved as metals_menu_error.png.")
+        analyze_debug_page()
+        return []
+
+def _sendcutsend_row(category_name, material_name, thickness=""):
+    return {
+        "Category": category_name,
+        "Material Name": material_name,
+        "Thickness": thickness,
+        "Effective bend radius @90°": "",
+        "K factor": "",
+        "Gauge": ""
+    }
+
+def parse_spec_table(parsed_table, category_name, material_name, thickness=None):
+    """Parse one SendCutSend spec table (a BeautifulSoup ``table`` tag).
+
+    With ``thickness=None`` the thickness is read from the 'Advertised
+    Thickness' row. Returns the row dict, or None when no thickness in
+    inches could be determined.
+    """
+    rows = parsed_table.find_all('tr')
+    data = _sendcutsend_row(category_name, material_name, thickness if thickness is not None else "")
+    thickness_is_inches = thickness is not None
+    for row in rows:
+        cols = row.find_all(['th', 'td'])
+        if len(cols) != 2:
+            continue
+        key = cols[0].get_text(strip=True).lower()
+        value = cols[1].get_text(strip=True)
+        if 'advertised thickness' in key:
+            if thickness is None and '"' in value:
+                data["Thickness"] = value.replace('"', '').strip()
+                thickness_is_inches = True
+        elif 'effective bend radius' in key:
+            data["Effective bend radius @90°"] = value.replace('"', '').strip()
+        elif 'k factor' in key:
+            data["K factor"] = value.replace('"', '').strip()
+        elif 'gauge' in key:
+            data["Gauge"] = value.replace('"', '').strip()
+    if thickness is None:
+        if data["Thickness"] and thickness_is_inches:
+            logging.info(f"Extracted data for {material_name} (thickness {data['Thickness']}\"): {data}")
+            return data
+        if data["Thickness"]:
+            logging.warning(f"Thickness not in inches for '{material_name}'. Skipping value {data['Thickness']}.")
+        else:
+            logging.warning(f"'Advertised Thickness' not found in table for '{material_name}'.")
+        return None
+    logging.info(f"Extracted data for {material_name} (thickness {thickness}\"): {data}")
+    return data
+
+@timed('parse', 'sendcutsend')
+def parse_subcategory_html(html, category_name, material_name, require_tables=True):
+    """Extract SendCutSend rows from the HTML of a subcategory page.
+
+    Mirrors the Selenium logic of ``scrape_subcategory``. Returns None when
+    the Elementor tabs markup (``div.e-n-tabs-content``, with spec tables
+    if ``require_tables``) is missing, e.g. because the page needs
+    JavaScript to render it.
+    """
+    load_scraping_modules()
+    soup = BeautifulSoup(html, 'html.parser')
+    tabs_content = soup.select_one("div.e-n-tabs-content")
+    if tabs_content is None or (require_tables and tabs_content.find('table') is None):
+        return None
+    thickness_mapping = {}
+    tabs_heading = soup.select_one("div.e-n-tabs-heading")
+    if tabs_heading is not None:
+        for button in tabs_heading.select('button.e-n-tab-title'):
+            title = button.select_one('span.e-n-tab-title-text')
+            if title is None:
+                logging.error(f"Error extracting thicknesses for '{material_name}': tab title text not found.")
+                thickness_mapping = {}
+                break
+            thickness_text = title.get_text(strip=True)
+            if '"' in thickness_text:
+                aria_controls = button.get('aria-controls')
+                if aria_controls:
+                    thickness_mapping[aria_controls] = thickness_text.replace('"', '').strip()
+    logging.info(f"Extracted thicknesses (inches only): {thickness_mapping}")
+    data_list = []
+    if not thickness_mapping:
+        logging.warning(f"No thickness found via tabs for '{material_name}'. Attempting table extraction.")
+        tables = tabs_content.find_all('table')
+        logging.info(f"Found {len(tables)} spec tables for '{material_name}'.")
+        for table in tables:
+            data = parse_spec_table(table, category_name, material_name)
+            if data:
+                data_list.append(data)
+    else:
+        content_divs = tabs_content.select('div[id^="e-n-tab-content-"]')
+        logging.info(f"Found {len(content_divs)} content divs for '{material_name}'.")
+        for content_div in content_divs:
+            content_id = content_div.get('id')
+            thickness = thickness_mapping.get(content_id, "Unknown")
+            if thickness == "Unknown":
+                logging.warning(f"Thickness undefined for content_id {content_id}. Skipping.")
+                continue
+            tables = content_div.find_all('table')
+            logging.info(f"Found {len(tables)} spec tables for thickness {thickness}\".")
+            if not tables:
+                logging.warning(f"No spec tables found for '{material_name}' thickness '{thickness}'.")
+                continue
+            for table in tables:
+                data_list.append(parse_spec_table(table, category_name, material_name, thickness))
+    if not data_list:
+        data = _sendcutsend_row(category_name, material_name, "N/A")
+        logging.info(f"Extracted data for {material_name} (thickness N/A): {data}")
+        data_list.append(data)
+    return data_list
+
+# 'snapshot' — весь контейнер вкладок забирается одним execute_script и разбирается локально;
+# 'elements' — прежний режим с find_element/get_attribute на каждую вкладку и таблицу.
+SENDCUTSEND_EXTRACTION_MODE = 'snapshot'
+
+TABS_SNAPSHOT_JS = """
+var content = document.querySelector('div.e-n-tabs-content');
+if (!content) { return null; }
+var heading = document.querySelector('div.e-n-tabs-heading');
+return (heading ? heading.outerHTML : '') + content.outerHTML;
+"""
+
+@timed('navigation', 'sendcutsend')
+def load_subcategory_page(driver, url):
+    try:
+        logging.info(f"Loading subcategory: {url}")
+        driver.get(url)
+        WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+        logging.info("Scrolling to bottom of the page to load all content.")
+        scroll_to_bottom(driver, 'sendcutsend_subcategory_scroll')
+        driver.execute_script("window.scrollTo(0, 0);")
+        return True
+    except Exception as e:
+        logging.error(f"Error loading subcategory {url}: {e}")
+        driver.save_screenshot('subcategory_generic_error.png')
+        logging.info("Screenshot saved as subcategory_generic_error.png.")
+        return False
+
+def scrape_subcategory(driver, category_name, material_name, url, extraction=SENDCUTSEND_EXTRACTION_MODE, cache=None):
+    if not load_subcategory_page(driver, url):
+        return []
+    logging.info(f"Parsing material: {material_name}")
+    if extraction == 'snapshot':
+        return extract_subcategory_snapshot(driver, category_name, material_name, cache,
+                                            subcategory_cache_key(category_name, material_name, url), url)
+    return extract_subcategory_elements(driver, category_name, material_name)
+
+@timed('extract', 'sendcutsend')
+def extract_subcategory_snapshot(driver, category_name, material_name, cache=None, cache_key=None, url=None):
+    """Read the tabs container in a single WebDriver call and parse it locally.
+
+    With a ``cache``, rows stored for an identical snapshot are reused.
+    The snapshot goes to the archive when one is being recorded.
+    """
+    try:
+        snapshot = driver.execute_script(TABS_SNAPSHOT_JS)
+    except Exception as e:
+        logging.error(f"Error taking tabs snapshot for '{material_name}': {e}")
+        snapshot = None
+    if not snapshot:
+        logging.error(f"Could not find div 'e-n-tabs-content' for material '{material_name}'.")
+        driver.save_screenshot('tabs_content_error.png')
+        logging.info("Screenshot saved as tabs_content_error.png.")
+        return []
+    logging.info("Found div with class 'e-n-tabs-content'.")
+    archive.add('sendcutsend_tabs', category_name, material_name, url, snapshot, url)
+    fingerprint = content_fingerprint(snapshot)
+    if cache:
+        entry = cache.get(cache_key, max_age=SENDCUTSEND_CACHE_TTL)
+        if entry and entry['fingerprint'] == fingerprint:
+            logging.info(f"Tabs content unchanged for '{material_name}', reusing cached rows.")
+            return cache.hit(cache_key)
+    data_list = parse_subcategory_html(snapshot, category_name, material_name, require_tables=False)
+    if cache:
+        cache.put(cache_key, data_list, fingerprint)
+    return data_list
+
+@timed('extract', 'sendcutsend')
+def extract_subcategory_elements(driver, category_name, material_name):
+    data_list = []
+    try:
+        try:
+            tabs_content = driver.find_element(By.CSS_SELECTOR, "div.e-n-tabs-content")
+            logging.info("Found div with class 'e-n-tabs-content'.")
+        except Exception as e:
+            logging.error(f"Could not find div 'e-n-tabs-content' for material '{material_name}': {e}")
+            driver.save_screenshot('tabs_content_error.png')
+            logging.info("Screenshot saved as tabs_content_error.png.")
+            return []
+        try:
+            tabs_heading = driver.find_element(By.CSS_SELECTOR, "div.e-n-tabs-heading")
+            tab_buttons = tabs_heading.find_elements(By.CSS_SELECTOR, 'button.e-n-tab-title')
+            thickness_mapping = {}
+            for button in tab_buttons:
+                thickness_text = button.find_element(By.CSS_SELECTOR, 'span.e-n-tab-title-text').text.strip()
+                if '"' in thickness_text:
+                    thickness = thickness_text.replace('"', '').strip()
+                    aria_controls = button.get_attribute('aria-controls')
+                    if aria_controls:
+                        thickness_mapping[aria_controls] = thickness
+            logging.info(f"Extracted thicknesses (inches only): {thickness_mapping}")
+        except Exception as e:
+            logging.error(f"Error extracting thicknesses for '{material_name}': {e}")
+            driver.save_screenshot('thickness_extraction_error.png')
+            logging.info("Screenshot saved as thickness_extraction_error.png.")
+            thickness_mapping = {}
+        if not thickness_mapping:
+            logging.warning(f"No thickness found via tabs for '{material_name}'. Attempting table extraction.")
+            try:
+                tables = tabs_content.find_elements(By.TAG_NAME, 'table')
+                logging.info(f"Found {len(tables)} spec tables for '{material_name}'.")
+                for table in tables:
+                    table_html = table.get_attribute('outerHTML')
+                    soup = BeautifulSoup(table_html, 'html.parser')
+                    parsed_table = soup.find('table')
+                    if not parsed_table:
+                        continue
+                    data = parse_spec_table(parsed_table, category_name, material_name)
+                    if data:
+                        data_list.append(data)
+            except Exception as e:
+                logging.error(f"Error extracting thickness from tables for '{material_name}': {e}")
+                return data_list
+        else:
+            try:
+                content_divs = tabs_content.find_elements(By.CSS_SELECTOR, 'div[id^="e-n-tab-content-"]')
+                logging.info(f"Found {len(content_divs)} content divs for '{material_name}'.")
+                for content_div in content_divs:
+                    content_id = content_div.get_attribute('id')
+                    thickness = thickness_mapping.get(content_id, "Unknown")
+                    if thickness == "Unknown":
+                        logging.warning(f"Thickness undefined for content_id {content_id}. Skipping.")
+                        continue
+                    tables = content_div.find_elements(By.TAG_NAME, 'table')
+                    logging.info(f"Found {len(tables)} spec tables for thickness {thickness}\".")
+                    if not tables:
+                        logging.warning(f"No spec tables found for '{material_name}' thickness '{thickness}'.")
+                        continue
+                    for table in tables:
+                        table_html = table.get_attribute('outerHTML')
+                        soup = BeautifulSoup(table_html, 'html.parser')
+                        parsed_table = soup.find('table')
+                        if not parsed_table:
+                            continue
+                        data_list.append(parse_spec_table(parsed_table, category_name, material_name, thickness))
+            except Exception as e:
+                logging.error(f"Error processing tables with thicknesses for '{material_name}': {e}")
+    except Exception as e:
+        logging.error(f"Error processing material '{material_name}': {e}")
+        driver.save_screenshot('material_processing_error.png')
+        logging.info("Screenshot saved as material_processing_error.png.")
+    if not data_list:
+        data = _sendcutsend_row(category_name, material_name, "N/A")
+        logging.info(f"Extracted data for {material_name} (thickness N/A): {data}")
+        data_list.append(data)
+    return data_list
+
+# -------------------------------
+# HTTP-загрузка страниц SendCutSend (без браузера)
+# -------------------------------
+SENDCUTSEND_URL = "https://sendcutsend.com/materials/"
+SENDCUTSEND_WORKERS = 4
+# SENDCUTSEND_PARSER_VERSION входит в ключ кэша: увеличить при изменении разбора страницы.
+# Строки из кэша действуют не дольше суток, как и у OSH Cut.
+SENDCUTSEND_PARSER_VERSION = 1
+SENDCUTSEND_CACHE_TTL = OSHCUT_MODAL_CACHE_TTL
+# 'http' — страницы скачиваются напрямую, Selenium используется только как запасной вариант;
+# 'browser' — прежний режим, всё через Chrome.
+SENDCUTSEND_FETCH_MODE = 'http'
+HTTP_TIMEOUT = 30
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def set_base_urls(oshcut=None, sendcutsend=None):
+    """Point the scrapers at another host, e.g. the offline fixture site in benchmarks/.
+
+    ``oshcut`` is the URL of the sheet catalog page, ``sendcutsend`` the
+    URL of the materials page; API capture follows the OSH Cut host.
+    """
+    global OSHCUT_SHEET_URL, OSHCUT_API_URL_PATTERNS, SENDCUTSEND_URL
+    if oshcut:
+        OSHCUT_SHEET_URL = oshcut
+        OSHCUT_API_URL_PATTERNS = (urlparse(oshcut).netloc,)
+    if sendcutsend:
+        SENDCUTSEND_URL = sendcutsend
+    if oshcut or sendcutsend:
+        logging.info(f"Base URLs: OSH Cut {OSHCUT_SHEET_URL}, SendCutSend {SENDCUTSEND_URL}")
+
+def get_http_session(pool_size=SENDCUTSEND_WORKERS):
+    """Return the shared keep-alive ``requests`` session."""
+    load_scraping_modules()
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(HTTP_HEADERS)
+            _http_session = session
+        return _http_session
+
+@timed('http_fetch', 'sendcutsend')
+def fetch_page(url, headers=None):
+    response = get_http_session().get(url, headers=headers, timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    if 'charset' not in response.headers.get('Content-Type', '').lower():
+        response.encoding = 'utf-8'
+    return response
+
+def fetch_page_html(url):
+    return fetch_page(url).text
+
+def extract_tabs_region(html):
+    """Cheap slice of a subcategory page from the tabs markup to the last table, for fingerprinting."""
+    start = html.find('e-n-tabs-heading')
+    if start == -1:
+        start = html.find('e-n-tabs-content')
+    if start == -1:
+        return None
+    end = html.rfind('</table>')
+    return html[start:end] if end > start else html[start:]
+
+@timed('parse', 'sendcutsend')
+def parse_subcategory_links_html(html, base_url):
+    """HTML counterpart of ``get_subcategory_links`` for the materials menu."""
+    load_scraping_modules()
+    soup = BeautifulSoup(html, 'html.parser')
+    menu = soup.find(id="menu-1-711fca")
+    if menu is None:
+        return []
+    subcategory_links = []
+    for category in menu.select('li.menu-item-has-children'):
+        category_link = category.find('a')
+        submenu = category.select_one('ul.sub-menu')
+        if category_link is None or submenu is None:
+            continue
+        category_name = category_link.get_text(strip=True).title()
+        for sublink in submenu.select('li a'):
+            href = sublink.get('href')
+            material_name = sublink.get_text().strip().title()
+            if href:
+                subcategory_links.append((category_name, material_name, urljoin(base_url, href)))
+    logging.info(f"Total materials found across all categories (HTTP): {len(subcategory_links)}")
+    return subcategory_links
+
+def tabs_snapshot_html(html):
+    """BeautifulSoup counterpart of ``TABS_SNAPSHOT_JS``: the tabs heading and content markup, or None."""
+    load_scraping_modules()
+    soup = BeautifulSoup(html, 'html.parser')
+    content = soup.select_one("div.e-n-tabs-content")
+    if content is None:
+        return None
+    heading = soup.select_one("div.e-n-tabs-heading")
+    return (str(heading) if heading is not None else '') + str(content)
+
+def subcategory_cache_key(category_name, material_name, url):
+    return f"sendcutsend|v{SENDCUTSEND_PARSER_VERSION}|{category_name}|{material_name}|{url}"
+
+def scrape_subcategory_http(category_name, material_name, url, cache=None):
+    """Fetch and parse a subcategory page without a browser.
+
+    With a ``cache`` the request is conditional (If-None-Match /
+    If-Modified-Since) and parsing is skipped when the server answers 304
+    or the tabs region is unchanged; entries older than
+    ``SENDCUTSEND_CACHE_TTL`` are not reused. Returns None when the page has to be
+    rendered by Selenium instead. While an archive is recorded requests
+    are unconditional, so that every page yields a snapshot.
+    """
+    cache_key = subcategory_cache_key(category_name, material_name, url)
+    entry = cache.get(cache_key, max_age=SENDCUTSEND_CACHE_TTL) if cache and not archive.active else None
+    headers = {}
+    if entry and entry['etag']:
+        headers['If-None-Match'] = entry['etag']
+    if entry and entry['last_modified']:
+        headers['If-Modified-Since'] = entry['last_modified']
+    try:
+        logging.info(f"Fetching subcategory over HTTP: {url}")
+        response = fetch_page(url, headers=headers)
+    except Exception as e:
+        logging.warning(f"HTTP fetch failed for {url}: {e}. Falling back to the browser.")
+        return None
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if response.status_code == 304 and entry:
+        logging.info(f"Not modified, reusing cached rows: {url}")
+        return cache.hit(cache_key, etag, last_modified)
+    html = response.text
+    if archive.active:
+        archive.add('sendcutsend_tabs', category_name, material_name, url, tabs_snapshot_html(html), url)
+    region = extract_tabs_region(html)
+    fingerprint = content_fingerprint(region) if region is not None else None
+    if entry and fingerprint and entry['fingerprint'] == fingerprint:
+        logging.info(f"Tabs content unchanged, reusing cached rows: {url}")
+        return cache.hit(cache_key, etag, last_modified)
+    logging.info(f"Parsing material: {material_name}")
+    data_list = parse_subcategory_html(html, category_name, material_name)
+    if data_list is None:
+        logging.warning(f"Expected tabs markup missing in {url}. Falling back to the browser.")
+    elif cache and fingerprint:
+        cache.put(cache_key, data_list, fingerprint, etag, last_modified)
+    return data_list
+
+def scrape_subcategories_parallel(subcategory_links, screenshot_folder, workers=SENDCUTSEND_WORKERS, driver=None,
+                                  fetch_mode=SENDCUTSEND_FETCH_MODE, checkpoints=None, cache=None, pool=None):
+    """Scrape subcategory pages with a pool of workers.
+
+    Workers pull ``(index, link)`` items from a shared queue. In 'http' mode
+    a page is downloaded and parsed directly and a worker starts its own
+    driver only for pages that need rendering; in 'browser' mode every
+    page goes through ``scrape_subcategory``. The optional ``driver`` is
+    reused by the first worker; with a ``DriverPool`` drivers are taken
+    from and returned to it instead of being started and quit. Results are merged back in the order of
+    ``subcategory_links``. With ``checkpoints`` every page is a work unit:
+    finished pages are skipped and each result is recorded as it arrives.
+    """
+    total = len(subcategory_links)
+    workers = max(1, min(workers, total))
+    work_queue = queue.Queue()
+    for idx, link in enumerate(subcategory_links):
+        work_queue.put((idx, link))
+    results = {}
+    results_lock = threading.Lock()
+
+    def worker(worker_id, worker_driver):
+        try:
+            while True:
+                try:
+                    idx, (category_name, material_name, sub_url) = work_queue.get_nowait()
+                except queue.Empty:
+                    break
+                saved_rows = checkpoints.completed_rows('SendCutSend', category_name, material_name) if checkpoints else None
+                if saved_rows is not None:
+                    logging.info(f"[worker {worker_id}] Subcategory [{idx+1}/{total}] already done in this run: {sub_url}")
+                    with results_lock:
+                        results[idx] = saved_rows
+                    continue
+                logging.info(f"[worker {worker_id}] Processing subcategory [{idx+1}/{total}]: {sub_url}")
+                data = None
+                with metrics.profile_work_unit(material_name):
+                    if fetch_mode == 'http':
+                        data = scrape_subcategory_http(category_name, material_name, sub_url, cache)
+                        if data is None:
+                            metrics.count('browser_fallbacks', 'sendcutsend')
+                    if data is None:
+                        try:
+                            if worker_driver is None:
+                                worker_driver = acquire_driver(screenshot_folder, source='sendcutsend', pool=pool)
+                            data = scrape_subcategory(worker_driver, category_name, material_name, sub_url, cache=cache)
+                        except Exception as e:
+                            logging.error(f"[worker {worker_id}] Error scraping subcategory {sub_url}: {e}")
+                            data = []
+                            if worker_driver is not None:
+                                # Драйвер после исключения может быть неисправен: в пул не возвращаем,
+                                # следующая страница возьмёт новый.
+                                try:
+                                    release_driver(worker_driver, pool, healthy=False)
+                                except Exception as release_error:
+                                    logging.error(f"Worker {worker_id}: failed to close WebDriver: {release_error}")
+                                worker_driver = None
+                if checkpoints:
+                    # scrape_subcategory возвращает [] только если страницу не удалось обработать.
+                    if data:
+                        checkpoints.mark_done('SendCutSend', category_name, material_name, data)
+                    else:
+                        checkpoints.mark_failed('SendCutSend', category_name, material_name, f"No data from {sub_url}")
+                with results_lock:
+                    results[idx] = data
+        finally:
+            if worker_driver is not None:
+                try:
+                    release_driver(worker_driver, pool)
+                except Exception as e:
+                    logging.error(f"Worker {worker_id}: failed to close WebDriver: {e}")
+
+    threads = []
+    for worker_id in range(workers):
+        thread = threading.Thread(
+            target=worker,
+            args=(worker_id + 1, driver if worker_id == 0 else None),
+            name=f"sendcutsend-worker-{worker_id + 1}",
+            daemon=True,
+        )
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+
+    missing = [idx for idx in range(total) if idx not in results]
+    if missing:
+        logging.error(f"{len(missing)} subcategories were not processed.")
+    all_data = []
+    for idx in range(total):
+        all_data.extend(results.get(idx, []))
+    return all_data
+
+def scrape_materials_page(workers=SENDCUTSEND_WORKERS, fetch_mode=SENDCUTSEND_FETCH_MODE, checkpoints=None, cache=None,
+                          pool=None):
+    load_scraping_modules()
+    url = SENDCUTSEND_URL
+    logging.info(f"Navigating to main page: {url}")
+    screenshot_folder = init_screenshot_folder()
+    driver = None
+    subcategory_links = []
+    if fetch_mode == 'http':
+        try:
+            subcategory_links = parse_subcategory_links_html(fetch_page_html(url), url)
+        except Exception as e:
+            logging.warning(f"HTTP fetch of the main page failed: {e}")
+        if not subcategory_links:
+            logging.warning("Materials menu not found in the HTTP response. Falling back to the browser.")
+    if not subcategory_links:
+        driver = acquire_driver(screenshot_folder, source='sendcutsend', pool=pool)
+        with metrics.time('navigation', 'sendcutsend'):
+            driver.get(url)
+        try:
+            WebDriverWait(driver, 60).until(
+                EC.presence_of_element_located((By.ID, "menu-1-711fca"))
+            )
+            logging.info("Main page loaded successfully.")
+        except Exception as e:
+            logging.error(f"Error loading main page: {e}")
+            with open('debug_page.html', 'w', encoding='utf-8') as f:
+                f.write(driver.page_source)
+            logging.info("Page HTML saved to debug_page.html for debugging.")
+            driver.save_screenshot('main_page_error.png')
+            logging.info("Screenshot saved as main_page_error.png.")
+            analyze_debug_page()
+            release_driver(driver, pool, healthy=False)
+            return []
+        subcategory_links = get_subcategory_links(driver)
+        if not subcategory_links:
+            logging.error("No subcategories to process.")
+            release_driver(driver, pool)
+            return []
+    logging.info(f"Scraping {len(subcategory_links)} subcategories with {workers} workers ({fetch_mode} mode).")
+    # Драйвер главной страницы (если он понадобился) становится первым воркером пула.
+    return scrape_subcategories_parallel(subcategory_links, screenshot_folder, workers, driver=driver,
+                                         fetch_mode=fetch_mode, checkpoints=checkpoints, cache=cache, pool=pool)
+
+# -------------------------------
+# Хранилище materials.db: типизированная схема и upsert по естественному ключу
+# -------------------------------
+MATERIALS_DB = 'materials.db'
+MATERIALS_TABLE = 'materials_combined'
+# (column, SQL type) in display order; "Thickness Key" is the text form of the
+# thickness used in the natural key, so rows without a numeric thickness still
+# get a non-NULL key.
+MATERIALS_SCHEMA = [
+    ("Category", "TEXT NOT NULL"),
+    ("Material Name", "TEXT NOT NULL"),
+    ("Thickness Name", "TEXT"),
+    ("K-factor", "REAL"),
+    ("Minimum Flange Support", "TEXT"),
+    ("Bend Deduction", "TEXT"),
+    ("Maximum Bend Length", "TEXT"),
+    ("Source", "TEXT NOT NULL"),
+    ("Thickness", "REAL"),
+    ("Effective bend radius @90°", "REAL"),
+    ("K factor", "REAL"),
+    ("Gauge", "TEXT"),
+    ("Thickness Key", "TEXT NOT NULL"),
+    ("Row Hash", "INTEGER"),
+    ("Updated At", "TEXT"),
+]
+MATERIALS_COLUMNS = [name for name, _ in MATERIALS_SCHEMA]
+MATERIALS_KEY = ["Source", "Category", "Material Name", "Thickness Key"]
+# Явный INTEGER PRIMARY KEY: неявный rowid может измениться при VACUUM, а на нём
+# держатся индекс FTS5 и позиции строк в окне результатов.
+MATERIALS_ROW_ID = "row_id"
+MATERIALS_INDEXES = {
+    "idx_materials_material": ["Material Name"],
+    "idx_materials_category": ["Category"],
+    "idx_materials_lookup": ["Source", "Material Name", "Thickness"],
+    "idx_materials_row_hash": ["Row Hash"],
+}
+# Columns whose content the row hash covers (everything except the key and bookkeeping).
+MATERIALS_VALUE_COLUMNS = [c for c in MATERIALS_COLUMNS if c not in MATERIALS_KEY + ["Row Hash", "Updated At"]]
+CHANGES_TABLE = 'changes'
+UPSERT_BATCH_SIZE = 1000
+# Сколько совпавших ключей перечислять в предупреждении prepare_materials_frame.
+DUPLICATE_KEYS_LOGGED = 20
+# Bend parameters in long format: one row per material, thickness, parameter and
+# table row ("Condition", e.g. a bend radius or angle), with numeric values parsed at ingest.
+BEND_TABLE = 'bend_parameters'
+BEND_SCHEMA = [
+    ("Source", "TEXT NOT NULL"),
+    ("Category", "TEXT NOT NULL"),
+    ("Material Name", "TEXT NOT NULL"),
+    ("Thickness Key", "TEXT NOT NULL"),
+    ("Thickness", "REAL"),
+    ("Gauge", "INTEGER"),
+    ("Parameter", "TEXT NOT NULL"),
+    ("Condition", "TEXT NOT NULL"),
+    ("Condition Value", "REAL"),
+    ("Value", "REAL"),
+    ("Value Text", "TEXT"),
+]
+BEND_COLUMNS = [name for name, _ in BEND_SCHEMA]
+BEND_KEY = MATERIALS_KEY + ["Parameter", "Condition"]
+BEND_INDEXES = {
+    "idx_bend_lookup": ["Parameter", "Material Name", "Thickness"],
+    "idx_bend_material": ["Material Name", "Thickness"],
+}
+# materials column -> parameter name; both K-factor spellings are one parameter.
+BEND_SCALAR_PARAMETERS = {
+    "K-factor": "K-factor",
+    "K factor": "K-factor",
+    "Effective bend radius @90°": "Effective bend radius @90°",
+}
+# OSH Cut tables flattened by format_table_rows ("a | b; c | d").
+BEND_TABLE_PARAMETERS = ("Minimum Flange Support", "Bend Deduction", "Maximum Bend Length")
+# "16", "16ga", "16 gauge", "#16"
+GAUGE_PATTERN = r'^\s*#?\s*(\d+)\s*(?:ga\b|gauge\b|g\b|$)'
+# Full-text index: FTS5 column -> materials column. FTS5 column filters need
+# bareword names, hence the short aliases.
+MATERIALS_FTS_TABLE = 'materials_fts'
+MATERIALS_FTS_COLUMNS = {
+    'category': 'Category',
+    'material': 'Material Name',
+    'thickness': 'Thickness Name',
+    'gauge': 'Gauge',
+    'source': 'Source',
+}
+# '.', '/' and '-' stay inside tokens so that "0.125", "1/8" and "5052-H32" are searchable as typed.
+MATERIALS_FTS_TOKENIZER = "unicode61 remove_diacritics 2 tokenchars '.-/'"
+SEARCH_RESULT_LIMIT = 500
+SEARCH_DEBOUNCE_MS = 250
+# Окно результатов читает строки из SQLite блоками и держит в памяти только последние из них.
+RESULTS_BLOCK_ROWS = 100
+RESULTS_CACHED_BLOCKS = 16
+
+# Decimal (".040", "0.125") or fractional ("1/8", "1-1/2", "1 1/2") inches at the start of a value.
+INCHES_PATTERN = r'^\s*(?:(?P<whole>\d+)(?:\s+|-)(?=\d+\s*/))?(?:(?P<num>\d+)\s*/\s*(?P<den>\d+)|(?P<dec>\d*\.\d+|\d+))'
+
+def quote_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+@contextmanager
+def transaction(conn):
+    """One explicit transaction, DDL included; nested uses join the outer one.
+
+    ``with conn:`` alone does not open a transaction before CREATE/DROP and
+    commits at the end of every nested block.
+    """
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute("BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+def parse_inches_series(series):
+    """Vectorised inch parser: decimal or fractional values, NaN if unparseable."""
+    load_pandas()
+    parts = series.astype(str).str.extract(INCHES_PATTERN)
+    whole = pd.to_numeric(parts['whole'], errors='coerce').fillna(0)
+    # Нулевой знаменатель даёт NaN, а не бесконечность.
+    fraction = pd.to_numeric(parts['num'], errors='coerce') / \
+        pd.to_numeric(parts['den'], errors='coerce').replace(0, float('nan'))
+    decimal = pd.to_numeric(parts['dec'], errors='coerce')
+    return whole + fraction.where(fraction.notna(), decimal)
+
+_inches_re = re.compile(INCHES_PATTERN)
+# What may follow a number for the value to count as inches: nothing, a quote mark or "in"/"inch(es)".
+_INCH_SUFFIX_RE = re.compile(r'^\s*(?:"|\u2033|in(?:ch(?:es)?)?\.?)?\s*$', re.IGNORECASE)
+
+def parse_inches(value):
+    """Scalar counterpart of ``parse_inches_series`` for a whole value; None unless it is just a length."""
+    match = _inches_re.match(value)
+    if not match or not _INCH_SUFFIX_RE.match(value[match.end():]):
+        return None
+    if match.group('dec') is not None:
+        return float(match.group('dec'))
+    denominator = int(match.group('den'))
+    if not denominator:
+        return None
+    return int(match.group('whole') or 0) + int(match.group('num')) / denominator
+
+def prepare_materials_frame(df):
+    """Coerce scraped rows to the ``materials_combined`` schema and compute the key."""
+    load_pandas()
+    frame = df.copy()
+    for column in MATERIALS_COLUMNS:
+        if column not in frame.columns:
+            frame[column] = None
+    for column, sql_type in MATERIALS_SCHEMA:
+        if sql_type.startswith("REAL"):
+            frame[column] = pd.to_numeric(frame[column], errors='coerce')
+        elif sql_type.endswith("NOT NULL"):
+            frame[column] = frame[column].fillna('').astype(str).str.strip()
+    # У OSH Cut толщина есть только текстом ("0.125\"", "1/8\"").
+    thickness_name = frame["Thickness Name"].fillna('').astype(str)
+    parsed = parse_inches_series(thickness_name).where(thickness_name.str.contains('"', regex=False))
+    frame["Thickness"] = frame["Thickness"].fillna(parsed)
+    frame["Thickness Key"] = frame["Thickness"].round(6).map('{:g}'.format, na_action='ignore') \
+        .fillna(thickness_name.str.strip())
+    duplicated = frame.duplicated(subset=MATERIALS_KEY, keep='last')
+    if duplicated.any():
+        keys = [" / ".join(map(str, key)) for key in
+                frame.loc[duplicated, MATERIALS_KEY].drop_duplicates().itertuples(index=False, name=None)]
+        shown = "; ".join(keys[:DUPLICATE_KEYS_LOGGED]) + (f"; and {len(keys) - DUPLICATE_KEYS_LOGGED} more"
+                                                           if len(keys) > DUPLICATE_KEYS_LOGGED else "")
+        logging.warning(f"Dropped {int(duplicated.sum())} rows whose key repeats a later row: {shown}")
+    frame = frame[~duplicated].reset_index(drop=True)
+    frame["Row Hash"] = hash_material_rows(frame)
+    return frame[MATERIALS_COLUMNS]
+
+def hash_material_rows(frame):
+    """Content hash of every row, computed column-wise over the whole frame.
+
+    Text is compared stripped with NULL as '', numbers rounded to 9 places,
+    so NaN/None and float formatting noise do not show up as changes.
+    Returned as signed 64-bit integers to fit an SQLite INTEGER.
+    """
+    load_pandas()
+    normalized = pd.DataFrame(index=frame.index)
+    for column, sql_type in MATERIALS_SCHEMA:
+        if column not in MATERIALS_VALUE_COLUMNS:
+            continue
+        if sql_type.startswith("REAL"):
+            normalized[column] = frame[column].astype(float).round(9)
+        else:
+            normalized[column] = frame[column].fillna('').astype(str).str.strip()
+    hashes = pd.util.hash_pandas_object(normalized, index=False)
+    return pd.Series(hashes.values.view('int64'), index=frame.index)
+
+def ensure_materials_schema(conn):
+    """Create ``materials_combined``, its bend table and the change log, migrating a table with an older layout."""
+    load_pandas()
+    existing = [row[1] for row in conn.execute(f"PRAGMA table_info({MATERIALS_TABLE})")]
+    create_changes_table(conn)
+    if existing and existing != [MATERIALS_ROW_ID] + MATERIALS_COLUMNS:
+        logging.info("Migrating materials_combined table to the current schema.")
+        legacy_df = pd.read_sql_query(f"SELECT * FROM {MATERIALS_TABLE}", conn)
+        # Удаление и копирование — одна транзакция: при сбое старая таблица остаётся на месте.
+        with transaction(conn):
+            conn.execute(f"DROP TABLE IF EXISTS {MATERIALS_FTS_TABLE}")
+            conn.execute(f"DROP VIEW IF EXISTS {MATERIALS_FTS_TABLE}_content")
+            conn.execute(f"DROP TABLE IF EXISTS {BEND_TABLE}")
+            conn.execute(f"DROP TABLE {MATERIALS_TABLE}")
+            create_materials_table(conn)
+            create_bend_table(conn)
+            if not legacy_df.empty:
+                upsert_materials(conn, legacy_df)
+        return
+    if not existing:
+        create_materials_table(conn)
+        create_bend_table(conn)
+    else:
+        create_materials_fts(conn)
+        if create_bend_table(conn):
+            backfill_bend_parameters(conn)
+
+def create_changes_table(conn):
+    key = ", ".join(f"{quote_identifier(c)} TEXT" for c in MATERIALS_KEY)
+    with conn:
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {CHANGES_TABLE} (
+                change_id INTEGER PRIMARY KEY,
+                run_id TEXT NOT NULL,
+                changed_at TEXT NOT NULL,
+                change_type TEXT NOT NULL,
+                {key},
+                old_hash INTEGER,
+                new_hash INTEGER
+            )""")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_changes_run ON {CHANGES_TABLE} (run_id)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_changes_material ON {CHANGES_TABLE} "
+                     f"(\"Material Name\", \"Thickness Key\")")
+
+def create_materials_table(conn):
+    columns = ",\n".join(f"    {quote_identifier(name)} {sql_type}" for name, sql_type in MATERIALS_SCHEMA)
+    key = ", ".join(quote_identifier(name) for name in MATERIALS_KEY)
+    with transaction(conn):
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {MATERIALS_TABLE} (\n    {MATERIALS_ROW_ID} INTEGER PRIMARY KEY,\n"
+                     f"{columns},\n    UNIQUE ({key})\n)")
+        for index_name, index_columns in MATERIALS_INDEXES.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {MATERIALS_TABLE} "
+                         f"({', '.join(quote_identifier(c) for c in index_columns)})")
+    create_materials_fts(conn)
+
+def create_materials_fts(conn):
+    """Create the FTS5 index over the text columns and the triggers that keep it in sync.
+
+    The index is an external-content table keyed by ``row_id``: it stores
+    only the index and reads the text through a view that renames the
+    columns to the FTS5 aliases. Inserts, upserts and deletes done by ``upsert_materials``
+    reach it through the triggers. Returns False when this SQLite build has
+    no FTS5, in which case search falls back to regex.
+    """
+    fts_columns = ", ".join(MATERIALS_FTS_COLUMNS)
+    content_columns = ", ".join(f"{quote_identifier(c)} AS {name}" for name, c in MATERIALS_FTS_COLUMNS.items())
+    new_values = ", ".join(f"new.{quote_identifier(c)}" for c in MATERIALS_FTS_COLUMNS.values())
+    old_values = ", ".join(f"old.{quote_identifier(c)}" for c in MATERIALS_FTS_COLUMNS.values())
+    insert = (f"INSERT INTO {MATERIALS_FTS_TABLE} (rowid, {fts_columns}) "
+              f"VALUES (new.{MATERIALS_ROW_ID}, {new_values});")
+    delete = (f"INSERT INTO {MATERIALS_FTS_TABLE} ({MATERIALS_FTS_TABLE}, rowid, {fts_columns}) "
+              f"VALUES ('delete', old.{MATERIALS_ROW_ID}, {old_values});")
+    try:
+        with transaction(conn):
+            exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (MATERIALS_FTS_TABLE,)).fetchone()
+            conn.execute(f"CREATE VIEW IF NOT EXISTS {MATERIALS_FTS_TABLE}_content AS "
+                         f"SELECT {MATERIALS_ROW_ID}, {content_columns} FROM {MATERIALS_TABLE}")
+            conn.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {MATERIALS_FTS_TABLE} USING fts5({fts_columns}, "
+                f"content='{MATERIALS_FTS_TABLE}_content', content_rowid='{MATERIALS_ROW_ID}', "
+                f"tokenize=\"{MATERIALS_FTS_TOKENIZER}\", prefix='1 2 3')")
+            conn.execute(f"CREATE TRIGGER IF NOT EXISTS materials_fts_insert AFTER INSERT ON {MATERIALS_TABLE} "
+                         f"BEGIN {insert} END")
+            conn.execute(f"CREATE TRIGGER IF NOT EXISTS materials_fts_delete AFTER DELETE ON {MATERIALS_TABLE} "
+                         f"BEGIN {delete} END")
+            conn.execute(f"CREATE TRIGGER IF NOT EXISTS materials_fts_update AFTER UPDATE ON {MATERIALS_TABLE} "
+                         f"BEGIN {delete} {insert} END")
+            if not exists:
+                conn.execute(f"INSERT INTO {MATERIALS_FTS_TABLE} ({MATERIALS_FTS_TABLE}) VALUES ('rebuild')")
+    except sqlite3.OperationalError as e:
+        logging.warning(f"Full-text search index unavailable: {e}")
+        return False
+    return True
+
+def fts_query(text, column=None):
+    """Turn search box input into an FTS5 query: every word is a prefix term and all must match."""
+    terms = ['"' + word.replace('"', '""') + '"*' for word in text.split() if any(ch.isalnum() for ch in word)]
+    if not terms:
+        return None
+    query = " ".join(terms)
+    if column:
+        fts_column = next(name for name, source in MATERIALS_FTS_COLUMNS.items() if source == column)
+        query = f"{fts_column} : ({query})"
+    return query
+
+def search_materials(conn, text, column=None, limit=SEARCH_RESULT_LIMIT):
+    """Return the ``row_id`` of the rows matching ``text``, best match (bm25) first."""
+    query = fts_query(text, column)
+    if query is None:
+        return []
+    cursor = conn.execute(f"SELECT rowid FROM {MATERIALS_FTS_TABLE} WHERE {MATERIALS_FTS_TABLE} MATCH ? "
+                          f"ORDER BY rank LIMIT ?", (query, limit))
+    return [rowid for (rowid,) in cursor]
+
+def split_bend_table(text):
+    """Cells of a flattened bend table as ``(condition, value text)`` pairs.
+
+    Every row is "label | value [| value ...]"; a single-cell row is a
+    title. The first multi-cell row is the header by position, whatever it
+    contains ("90°" or "0.030\"" column names look like numbers): it names
+    the value columns of the rows below it, and the column name becomes
+    part of the condition.
+    """
+    if not isinstance(text, str) or not text.strip() or text == 'Not Found':
+        return []
+    cells = []
+    header = None
+    for row in text.split('; '):
+        parts = [part.strip() for part in row.split(' | ')]
+        if len(parts) == 1:
+            if _inches_re.match(parts[0]):
+                cells.append(('', parts[0]))
+            continue
+        label, values = parts[0], parts[1:]
+        if header is None:
+            header = values
+            continue
+        for index, value in enumerate(values):
+            if not value:
+                continue
+            column = header[index] if index < len(header) and len(values) > 1 else ''
+            cells.append((f"{label} / {column}" if column else label, value))
+    return cells
+
+def build_bend_frame(frame):
+    """Long-format bend parameters of a materials frame (as stored or from ``prepare_materials_frame``)."""
+    load_pandas()
+    ids = MATERIALS_KEY + ["Thickness", "Gauge"]
+    frame = frame.reindex(columns=ids + list(BEND_SCALAR_PARAMETERS) + list(BEND_TABLE_PARAMETERS))
+    scalars = frame.melt(id_vars=ids, value_vars=list(BEND_SCALAR_PARAMETERS),
+                         var_name="Parameter", value_name="Value Text")
+    scalars["Parameter"] = scalars["Parameter"].map(BEND_SCALAR_PARAMETERS)
+    scalars["Condition"] = ''
+    tables = frame.melt(id_vars=ids, value_vars=list(BEND_TABLE_PARAMETERS),
+                        var_name="Parameter", value_name="Table")
+    tables["Cells"] = tables["Table"].map(split_bend_table)
+    tables = tables[tables["Cells"].map(len) > 0].explode("Cells")
+    tables["Condition"] = tables["Cells"].str[0]
+    tables["Value Text"] = tables["Cells"].str[1]
+    bend = pd.concat([scalars, tables.drop(columns=["Table", "Cells"])], ignore_index=True)
+
+    text = bend["Value Text"].map(lambda value: '' if value is None or value != value else str(value).strip())
+    bend = bend[(text != '') & (text != 'Not Found')].copy()
+    text = text[bend.index]
+    bend["Value Text"] = text
+    bend["Value"] = pd.to_numeric(text, errors='coerce').fillna(parse_inches_series(text))
+    bend["Condition Value"] = parse_inches_series(bend["Condition"].astype(str)) \
+        .where(bend["Condition"].astype(str).str.match(INCHES_PATTERN))
+    gauge = bend["Gauge"].fillna('').astype(str).str.extract(GAUGE_PATTERN, flags=re.IGNORECASE)[0]
+    bend["Gauge"] = pd.to_numeric(gauge, errors='coerce').astype('Int64')
+    bend["Thickness"] = pd.to_numeric(bend["Thickness"], errors='coerce')
+    duplicated = bend.duplicated(subset=BEND_KEY, keep=False)
+    if duplicated.any():
+        # Одно и то же условие с разными значениями: остаётся последнее, остальные выводятся в журнал.
+        conflicts = bend[duplicated].groupby(BEND_KEY, sort=False)["Value Text"].nunique()
+        conflicts = conflicts[conflicts > 1]
+        if len(conflicts):
+            keys = [" / ".join(str(part) for part in key if part != '') for key in conflicts.index]
+            shown = "; ".join(keys[:DUPLICATE_KEYS_LOGGED]) + (
+                f"; and {len(keys) - DUPLICATE_KEYS_LOGGED} more" if len(keys) > DUPLICATE_KEYS_LOGGED else "")
+            logging.warning(f"{len(keys)} bend conditions have conflicting values; keeping the last of each: {shown}")
+        bend = bend.drop_duplicates(subset=BEND_KEY, keep='last')
+    return bend[BEND_COLUMNS].reset_index(drop=True)
+
+def create_bend_table(conn):
+    """Create the long-format bend table; returns True if it did not exist yet."""
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (BEND_TABLE,)).fetchone()
+    columns = ",\n".join(f"    {quote_identifier(name)} {sql_type}" for name, sql_type in BEND_SCHEMA)
+    key = ", ".join(quote_identifier(name) for name in BEND_KEY)
+    with transaction(conn):
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {BEND_TABLE} (\n{columns},\n    PRIMARY KEY ({key})\n)")
+        for index_name, index_columns in BEND_INDEXES.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {BEND_TABLE} "
+                         f"({', '.join(quote_identifier(c) for c in index_columns)})")
+    return not exists
+
+def insert_bend_rows(conn, bend):
+    quoted = ", ".join(quote_identifier(c) for c in BEND_COLUMNS)
+    records = bend.astype(object).where(bend.notna(), None).values.tolist()
+    for start in range(0, len(records), UPSERT_BATCH_SIZE):
+        conn.executemany(f"INSERT OR REPLACE INTO {BEND_TABLE} ({quoted}) VALUES ({', '.join('?' * len(BEND_COLUMNS))})",
+                         records[start:start + UPSERT_BATCH_SIZE])
+
+def backfill_bend_parameters(conn):
+    """Fill a new bend table from the rows already stored in ``materials_combined``."""
+    load_pandas()
+    stored = pd.read_sql_query(f"SELECT * FROM {MATERIALS_TABLE}", conn)
+    if stored.empty:
+        return
+    bend = build_bend_frame(stored)
+    with conn:
+        insert_bend_rows(conn, bend)
+    logging.info(f"Built {len(bend)} bend parameter rows from the stored materials.")
+
+@timed('db_write')
+def upsert_materials(conn, df, run_id=None, failed_units=()):
+    """Write rows by natural key, touching only rows whose content hash changed.
+
+    The incoming keys and hashes are staged in a temp table and diffed
+    against the stored rows in SQL. With ``run_id`` every added, modified
+    and removed row is logged to the ``changes`` table.
+
+    Rows of the sources present in ``df`` that were not scraped again are
+    deleted, so each source reflects its latest run; sources missing from
+    ``df`` (e.g. a failed scrape) keep their previous rows, and so do the
+    (source, category, material) work units listed in ``failed_units``:
+    their stored rows are neither deleted nor logged as removed. The long-format
+    ``bend_parameters`` rows of added, modified and removed materials are
+    rewritten in the same transaction.
+    Returns a dict with the number of added, modified and removed rows.
+    """
+    load_pandas()
+    frame = prepare_materials_frame(df)
+    frame["Updated At"] = datetime.now().isoformat(timespec='seconds')
+    quoted = [quote_identifier(c) for c in MATERIALS_COLUMNS]
+    key = ", ".join(quote_identifier(c) for c in MATERIALS_KEY)
+    updates = ", ".join(f"{quote_identifier(c)} = excluded.{quote_identifier(c)}"
+                        for c in MATERIALS_VALUE_COLUMNS + ["Row Hash", "Updated At"])
+    sql = (f"INSERT INTO {MATERIALS_TABLE} ({', '.join(quoted)}) VALUES ({', '.join('?' * len(quoted))}) "
+           f"ON CONFLICT ({key}) DO UPDATE SET {updates} "
+           f"WHERE {MATERIALS_TABLE}.\"Row Hash\" IS NOT excluded.\"Row Hash\"")
+    records = frame.astype(object).where(frame.notna(), None).values.tolist()
+    sources = sorted(frame["Source"].unique())
+    source_params = ', '.join('?' * len(sources))
+    match = " AND ".join(f"i.{quote_identifier(c)} = m.{quote_identifier(c)}" for c in MATERIALS_KEY)
+    key_columns = ", ".join(f"i.{quote_identifier(c)}" for c in MATERIALS_KEY)
+    stored_key_columns = ", ".join(f"m.{quote_identifier(c)}" for c in MATERIALS_KEY)
+    # Строки единиц работы, упавших в этом запуске, не считаются исчезнувшими с сайта.
+    kept = ("NOT EXISTS (SELECT 1 FROM failed_units f WHERE f.source = m.\"Source\" "
+            "AND f.category = m.\"Category\" AND f.material = m.\"Material Name\")")
+    # (change_type, SELECT producing key columns, old hash, new hash)
+    deltas = {
+        'added': f"SELECT {key_columns}, NULL, i.\"Row Hash\" FROM incoming_rows i "
+                 f"LEFT JOIN {MATERIALS_TABLE} m ON {match} WHERE m.\"Source\" IS NULL",
+        'modified': f"SELECT {key_columns}, m.\"Row Hash\", i.\"Row Hash\" FROM incoming_rows i "
+                    f"JOIN {MATERIALS_TABLE} m ON {match} WHERE m.\"Row Hash\" IS NOT i.\"Row Hash\"",
+        'removed': f"SELECT {stored_key_columns}, m.\"Row Hash\", NULL FROM {MATERIALS_TABLE} m "
+                   f"WHERE m.\"Source\" IN ({source_params}) "
+                   f"AND NOT EXISTS (SELECT 1 FROM incoming_rows i WHERE {match}) AND {kept}",
+    }
+    summary = {}
+    with transaction(conn):
+        conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS incoming_rows ({key}, \"Row Hash\" INTEGER, PRIMARY KEY ({key}))")
+        conn.execute("DELETE FROM incoming_rows")
+        conn.executemany(f"INSERT INTO incoming_rows VALUES ({', '.join('?' * (len(MATERIALS_KEY) + 1))})",
+                         frame[MATERIALS_KEY + ["Row Hash"]].astype(object).values.tolist())
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS failed_units (source TEXT, category TEXT, material TEXT)")
+        conn.execute("DELETE FROM failed_units")
+        conn.executemany("INSERT INTO failed_units VALUES (?, ?, ?)", [tuple(unit) for unit in failed_units])
+        changed_at = datetime.now().isoformat(timespec='seconds')
+        for change_type, select in deltas.items():
+            params = sources if change_type == 'removed' else []
+            if run_id is not None:
+                summary[change_type] = conn.execute(
+                    f"INSERT INTO {CHANGES_TABLE} (run_id, changed_at, change_type, {key}, old_hash, new_hash) "
+                    f"SELECT ?, ?, ?, * FROM ({select})", [run_id, changed_at, change_type] + params
+                ).rowcount
+            else:
+                summary[change_type] = conn.execute(f"SELECT COUNT(*) FROM ({select})", params).fetchone()[0]
+        # Таблица изгибов пересобирается только для добавленных и изменённых строк.
+        changed = conn.execute(f"SELECT {key_columns} FROM incoming_rows i LEFT JOIN {MATERIALS_TABLE} m "
+                               f"ON {match} WHERE m.\"Row Hash\" IS NOT i.\"Row Hash\"").fetchall()
+        for start in range(0, len(records), UPSERT_BATCH_SIZE):
+            conn.executemany(sql, records[start:start + UPSERT_BATCH_SIZE])
+        for table in (BEND_TABLE, MATERIALS_TABLE):
+            conn.execute(
+                f"DELETE FROM {table} AS m WHERE m.\"Source\" IN ({source_params}) "
+                f"AND NOT EXISTS (SELECT 1 FROM incoming_rows i WHERE {match}) AND {kept}", sources)
+        if changed:
+            changed_frame = frame.merge(pd.DataFrame(changed, columns=MATERIALS_KEY), on=MATERIALS_KEY)
+            conn.executemany(f"DELETE FROM {BEND_TABLE} WHERE "
+                             + " AND ".join(f"{quote_identifier(c)} = ?" for c in MATERIALS_KEY), changed)
+            insert_bend_rows(conn, build_bend_frame(changed_frame))
+    logging.info(f"Upserted {len(frame)} rows into {MATERIALS_TABLE}: {summary['added']} added, "
+                 f"{summary['modified']} modified, {summary['removed']} removed.")
+    return summary
+
+# -------------------------------
+# Поиск параметров гиба по материалу и толщине (для CAM)
+# -------------------------------
+class BendLookup:
+    """In-memory bend parameter lookup by material and thickness.
+
+    The index maps (material, parameter, condition) to per-source sorted
+    thickness and value arrays built from ``bend_parameters``; a lookup is
+    a dict access and a bisect. The index is rebuilt when another
+    connection has written to the database (``PRAGMA data_version``),
+    checked at most every ``check_interval`` seconds. Safe to use from
+    worker threads.
+    """
+    def __init__(self, db_path=MATERIALS_DB, check_interval=1.0):
+        self.db_path = db_path
+        self.check_interval = check_interval
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.index = {}
+        self.data_version = None
+        self.checked_at = 0.0
+        self.refresh(force=True)
+
+    @staticmethod
+    def _material_key(material):
+        return ' '.join(str(material).lower().split())
+
+    def refresh(self, force=False):
+        """Rebuild the index if the database changed since the last build. Returns True if rebuilt."""
+        with self.lock:
+            self.checked_at = time.monotonic()
+            version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+            if not force and version == self.data_version:
+                return False
+            self.index = self._build_index()
+            self.data_version = version
+            return True
+
+    def _build_index(self):
+        started = time.perf_counter()
+        index = {}
+        try:
+            cursor = self.conn.execute(
+                f"SELECT \"Material Name\", \"Parameter\", \"Condition\", \"Source\", \"Thickness\", \"Value\" "
+                f"FROM {BEND_TABLE} WHERE \"Thickness\" IS NOT NULL AND \"Value\" IS NOT NULL "
+                f"ORDER BY \"Material Name\", \"Parameter\", \"Condition\", \"Source\", \"Thickness\"")
+        except sqlite3.OperationalError as e:
+            logging.warning(f"Bend lookup index is empty: {e}")
+            return index
+        for material, parameter, condition, source, thickness, value in cursor:
+            by_source = index.setdefault((self._material_key(material), parameter, condition), {})
+            thicknesses, values = by_source.setdefault(source, ([], []))
+            # Один материал может встречаться в нескольких категориях: берём первое значение.
+            if thicknesses and thicknesses[-1] == thickness:
+                continue
+            thicknesses.append(thickness)
+            values.append(value)
+        logging.info(f"Bend lookup index built with {len(index)} series in {time.perf_counter() - started:.2f}s.")
+        return index
+
+    def lookup(self, material, thickness, parameter='K-factor', condition='', mode='interpolate', source=None):
+        """Value of ``parameter`` for ``material`` at ``thickness``, per source.
+
+        ``mode`` is 'nearest' (value at the closest listed thickness) or
+        'interpolate' (linear between the neighbouring thicknesses, None
+        outside the listed range). Returns ``{source: value}``, or just the
+        value when ``source`` is given.
+        """
+        if time.monotonic() - self.checked_at >= self.check_interval:
+            self.refresh()
+        by_source = self.index.get((self._material_key(material), parameter, condition), {})
+        if source is not None:
+            series = by_source.get(source)
+            return _bend_value(series, thickness, mode) if series else None
+        return {name: _bend_value(series, thickness, mode) for name, series in by_source.items()}
+
+    def conditions(self, material, parameter):
+        """Conditions (table rows) listed for ``material`` and ``parameter``."""
+        material_key = self._material_key(material)
+        return sorted(condition for key_material, key_parameter, condition in self.index
+                      if key_material == material_key and key_parameter == parameter)
+
+    def close(self):
+        self.conn.close()
+
+def _bend_value(series, thickness, mode):
+    thicknesses, values = series
+    position = bisect.bisect_left(thicknesses, thickness)
+    if position < len(thicknesses) and thicknesses[position] == thickness:
+        return values[position]
+    if mode == 'nearest':
+        if position == 0:
+            return values[0]
+        if position == len(thicknesses):
+            return values[-1]
+        before, after = thicknesses[position - 1], thicknesses[position]
+        return values[position - 1] if thickness - before <= after - thickness else values[position]
+    if mode != 'interpolate':
+        raise ValueError(f"Unknown lookup mode '{mode}'.")
+    if position == 0 or position == len(thicknesses):
+        return None
+    before, after = thicknesses[position - 1], thicknesses[position]
+    weight = (thickness - before) / (after - before)
+    return values[position - 1] + weight * (values[position] - values[position - 1])
+
+# -------------------------------
+# Экспорт: потоковое чтение из SQLite, запись в XLSX / CSV / Parquet
+# -------------------------------
+EXPORT_CHUNK_SIZE = 5000
+EXPORT_FORMATS = ('xlsx', 'csv', 'parquet')
+EXPORTS_TABLE = 'exports'
+# Bookkeeping columns stay in the database.
+EXPORT_COLUMNS = [c for c in MATERIALS_COLUMNS if c not in ("Thickness Key", "Row Hash")]
+EXPORT_ORDER = '"Source", "Material Name", "Thickness", "Thickness Key"'
+
+def export_format(path):
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{extension}' (expected one of: {', '.join(EXPORT_FORMATS)}).")
+    return extension
+
+def iter_material_chunks(conn, source=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield lists of export rows, at most ``chunk_size`` at a time; one source or all."""
+    columns = ", ".join(quote_identifier(c) for c in EXPORT_COLUMNS)
+    where, params = ("WHERE \"Source\" = ?", [source]) if source is not None else ("", [])
+    cursor = conn.execute(f"SELECT {columns} FROM {MATERIALS_TABLE} {where} ORDER BY {EXPORT_ORDER}", params)
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield rows
+
+def data_fingerprint(conn):
+    """Hash of every row key and content hash; changes whenever the exported data would."""
+    digest = hashlib.sha256(",".join(EXPORT_COLUMNS).encode('utf-8'))
+    key = ", ".join(quote_identifier(c) for c in MATERIALS_KEY)
+    cursor = conn.execute(f"SELECT {key}, \"Row Hash\" FROM {MATERIALS_TABLE} ORDER BY {key}")
+    while True:
+        rows = cursor.fetchmany(EXPORT_CHUNK_SIZE)
+        if not rows:
+            break
+        digest.update(json.dumps(rows).encode('utf-8'))
+    return digest.hexdigest()
+
+def sheet_title(source, used):
+    """Excel sheet name for a source: no []:*?/\\ characters, at most 31 characters, unique."""
+    title = ''.join('_' if ch in '[]:*?/\\' else ch for ch in str(source)).strip("'")[:31] or 'Sheet'
+    base, suffix = title, 2
+    while title.lower() in used:
+        title = f"{base[:28]}_{suffix}"
+        suffix += 1
+    used.add(title.lower())
+    return title
+
+def write_xlsx(conn, path):
+    """One sheet per source, written row by row through openpyxl's write-only mode."""
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    used = set()
+    sources = [row[0] for row in conn.execute(f"SELECT DISTINCT \"Source\" FROM {MATERIALS_TABLE} ORDER BY \"Source\"")]
+    for source in sources or [None]:
+        sheet = workbook.create_sheet(sheet_title(source or 'Materials', used))
+        sheet.append(EXPORT_COLUMNS)
+        if source is None:
+            continue
+        for rows in iter_material_chunks(conn, source):
+            for row in rows:
+                sheet.append(row)
+    workbook.save(path)
+
+def write_csv(conn, path):
+    # utf-8-sig: Excel открывает такой CSV с правильной кодировкой
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_COLUMNS)
+        for rows in iter_material_chunks(conn):
+            writer.writerows(rows)
+
+def write_parquet(conn, path):
+    """Parquet via pyarrow (optional dependency), one row group per chunk."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow).")
+    sql_types = dict(MATERIALS_SCHEMA)
+    schema = pa.schema([(c, pa.float64() if sql_types[c] == "REAL" else pa.string()) for c in EXPORT_COLUMNS])
+    with pq.ParquetWriter(path, schema) as writer:
+        written = False
+        for rows in iter_material_chunks(conn):
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema))
+            written = True
+        # Пустой таблице всё равно нужен файл со схемой
+        if not written:
+            writer.write_table(schema.empty_table())
+
+EXPORT_WRITERS = {'xlsx': write_xlsx, 'csv': write_csv, 'parquet': write_parquet}
+
+def create_exports_table(conn):
+    with conn:
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {EXPORTS_TABLE} (
+                path TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                size INTEGER,
+                mtime REAL,
+                exported_at TEXT NOT NULL
+            )""")
+
+def export_materials(path, db_path=MATERIALS_DB, force=False):
+    """Export the materials table to ``path`` (.xlsx, .csv or .parquet) in constant memory.
+
+    The export is skipped when the data fingerprint and the file on disk
+    are the same as at the previous export to that path. The file is
+    written next to the target and moved into place when complete.
+    Returns True if the file was written.
+    """
+    fmt = export_format(path)
+    conn = sqlite3.connect(db_path)
+    try:
+        create_exports_table(conn)
+        fingerprint = data_fingerprint(conn)
+        key = os.path.abspath(path)
+        previous = conn.execute(f"SELECT fingerprint, size, mtime FROM {EXPORTS_TABLE} WHERE path = ?", (key,)).fetchone()
+        if not force and previous and os.path.exists(path):
+            stat = os.stat(path)
+            if previous == (fingerprint, stat.st_size, stat.st_mtime):
+                logging.info(f"Data unchanged since the last export, keeping {path}.")
+                return False
+        started = time.perf_counter()
+        root, extension = os.path.splitext(path)
+        partial_path = f"{root}.partial{extension}"
+        try:
+            EXPORT_WRITERS[fmt](conn, partial_path)
+            os.replace(partial_path, path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+        stat = os.stat(path)
+        with conn:
+            conn.execute(f"INSERT OR REPLACE INTO {EXPORTS_TABLE} VALUES (?, ?, ?, ?, ?)",
+                         (key, fingerprint, stat.st_size, stat.st_mtime, datetime.now().isoformat(timespec='seconds')))
+        logging.info(f"Exported materials to {path} in {time.perf_counter() - started:.1f}s.")
+        return True
+    finally:
+        conn.close()
+
+# -------------------------------
+# Основная функция main
+# -------------------------------
+SOURCES = ('oshcut', 'sendcutsend')
+SOURCE_NAMES = {'oshcut': 'OSH Cut', 'sendcutsend': 'SendCutSend'}
+# Единица работы «источник целиком»: отмечается, когда его строки сохранены или сбор не удался.
+SOURCE_WORK_UNIT = ('(source)', ALL_THICKNESSES)
+EXCEL_PATH = 'materials_combined.xlsx'
+
+@timed('source', 'oshcut')
+def scrape_oshcut_source(checkpoints=None, cache=None, pool=None, workers=None, oshcut_mode=OSHCUT_ACQUISITION_MODE):
+    df_oshcut = parse_oshcut(acquisition=oshcut_mode, checkpoints=checkpoints, cache=cache, pool=pool)
+    if df_oshcut.empty:
+        logging.warning("No data parsed from OSH Cut.")
+    return df_oshcut
+
+def build_sendcutsend_frame(sendcutsend_data):
+    """Clean the rows of ``scrape_materials_page`` into a frame for ``upsert_materials``."""
+    df_sendcutsend = pd.DataFrame()
+    if sendcutsend_data:
+        df_sendcutsend = pd.DataFrame(sendcutsend_data)
+        string_columns = ["Category", "Material Name", "Gauge"]
+        for col in string_columns:
+            if col in df_sendcutsend.columns:
+                df_sendcutsend[col] = df_sendcutsend[col].str.replace('"', '').str.strip()
+        specific_columns = ["Effective bend radius @90°", "K factor"]
+        for col in specific_columns:
+            if col in df_sendcutsend.columns:
+                df_sendcutsend[col] = df_sendcutsend[col].astype(str).str.replace('"', '').str.strip()
+        numeric_columns = ["Thickness", "Effective bend radius @90°", "K factor"]
+        for col in numeric_columns:
+            if col in df_sendcutsend.columns:
+                df_sendcutsend[col] = pd.to_numeric(df_sendcutsend[col], errors='coerce')
+        for col in string_columns:
+            if col in df_sendcutsend.columns:
+                df_sendcutsend[col] = df_sendcutsend[col].fillna('')
+        df_sendcutsend['Source'] = 'SendCutSend'
+    return df_sendcutsend
+
+@timed('source', 'sendcutsend')
+def scrape_sendcutsend_source(checkpoints=None, cache=None, pool=None, workers=SENDCUTSEND_WORKERS, oshcut_mode=None):
+    df_sendcutsend = build_sendcutsend_frame(
+        scrape_materials_page(workers=workers, checkpoints=checkpoints, cache=cache, pool=pool))
+    if df_sendcutsend.empty:
+        logging.error("No data from SendCutSend to process.")
+    return df_sendcutsend
+
+SOURCE_SCRAPERS = {'oshcut': scrape_oshcut_source, 'sendcutsend': scrape_sendcutsend_source}
+
+def main(resume=False, sources=SOURCES, workers=SENDCUTSEND_WORKERS, db_path=MATERIALS_DB, excel_path=EXCEL_PATH,
+         export_paths=(), cache=None, pool=None, profile_unit=None, metrics_dir=None, record_dir=None,
+         oshcut_mode=OSHCUT_ACQUISITION_MODE):
+    """Scrape the selected sources concurrently and store their rows as each one finishes.
+
+    A source that fails or returns nothing keeps its previously stored
+    rows, as does every work unit (page or material) that failed. Returns a summary dict (run_id, rows, changes, had_previous,
+    metrics); the caller decides how to report it. A ``cache`` or driver
+    ``pool`` passed in by a long-running caller is reused and left open.
+    Stage metrics are written to ``metrics_dir``; ``profile_unit``
+    profiles the first work unit whose material name contains it, writing
+    the profile there too. With ``record_dir`` the DOM snapshot of every
+    work unit is archived for ``replay_archive``. ``oshcut_mode`` selects
+    how the OSH Cut catalog is acquired ('ui' or 'api', see ``parse_oshcut``).
+    """
+    load_scraping_modules()
+    # Прогресс сохраняется по единицам работы, чтобы прерванный запуск можно было продолжить
+    checkpoints = CheckpointStore()
+    run_id = checkpoints.start_run(resume)
+    metrics.reset(run_id, profile_unit, metrics_dir)
+    owns_cache = cache is None
+    owns_pool = pool is None
+    result = {'run_id': run_id, 'rows': 0, 'changes': None, 'had_previous': False}
+    conn = None
+    stored = []
+    try:
+        if record_dir:
+            archive.start(record_dir, run_id)
+        # Строки неизменившихся страниц берутся из кэша прошлых запусков
+        if owns_cache:
+            cache = PageCache()
+        # Пул тёплых браузеров. Драйверы общие для SendCutSend и OSH Cut в режиме 'ui';
+        # в режиме 'api' OSH Cut берёт драйвер с журналом производительности
+        # (network_logging), а такие пул держит отдельно, так что общего там нет.
+        if owns_pool:
+            pool = DriverPool()
+
+        # Источники парсятся параллельно, каждый своим драйвером; кадры сохраняются по мере готовности.
+        selected = [name for name in SOURCES if name in sources]
+        with ThreadPoolExecutor(max_workers=max(1, len(selected)), thread_name_prefix='source') as executor:
+            futures = {executor.submit(SOURCE_SCRAPERS[name], checkpoints=checkpoints, cache=cache, pool=pool,
+                                       workers=workers, oshcut_mode=oshcut_mode): name for name in selected}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    frame = future.result()
+                except Exception as e:
+                    logging.error(f"Error parsing {SOURCE_NAMES[name]} data: {e}")
+                    # Без этой отметки запуск закрылся бы как 'completed' и не продолжался бы с --resume.
+                    checkpoints.mark_failed(SOURCE_NAMES[name], *SOURCE_WORK_UNIT, e)
+                    continue
+                if frame.empty:
+                    checkpoints.mark_failed(SOURCE_NAMES[name], *SOURCE_WORK_UNIT, "no rows scraped")
+                    continue
+                result['rows'] += len(frame)
+
+                # Сохранение в SQLite: upsert по ключу и журнал изменений (сравнение по хешам строк).
+                # upsert_materials заменяет строки только источников из кадра, поэтому кадры пишутся по одному.
+                if conn is None:
+                    conn = sqlite3.connect(db_path)
+                    ensure_materials_schema(conn)
+                    result['had_previous'] = bool(
+                        conn.execute(f"SELECT EXISTS (SELECT 1 FROM {MATERIALS_TABLE})").fetchone()[0])
+                    result['changes'] = {'added': 0, 'modified': 0, 'removed': 0}
+                # Строки страниц, упавших в этом запуске, сохраняются до следующего успешного обхода.
+                failed_units = [(SOURCE_NAMES[name],) + unit for unit in checkpoints.failed_units(SOURCE_NAMES[name])
+                                if unit != SOURCE_WORK_UNIT]
+                for change_type, count in upsert_materials(conn, frame, run_id=run_id,
+                                                           failed_units=failed_units).items():
+                    result['changes'][change_type] += count
+                stored.append(SOURCE_NAMES[name])
+                checkpoints.mark_done(SOURCE_NAMES[name], *SOURCE_WORK_UNIT, [])
+                logging.info(f"{SOURCE_NAMES[name]} data saved to SQLite database.")
+
+        if conn is not None:
+            conn.close()
+            conn = None
+            if result['had_previous']:
+                if any(result['changes'].values()):
+                    logging.info(f"New changes found: {format_changes(result['changes'])} (run {run_id}).")
+                else:
+                    logging.info("No new changes found.")
+            else:
+                logging.info("No previous data to compare for changes.")
+
+            # Экспорт из базы (пропускается, если данные не менялись с прошлого экспорта)
+            for path in ([excel_path] if excel_path else []) + list(export_paths):
+                try:
+                    export_materials(path, db_path)
+                except Exception as e:
+                    logging.error(f"Failed to export data to {path}: {e}")
+        else:
+            logging.error("No data to combine.")
+        checkpoints.finish_run()
+        archive.complete(stored)
+    finally:
+        # Прерванный запуск остаётся 'running' и продолжается с --resume.
+        if conn is not None:
+            conn.close()
+        checkpoints.close()
+        archive.close()
+        if owns_cache and cache is not None:
+            cache.close()
+        if owns_pool and pool is not None:
+            pool.close()
+    try:
+        result['metrics'] = metrics.write()
+    except OSError as e:
+        logging.error(f"Failed to write run metrics: {e}")
+    return result
+
+def format_changes(changes):
+    return f"{changes['added']} added, {changes['modified']} modified, {changes['removed']} removed"
+
+# -------------------------------
+# Архив снимков DOM: запись единиц работы и повторный разбор без браузера
+# -------------------------------
+ARCHIVE_DIR = 'snapshot_archive'
+# Below this many units a replay parses in-process: starting workers would cost more.
+REPLAY_MIN_PARALLEL_UNITS = 200
+# kind -> source of the rows a unit of that kind replays to
+ARCHIVE_KINDS = {
+    'sendcutsend_tabs': 'SendCutSend',  # tabs heading + content of a subcategory page
+    'oshcut_modal': 'OSH Cut',  # one "More info..." modal
+    'oshcut_api': 'OSH Cut',  # captured catalog API responses (JSON)
+}
+# Последняя запись манифеста завершённого запуска
+ARCHIVE_COMPLETE = 'run_complete'
+
+class SnapshotArchive:
+    """Content-addressed, gzip-compressed store of the DOM snapshots of a run.
+
+    Every snapshot is written once to ``objects/<aa>/<sha256>.gz``, so
+    unchanged pages cost nothing in later runs. ``manifests/<run_id>.jsonl``
+    lists the run's work units (kind, source, category, material, unit,
+    URL, digest) and is appended as units finish, which keeps it usable
+    after an interrupted run. ``complete`` appends the marker that names
+    the sources the run stored in full; ``replay_to_database`` requires
+    it. Inactive until ``start``; ``add`` is then safe to call from
+    worker threads.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.directory = None
+        self.manifest = None
+        self.units = 0
+
+    @property
+    def active(self):
+        return self.manifest is not None
+
+    def start(self, directory, run_id):
+        with self.lock:
+            self.directory = directory
+            os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+            os.makedirs(os.path.join(directory, 'manifests'), exist_ok=True)
+            self.manifest = open(os.path.join(directory, 'manifests', f"{run_id}.jsonl"), 'a', encoding='utf-8')
+            self.units = 0
+        logging.info(f"Recording DOM snapshots of run {run_id} to {directory}")
+
+    @staticmethod
+    def object_path(directory, digest):
+        return os.path.join(directory, 'objects', digest[:2], digest + '.gz')
+
+    def add(self, kind, category, material, unit, content, url=None):
+        if not self.active or not content:
+            return None
+        data = content.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(self.directory, digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f"{path}.{threading.get_ident()}.tmp"
+            with open(temporary, 'wb') as f:
+                # mtime=0: одинаковое содержимое даёт одинаковый файл.
+                f.write(gzip.compress(data, mtime=0))
+            os.replace(temporary, path)
+        entry = {'kind': kind, 'source': ARCHIVE_KINDS[kind], 'category': category, 'material': material,
+                 'unit': str(unit), 'url': url, 'sha256': digest, 'bytes': len(data),
+                 'recorded_at': datetime.now().isoformat(timespec='seconds')}
+        with self.lock:
+            if self.manifest is not None:
+                self.manifest.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                self.manifest.flush()
+                self.units += 1
+        return digest
+
+    def complete(self, sources):
+        """Mark the run finished; ``sources`` are the source names whose rows were stored."""
+        entry = {'kind': ARCHIVE_COMPLETE, 'sources': sorted(sources),
+                 'recorded_at': datetime.now().isoformat(timespec='seconds')}
+        with self.lock:
+            if self.manifest is not None:
+                self.manifest.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                self.manifest.flush()
+
+    def close(self):
+        with self.lock:
+            if self.manifest is None:
+                return
+            self.manifest.close()
+            self.manifest = None
+        logging.info(f"Snapshot archive: {self.units} work units recorded.")
+
+archive = SnapshotArchive()
+
+def load_archive_manifest(directory, run_id=None):
+    """Work units of ``run_id`` (default: the latest recorded run), the last record of each unit winning.
+
+    Returns ``(run_id, units, completed)``; ``completed`` lists the sources
+    stored in full, or is None if the run has no completion marker.
+    """
+    manifests = os.path.join(directory, 'manifests')
+    if run_id is None:
+        names = sorted(name for name in os.listdir(manifests) if name.endswith('.jsonl')) if os.path.isdir(manifests) else []
+        if not names:
+            raise FileNotFoundError(f"No run manifests in {manifests}")
+        run_id = names[-1][:-len('.jsonl')]
+    units = {}
+    completed = None
+    with open(os.path.join(manifests, f"{run_id}.jsonl"), 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                if entry['kind'] == ARCHIVE_COMPLETE:
+                    completed = entry['sources']
+                    continue
+                units[(entry['kind'], entry['category'], entry['material'], entry['unit'])] = entry
+    return run_id, list(units.values()), completed
+
+def read_archive_object(directory, digest):
+    with open(SnapshotArchive.object_path(directory, digest), 'rb') as f:
+        return gzip.decompress(f.read()).decode('utf-8')
+
+def replay_unit(directory, entry):
+    """Re-run the extraction stage on one archived work unit; returns its rows."""
+    content = read_archive_object(directory, entry['sha256'])
+    kind = entry['kind']
+    if kind == 'sendcutsend_tabs':
+        return parse_subcategory_html(content, entry['category'], entry['material'], require_tables=False) or []
+    if kind == 'oshcut_api':
+        return build_oshcut_rows_from_api(json.loads(content))
+    details = parse_oshcut_modal_html(content, entry['category'])
+    if details is None:
+        logging.warning(f"No modal data in archived unit {entry['sha256']} ({entry['material']}).")
+        return []
+    row = {'Category': entry['category'], 'Material Name': entry['material']}
+    row.update({key: details.get(key, '') for key in ('Thickness Name', 'K-factor') + OSHCUT_API_TABLE_FIELDS})
+    return [row]
+
+def _replay_worker_init():
+    # Построчные INFO-сообщения разборщиков в процессах-воркерах стоили бы больше самого разбора.
+    logging.getLogger().setLevel(logging.WARNING)
+
+def _replay_chunk(directory, entries):
+    return [replay_unit(directory, entry) for entry in entries]
+
+def replay_archive(directory=ARCHIVE_DIR, run_id=None, workers=None):
+    """Rebuild the source frames of a recorded run from its snapshots, without a browser or network.
+
+    Each distinct snapshot is parsed once, in chunks on a process pool
+    (``workers`` defaults to the CPU count); units sharing a snapshot get
+    copies of its rows under their own category and material. Returns
+    ``(run_id, {source name: frame})`` with frames shaped like those of
+    the live scrapers.
+    """
+    load_scraping_modules()
+    run_id, entries, _ = load_archive_manifest(directory, run_id)
+    unique = {}
+    for entry in entries:
+        unique.setdefault((entry['kind'], entry['sha256']), entry)
+    distinct = list(unique.values())
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    if workers > 1 and len(distinct) >= REPLAY_MIN_PARALLEL_UNITS:
+        chunk_size = max(1, len(distinct) // (workers * 4))
+        chunks = [distinct[i:i + chunk_size] for i in range(0, len(distinct), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_replay_worker_init) as executor:
+            results = [rows for chunk in executor.map(_replay_chunk, [directory] * len(chunks), chunks)
+                       for rows in chunk]
+    else:
+        results = _replay_chunk(directory, distinct)
+    parsed = dict(zip(unique, results))
+    rows = {'OSH Cut': [], 'SendCutSend': []}
+    for entry in entries:
+        unit_rows = parsed[(entry['kind'], entry['sha256'])]
+        if entry['kind'] != 'oshcut_api' and unique[(entry['kind'], entry['sha256'])] is not entry:
+            unit_rows = [dict(row, **{'Category': entry['category'], 'Material Name': entry['material']})
+                         for row in unit_rows]
+        rows[entry['source']].extend(unit_rows)
+    frames = {'OSH Cut': pd.DataFrame(rows['OSH Cut']), 'SendCutSend': build_sendcutsend_frame(rows['SendCutSend'])}
+    if not frames['OSH Cut'].empty:
+        frames['OSH Cut']['Source'] = 'OSH Cut'
+    logging.info(f"Replayed {len(entries)} work units ({len(distinct)} distinct snapshots) of run {run_id} in {time.perf_counter() - started:.2f}s: "
+                 + ", ".join(f"{name} {len(frame)} rows" for name, frame in frames.items()))
+    return run_id, frames
+
+def replay_to_database(directory=ARCHIVE_DIR, run_id=None, workers=None, db_path=MATERIALS_DB, excel_path=EXCEL_PATH,
+                       export_paths=()):
+    """Re-parse an archived run and upsert the rows into ``db_path``, then export. Returns the changes.
+
+    ``upsert_materials`` deletes the stored rows a frame lacks, so only
+    the sources the completion marker lists are written; a run recorded
+    without the marker (interrupted) is refused with ValueError.
+    """
+    run_id, _, completed = load_archive_manifest(directory, run_id)
+    if completed is None:
+        raise ValueError(f"Recorded run {run_id} did not finish (no completion marker); "
+                         f"replaying it would delete stored rows it is missing.")
+    run_id, frames = replay_archive(directory, run_id, workers)
+    changes = {'added': 0, 'modified': 0, 'removed': 0}
+    conn = sqlite3.connect(db_path)
+    try:
+        ensure_materials_schema(conn)
+        for name, frame in frames.items():
+            if name not in completed:
+                if not frame.empty:
+                    logging.warning(f"Skipping {name} from replay of run {run_id}: it was not stored in that run.")
+                continue
+            if frame.empty:
+                continue
+            for change_type, count in upsert_materials(conn, frame, run_id=f"replay_{run_id}").items():
+                changes[change_type] += count
+    finally:
+        conn.close()
+    logging.info(f"Replay of run {run_id} stored: {format_changes(changes)}.")
+    for path in ([excel_path] if excel_path else []) + list(export_paths):
+        try:
+            export_materials(path, db_path)
+        except Exception as e:
+            logging.error(f"Failed to export data to {path}: {e}")
+    return changes
+
+# -------------------------------
+# Запуск без GUI: разовый и по расписанию
+# -------------------------------
+def run_scheduler(interval_minutes, **run_kwargs):
+    """Start an incremental ``main`` run every ``interval_minutes`` until interrupted.
+
+    Runs execute on a worker thread; a tick that arrives while the
+    previous run is still going is skipped. The page cache, the pooled
+    HTTP session and the warm browsers stay open between runs.
+    """
+    cache = PageCache()
+    pool = DriverPool()
+    run_lock = threading.Lock()
+    stop = threading.Event()
+
+    def run_once():
+        try:
+            result = main(cache=cache, pool=pool, **run_kwargs)
+            logging.info(f"Scheduled run {result['run_id']} finished: {result['rows']} rows.")
+        except Exception:
+            logging.exception("Scheduled run terminated with an error.")
+        finally:
+            run_lock.release()
+
+    logging.info(f"Scheduler started: a run every {interval_minutes:g} minutes.")
+    try:
+        while not stop.is_set():
+            if run_lock.acquire(blocking=False):
+                threading.Thread(target=run_once, name="scheduled-run", daemon=True).start()
+            else:
+                logging.warning("Previous run still in progress. Skipping this interval.")
+            stop.wait(interval_minutes * 60)
+    except KeyboardInterrupt:
+        logging.info("Scheduler interrupted. Waiting for the current run to finish...")
+    finally:
+        with run_lock:
+            cache.close()
+            pool.close()
+        logging.info("Scheduler stopped.")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Scrape sheet material data from OSH Cut and SendCutSend. Without options the GUI is started.")
+    parser.add_argument('--headless', action='store_true', help="run once without the GUI and exit")
+    parser.add_argument('--schedule', type=float, metavar='MINUTES',
+                        help="stay running and start an incremental run every MINUTES (implies --headless)")
+    parser.add_argument('--sources', nargs='+', choices=SOURCES, default=list(SOURCES), help="sources to scrape")
+    parser.add_argument('--workers', type=int, default=SENDCUTSEND_WORKERS, help="concurrent SendCutSend workers")
+    parser.add_argument('--db', default=MATERIALS_DB, help="SQLite database path")
+    parser.add_argument('--excel', default=EXCEL_PATH, help="Excel export path ('' to skip the export)")
+    parser.add_argument('--export', action='append', default=[], metavar='PATH',
+                        help="additional export (.xlsx, .csv or .parquet); can be repeated")
+    parser.add_argument('--resume', action='store_true', help="continue the last interrupted run")
+    parser.add_argument('--metrics-dir', default=METRICS_DIR, help="where per-run metrics (JSON, Prometheus) are written")
+    parser.add_argument('--profile-unit', metavar='MATERIAL',
+                        help="run the first work unit whose material name contains MATERIAL under cProfile")
+    parser.add_argument('--record', nargs='?', const=ARCHIVE_DIR, metavar='DIR',
+                        help=f"archive the DOM snapshot of every work unit (default directory: {ARCHIVE_DIR})")
+    parser.add_argument('--replay', nargs='?', const=ARCHIVE_DIR, metavar='DIR',
+                        help="re-parse an archived run into the database instead of scraping (implies --headless)")
+    parser.add_argument('--replay-run', metavar='RUN_ID', help="archived run to replay (default: the latest)")
+    parser.add_argument('--replay-workers', type=int, help="processes used by --replay (default: CPU count)")
+    parser.add_argument('--oshcut-mode', choices=('ui', 'api'), default=OSHCUT_ACQUISITION_MODE,
+                        help="how OSH Cut is scraped: click through the UI, or read the catalog API "
+                             "responses and fall back to the UI if they are incomplete (default: %(default)s)")
+    parser.add_argument('--oshcut-url', metavar='URL', help="OSH Cut sheet catalog URL (e.g. the offline fixture site)")
+    parser.add_argument('--sendcutsend-url', metavar='URL', help="SendCutSend materials page URL")
+    parser.add_argument('--test', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.schedule is not None and args.schedule <= 0:
+        parser.error("--schedule must be a positive number of minutes")
+    return args
+
+def run_headless(args):
+    if sys.stdout:
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        logging.getLogger().addHandler(console)
+    check_single_instance(headless=True)
+    if args.replay:
+        try:
+            changes = replay_to_database(args.replay, args.replay_run, args.replay_workers, db_path=args.db,
+                                         excel_path=args.excel, export_paths=args.export)
+        except (OSError, ValueError) as e:
+            logging.error(f"Cannot replay archive {args.replay}: {e}")
+            return 1
+        logging.info(f"Changes: {format_changes(changes)}.")
+        return 0
+    set_base_urls(args.oshcut_url, args.sendcutsend_url)
+    run_kwargs = dict(sources=tuple(args.sources), workers=args.workers, db_path=args.db, excel_path=args.excel,
+                      export_paths=args.export, metrics_dir=args.metrics_dir, profile_unit=args.profile_unit,
+                      record_dir=args.record, oshcut_mode=args.oshcut_mode)
+    if args.schedule is not None:
+        run_scheduler(args.schedule, resume=args.resume, **run_kwargs)
+        return 0
+    result = main(resume=args.resume, **run_kwargs)
+    if result['changes'] and result['had_previous']:
+        logging.info(f"Changes: {format_changes(result['changes'])}.")
+    return 0 if result['rows'] else 1
+
+
+if __name__ == "__main__":
+    # Процессы повторного разбора (--replay) в сборке PyInstaller.
+    import multiprocessing
+    multiprocessing.freeze_support()
+    args = parse_args()
+
+    if args.headless or args.schedule is not None or args.replay:
+        sys.exit(run_headless(args))
+
+    load_gui_modules()
+    check_single_instance()
+
+    # Проверка test-mode:
+    if args.test:
+        print("Running test mode. Exiting.")
+        sys.exit(0)
+
+    root = tk.Tk()
+    gui = ScraperGUI(root)
+    root.mainloop()
+